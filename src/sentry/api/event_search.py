@@ -1,8 +1,10 @@
+import copy
+import functools
 import re
 from collections import namedtuple
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, List, Mapping, NamedTuple, Sequence, Set, Tuple, Union
+from typing import Any, Hashable, List, Mapping, NamedTuple, Sequence, Set, Tuple, Union
 
 from django.utils.functional import cached_property
 from parsimonious.exceptions import IncompleteParseError
@@ -28,6 +30,7 @@ from sentry.search.utils import (
     parse_numeric_value,
     parse_percentage,
 )
+from sentry.utils.lru import LRUCache
 from sentry.utils.snuba import (
     Dataset,
     is_duration_measurement,
@@ -41,6 +44,12 @@ from sentry.utils.validators import is_event_id, is_span_id
 # before the asterisk is actually escaping the asterisk.
 WILDCARD_CHARS = re.compile(r"(?<!\\)(\\\\)*\*")
 
+# Number of parse trees and parsed queries kept in memory per process. Saved
+# searches and alert rule queries are parsed over and over again, so even a
+# small cache avoids most of the parsing work.
+PARSE_TREE_CACHE_SIZE = 1000
+PARSED_QUERY_CACHE_SIZE = 1000
+
 event_search_grammar = Grammar(
     r"""
 search = spaces term*
@@ -463,6 +472,26 @@ class SearchConfig:
             setattr(config, key, val)
         return config
 
+    def cache_key(self) -> Hashable:
+        """
+        Returns a hashable value that is equal for configs which parse queries the
+        same way. Raises `TypeError` if the config contains unhashable values.
+        """
+        return (
+            frozenset((key, tuple(value)) for key, value in self.key_mappings.items()),
+            frozenset(self.text_operator_keys),
+            frozenset(self.duration_keys),
+            frozenset(self.percentage_keys),
+            frozenset(self.numeric_keys),
+            frozenset(self.date_keys),
+            frozenset(self.boolean_keys),
+            frozenset(self.is_filter_translation.items()),
+            self.allow_boolean,
+            frozenset(self.allowed_keys),
+            frozenset(self.blocked_keys),
+            self.free_text_key,
+        )
+
 
 class SearchVisitor(NodeVisitor):
     unwrapped_exceptions = (InvalidSearchQuery,)
@@ -474,6 +503,9 @@ class SearchVisitor(NodeVisitor):
             config = SearchConfig()
         self.config = config
         self.params = params if params is not None else {}
+        # Set when the result depends on the current time (relative dates), which
+        # means that it can't be cached.
+        self.is_time_dependent = False
         if builder is None:
             # Avoid circular import
             from sentry.search.events.builder import UnresolvedQuery
@@ -619,6 +651,7 @@ class SearchVisitor(NodeVisitor):
         (search_key, _, value) = children
 
         if self.is_date_key(search_key.name):
+            self.is_time_dependent = True
             try:
                 from_val, to_val = parse_datetime_range(value.text)
             except InvalidQuery as exc:
@@ -794,6 +827,7 @@ class SearchVisitor(NodeVisitor):
         operator = handle_negation(negation, operator)
         is_date_aggregate = any(key in search_key.name for key in self.config.date_keys)
         if is_date_aggregate:
+            self.is_time_dependent = True
             try:
                 from_val, to_val = parse_datetime_range(search_value.text)
             except InvalidQuery as exc:
@@ -1074,14 +1108,40 @@ default_config = SearchConfig(
 )
 
 
+parsed_query_cache: "LRUCache[Hashable, List[Any]]" = LRUCache()
+
+
+@functools.lru_cache(maxsize=PARSE_TREE_CACHE_SIZE)
+def _parse_tree(query: str) -> Node:
+    # Parse trees only depend on the query and are never modified by visitors.
+    return event_search_grammar.parse(query)
+
+
 def parse_search_query(
     query, config=None, params=None, builder=None, config_overrides=None
 ) -> Sequence[SearchFilter]:
     if config is None:
         config = default_config
 
+    if config_overrides:
+        config = SearchConfig.create_from(config, **config_overrides)
+
+    # Results are only cached when they can't depend on anything but the query
+    # and the config. A custom builder or params may change how functions in
+    # aggregate filters are resolved.
+    cache_key = None
+    if builder is None and not params:
+        try:
+            cache_key = (query, config.cache_key())
+        except TypeError:
+            pass
+        else:
+            cached = parsed_query_cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
     try:
-        tree = event_search_grammar.parse(query)
+        tree = _parse_tree(query)
     except IncompleteParseError as e:
         idx = e.column()
         prefix = query[max(0, idx - 5) : idx]
@@ -1093,6 +1153,13 @@ def parse_search_query(
             )
         )
 
-    if config_overrides:
-        config = SearchConfig.create_from(config, **config_overrides)
-    return SearchVisitor(config, params=params, builder=builder).visit(tree)
+    visitor = SearchVisitor(config, params=params, builder=builder)
+    result = visitor.visit(tree)
+    if cache_key is not None and not visitor.is_time_dependent:
+        # Filters hold mutable values (e.g. lists for `IN` filters and the
+        # children of parenthesized expressions), so every caller gets its own
+        # copy of the cached result.
+        parsed_query_cache.set(
+            cache_key, copy.deepcopy(result), max_entries=PARSED_QUERY_CACHE_SIZE
+        )
+    return result
@@ -41,9 +41,15 @@ def delete_group_list(
     transaction_id = uuid4().hex
 
     # We do not want to delete split hashes as they are necessary for keeping groups... split.
+    split_hashes = list(
+        GroupHash.objects.filter(
+            project_id=project.id, group__id__in=group_ids, state=GroupHash.State.SPLIT
+        ).values_list("hash", flat=True)
+    )
     GroupHash.objects.filter(
         project_id=project.id, group__id__in=group_ids, state=GroupHash.State.SPLIT
     ).update(group=None)
+    GroupHash.objects.invalidate_cache(project.id, split_hashes)
     GroupHash.objects.filter(project_id=project.id, group__id__in=group_ids).exclude(
         state=GroupHash.State.SPLIT
     ).delete()
@@ -89,9 +89,11 @@ def handle_discard(
             else:
                 groups_to_delete[group.project_id].append(group)
 
+                hashes = list(GroupHash.objects.filter(group=group).values_list("hash", flat=True))
                 GroupHash.objects.filter(group=group).update(
                     group=None, group_tombstone_id=tombstone.id
                 )
+                GroupHash.objects.invalidate_cache(group.project_id, hashes)
 
     for project in projects:
         delete_group_list(
@@ -1,6 +1,10 @@
 import logging
+from collections import defaultdict
 
+from django.db import connections, models, router
 from django.db.models import F
+from django.db.models.signals import post_save
+from psycopg2.extras import execute_values
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
@@ -102,3 +106,166 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_many(self, batch):
+        """
+        Applies a batch of ``(model, columns, filters, extra, signal_only)``
+        increments.
+
+        Increments are grouped by model and the set of columns they write,
+        and applied with a single ``UPDATE ... FROM (VALUES ...)`` statement
+        per group. ``Group`` scores are computed in the same statement, and
+        the updated groups are pushed into the cache afterwards like
+        ``Group.update`` does. Rows that do not exist yet, signal-only
+        increments and ``Group`` updates not addressed by primary key go
+        through ``process`` one by one.
+        """
+        from sentry.models import Group
+
+        groups = defaultdict(list)
+        for model, columns, filters, extra, signal_only in batch:
+            if (
+                signal_only
+                or not columns
+                or not filters
+                or (model is Group and set(filters) not in ({"id"}, {"pk"}))
+            ):
+                self.process(model, columns, filters, extra, signal_only)
+                continue
+            group_key = (
+                model,
+                tuple(sorted(filters)),
+                tuple(sorted(columns)),
+                tuple(sorted(extra or ())),
+            )
+            groups[group_key].append((columns, filters, extra))
+
+        for (model, filter_names, column_names, extra_names), rows in groups.items():
+            if len(rows) == 1:
+                ((columns, filters, extra),) = rows
+                self.process(model, columns, filters, extra)
+                continue
+
+            updated = _bulk_incr(model, filter_names, column_names, extra_names, rows)
+            if model is Group and updated:
+                # ``Group.update`` pushes the new values into the cache through
+                # ``post_save``, which the bulk update bypasses.
+                for group in Group.objects.filter(id__in=[key[0] for key in updated]):
+                    post_save.send(sender=Group, instance=group, created=False)
+
+            for columns, filters, extra in rows:
+                if _filter_values(model, filter_names, filters) in updated:
+                    buffer_incr_complete.send_robust(
+                        model=model,
+                        columns=columns,
+                        filters=filters,
+                        extra=extra,
+                        created=False,
+                        sender=model,
+                    )
+                else:
+                    # The row does not exist yet, let ``process`` create it.
+                    self.process(model, columns, filters, extra)
+
+
+def _get_field(model, name):
+    if name == "pk":
+        return model._meta.pk
+    return model._meta.get_field(name)
+
+
+def _filter_values(model, filter_names, filters):
+    rv = []
+    for name in filter_names:
+        value = filters[name]
+        if isinstance(value, models.Model):
+            value = value.pk
+        rv.append(_get_field(model, name).to_python(value))
+    return tuple(rv)
+
+
+def _bulk_incr(model, filter_names, column_names, extra_names, rows):
+    """
+    Increments ``column_names`` and sets ``extra_names`` for all rows
+    matching the given filters in one statement. Returns the set of filter
+    values that matched an existing row.
+    """
+    from sentry.models import Group
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    # Merge increments for the same row, the VALUES list may not contain
+    # duplicates as the UPDATE would only apply one of them.
+    merged = {}
+    for columns, filters, extra in rows:
+        key = _filter_values(model, filter_names, filters)
+        if key in merged:
+            prev_columns, prev_extra = merged[key]
+            merged[key] = (
+                {name: prev_columns[name] + columns[name] for name in column_names},
+                extra or prev_extra,
+            )
+        else:
+            merged[key] = (columns, extra)
+
+    filter_fields = [_get_field(model, name) for name in filter_names]
+    column_fields = [_get_field(model, name) for name in column_names]
+    extra_fields = [_get_field(model, name) for name in extra_names]
+    value_fields = filter_fields + column_fields + extra_fields
+
+    values = []
+    for key, (columns, extra) in merged.items():
+        row = list(key)
+        row.extend(columns[name] for name in column_names)
+        row.extend(extra[name] for name in extra_names)
+        values.append(
+            tuple(
+                field.get_db_prep_value(value, connection, prepared=False)
+                for field, value in zip(value_fields, row)
+            )
+        )
+
+    table = qn(model._meta.db_table)
+    aliases = [f"v{i}" for i in range(len(value_fields))]
+    filter_aliases = aliases[: len(filter_fields)]
+    column_aliases = aliases[len(filter_fields) : len(filter_fields) + len(column_fields)]
+    extra_aliases = aliases[len(filter_fields) + len(column_fields) :]
+
+    assignments = [
+        f"{qn(field.column)} = {table}.{qn(field.column)} + data.{alias}"
+        for field, alias in zip(column_fields, column_aliases)
+    ] + [f"{qn(field.column)} = data.{alias}" for field, alias in zip(extra_fields, extra_aliases)]
+    if model is Group and "times_seen" in column_names and "last_seen" in extra_names:
+        # Same as ``ScoreClause`` in ``Buffer.process``
+        assignments.append(
+            "{score} = log({table}.{times_seen} + data.{incr}) * 600 + floor(extract(epoch from data.{last_seen}))".format(
+                score=qn(_get_field(model, "score").column),
+                table=table,
+                times_seen=qn(_get_field(model, "times_seen").column),
+                incr=column_aliases[column_names.index("times_seen")],
+                last_seen=extra_aliases[extra_names.index("last_seen")],
+            )
+        )
+    conditions = [
+        f"{table}.{qn(field.column)} = data.{alias}"
+        for field, alias in zip(filter_fields, filter_aliases)
+    ]
+    template = "(%s)" % ", ".join(f"%s::{field.cast_db_type(connection)}" for field in value_fields)
+    query = "UPDATE {table} SET {assignments} FROM (VALUES %s) AS data ({aliases}) WHERE {conditions} RETURNING {returning}".format(
+        table=table,
+        assignments=", ".join(assignments),
+        aliases=", ".join(aliases),
+        conditions=" AND ".join(conditions),
+        returning=", ".join(f"{table}.{qn(field.column)}" for field in filter_fields),
+    )
+
+    with connection.cursor() as cursor:
+        result = execute_values(
+            cursor, query, values, template=template, page_size=len(values), fetch=True
+        )
+
+    return {
+        tuple(field.to_python(value) for field, value in zip(filter_fields, row)) for row in result
+    }
@@ -1,8 +1,13 @@
+import atexit
+import os
 import pickle
 import threading
+import weakref
+from collections import defaultdict
 from datetime import datetime
-from time import time
+from time import sleep, time
 
+from celery.signals import worker_process_shutdown
 from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
@@ -19,6 +24,30 @@ from sentry.utils.redis import get_cluster_from_options
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+# Buffers that have coalesced increments in memory. They are flushed when the
+# process shuts down, the hooks for that are registered once per process.
+_coalescing_buffers = weakref.WeakSet()
+_coalescing_buffers_lock = threading.Lock()
+_shutdown_hooks_registered = False
+
+
+def _flush_coalescing_buffers(**kwargs):
+    for buffer in list(_coalescing_buffers):
+        buffer.flush_coalesced()
+
+
+def _register_coalescing_buffer(buffer):
+    global _shutdown_hooks_registered
+
+    with _coalescing_buffers_lock:
+        _coalescing_buffers.add(buffer)
+        if not _shutdown_hooks_registered:
+            _shutdown_hooks_registered = True
+            atexit.register(_flush_coalescing_buffers)
+            # Celery prefork children exit through ``os._exit``, which skips
+            # ``atexit`` handlers.
+            worker_process_shutdown.connect(_flush_coalescing_buffers, weak=False)
+
 
 class PendingBuffer:
     def __init__(self, size):
@@ -47,16 +76,77 @@ class PendingBuffer:
         return rv
 
 
+class PendingIncr:
+    """
+    Increments for a single buffer key that have been merged in memory and
+    not yet written to Redis.
+    """
+
+    __slots__ = ("model", "filters", "columns", "extra", "signal_only", "attempts")
+
+    def __init__(self, model, filters):
+        self.model = model
+        self.filters = filters
+        self.columns = defaultdict(int)
+        self.extra = {}
+        self.signal_only = None
+        # Number of flushes that failed to write these increments
+        self.attempts = 0
+
+    def merge(self, columns, extra=None, signal_only=None):
+        for column, amount in columns.items():
+            self.columns[column] += amount
+        if extra:
+            # Last write wins, same as the hset in Redis.
+            self.extra.update(extra)
+        if signal_only is True:
+            self.signal_only = True
+
+
 class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        coalesce_max_keys=0,
+        coalesce_max_delay=1.0,
+        coalesce_max_flush_attempts=3,
+        bulk_process=False,
+        **options,
+    ):
+        """
+        When ``coalesce_max_keys`` is greater than zero, increments are merged
+        in memory per buffer key and written to Redis in one pipeline per node
+        once ``coalesce_max_keys`` distinct keys are pending or
+        ``coalesce_max_delay`` seconds have passed, whichever comes first.
+        Pending increments are flushed when the process shuts down. Increments
+        that fail to be written are kept for the next flush, and dropped after
+        ``coalesce_max_flush_attempts`` failures.
+
+        When ``bulk_process`` is set, each ``process_incr`` task drains all of
+        its ``batch_keys`` at once and applies plain counter updates with one
+        ``UPDATE`` statement per model (see ``Buffer.process_many``). Use a
+        larger ``incr_batch_size`` to drain more keys per task.
+        """
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.coalesce_max_keys = coalesce_max_keys
+        self.coalesce_max_delay = coalesce_max_delay
+        self.coalesce_max_flush_attempts = coalesce_max_flush_attempts
+        self.bulk_process = bulk_process
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.coalesce_max_keys >= 0
+        assert self.coalesce_max_delay > 0
+
+        self._coalesced = {}
+        self._coalesced_lock = threading.Lock()
+        self._coalesced_since = None
+        self._flusher_pid = None
 
     def validate(self):
         try:
@@ -157,10 +247,19 @@ class RedisBuffer(Buffer):
             pipe.hget(key, f"i+{col}")
         results = pipe.execute()
 
-        return {
+        rv = {
             col: (int(results[i]) if results[i] is not None else 0) for i, col in enumerate(columns)
         }
 
+        # Include increments that have not been flushed to Redis yet.
+        with self._coalesced_lock:
+            pending = self._coalesced.get(key)
+            if pending is not None:
+                for col in columns:
+                    rv[col] += pending.columns.get(col, 0)
+
+        return rv
+
     def incr(self, model, columns, filters, extra=None, signal_only=None, return_incr_results=True):
         """
         Increment the key by doing the following:
@@ -175,12 +274,26 @@ class RedisBuffer(Buffer):
         # TODO(dcramer): longer term we'd rather not have to serialize values
         # here (unless it's to JSON)
         key = self._make_key(model, filters)
+
+        if self.coalesce_max_keys:
+            self._coalesce_incr(key, model, columns, filters, extra, signal_only)
+        else:
+            # We can't use conn.map() due to wanting to support multiple pending
+            # keys (one per Redis partition)
+            conn = self.cluster.get_local_client_for_key(key)
+            pipe = conn.pipeline()
+            self._pipeline_incr(pipe, key, model, columns, filters, extra, signal_only)
+            pipe.execute()
+
+        metrics.incr(
+            "buffer.incr",
+            skip_internal=True,
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+    def _pipeline_incr(self, pipe, key, model, columns, filters, extra=None, signal_only=None):
         pending_key = self._make_pending_key_from_key(key)
-        # We can't use conn.map() due to wanting to support multiple pending
-        # keys (one per Redis partition)
-        conn = self.cluster.get_local_client_for_key(key)
 
-        pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
         # TODO(dcramer): once this goes live in production, we can kill the pickle path
         # (this is to ensure a zero downtime deploy where we can transition event processing)
@@ -204,13 +317,115 @@ class RedisBuffer(Buffer):
 
         pipe.expire(key, self.key_expire)
         pipe.zadd(pending_key, {key: time()})
-        pipe.execute()
 
-        metrics.incr(
-            "buffer.incr",
-            skip_internal=True,
-            tags={"module": model.__module__, "model": model.__name__},
-        )
+    def _coalesce_incr(self, key, model, columns, filters, extra=None, signal_only=None):
+        self._ensure_flusher()
+
+        with self._coalesced_lock:
+            pending = self._coalesced.get(key)
+            if pending is None:
+                pending = self._coalesced[key] = PendingIncr(model, filters)
+            pending.merge(columns, extra, signal_only)
+
+            if self._coalesced_since is None:
+                self._coalesced_since = time()
+
+            should_flush = (
+                len(self._coalesced) >= self.coalesce_max_keys
+                or time() - self._coalesced_since >= self.coalesce_max_delay
+            )
+
+        if should_flush:
+            self.flush_coalesced()
+
+    def _ensure_flusher(self):
+        # Celery workers fork after the buffer may have been created, so the
+        # flusher thread has to be started in the process that uses it.
+        if self._flusher_pid == os.getpid():
+            return
+
+        with self._coalesced_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        _register_coalescing_buffer(self)
+        thread = threading.Thread(target=self._run_flusher, name="buffer-flusher", daemon=True)
+        thread.start()
+
+    def _run_flusher(self):
+        while True:
+            sleep(self.coalesce_max_delay)
+            try:
+                self.flush_coalesced(only_expired=True)
+            except Exception:
+                self.logger.exception("buffer.coalesce.flush-failed")
+
+    def flush_coalesced(self, only_expired=False):
+        """
+        Writes all increments merged in memory to Redis, using a single
+        pipeline per Redis node. Increments for nodes that fail are merged
+        back into the pending increments rather than raised.
+        """
+        with self._coalesced_lock:
+            if not self._coalesced:
+                return
+            if (
+                only_expired
+                and self._coalesced_since is not None
+                and time() - self._coalesced_since < self.coalesce_max_delay
+            ):
+                return
+            pending, self._coalesced = self._coalesced, {}
+            self._coalesced_since = None
+
+        router = self.cluster.get_router()
+        hosts = defaultdict(list)
+        for key in pending:
+            hosts[router.get_host_for_key(key)].append(key)
+
+        with metrics.timer("buffer.coalesce.flush"):
+            for host, keys in hosts.items():
+                try:
+                    pipe = self.cluster.get_local_client(host).pipeline()
+                    for key in keys:
+                        incr = pending[key]
+                        self._pipeline_incr(
+                            pipe,
+                            key,
+                            incr.model,
+                            incr.columns,
+                            incr.filters,
+                            incr.extra,
+                            incr.signal_only,
+                        )
+                    pipe.execute()
+                except Exception:
+                    self.logger.exception("buffer.coalesce.flush-failed")
+                    self._requeue_coalesced({key: pending[key] for key in keys})
+
+        metrics.timing("buffer.coalesce.flush-keys", len(pending))
+
+    def _requeue_coalesced(self, failed):
+        dropped = 0
+        with self._coalesced_lock:
+            for key, incr in failed.items():
+                incr.attempts += 1
+                if incr.attempts >= self.coalesce_max_flush_attempts:
+                    dropped += 1
+                    continue
+
+                # Increments merged in the meantime are more recent.
+                newer = self._coalesced.get(key)
+                if newer is not None:
+                    incr.merge(newer.columns, newer.extra, newer.signal_only)
+                self._coalesced[key] = incr
+
+            if self._coalesced and self._coalesced_since is None:
+                self._coalesced_since = time()
+
+        if dropped:
+            metrics.incr("buffer.coalesce.dropped", amount=dropped)
 
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
@@ -262,6 +477,10 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if self.bulk_process and len(batch_keys) > 1:
+            self._process_many_incrs(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
@@ -285,42 +504,97 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            incr = self._load_incr(key, values)
+            if incr is None:
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
+            super().process(*incr)
+        finally:
+            client.delete(lock_key)
 
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+    def _process_many_incrs(self, keys):
+        """
+        Drains all given keys from Redis with one pipeline per node and
+        applies them through ``Buffer.process_many``.
+        """
+        with self.cluster.map() as conn:
+            locks = {key: conn.set(self._make_lock_key(key), "1", nx=True, ex=10) for key in keys}
+
+        locked_keys = []
+        for key, result in locks.items():
+            if result.value:
+                locked_keys.append(key)
             else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
+
+        try:
+            router = self.cluster.get_router()
+            hosts = defaultdict(list)
+            for key in locked_keys:
+                hosts[router.get_host_for_key(key)].append(key)
+
+            batch = []
+            for host, host_keys in hosts.items():
+                pipe = self.cluster.get_local_client(host).pipeline()
+                for key in host_keys:
+                    pipe.hgetall(key)
+                    pipe.zrem(self._make_pending_key_from_key(key), key)
+                    pipe.delete(key)
+                results = pipe.execute()
+
+                for i, key in enumerate(host_keys):
+                    incr = self._load_incr(key, results[i * 3])
+                    if incr is not None:
+                        batch.append(incr)
+
+            metrics.timing("buffer.process-many.size", len(batch))
+            super().process_many(batch)
         finally:
-            client.delete(lock_key)
+            if locked_keys:
+                with self.cluster.map() as conn:
+                    for key in locked_keys:
+                        conn.delete(self._make_lock_key(key))
+
+    def _load_incr(self, key, values):
+        """
+        Turns the hash stored for a buffer key into the arguments of
+        ``Buffer.process``, or returns ``None`` if there is nothing to do.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
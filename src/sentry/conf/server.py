@@ -1364,6 +1364,14 @@ SENTRY_BUFFER_OPTIONS = {}
 SENTRY_CACHE = None
 SENTRY_CACHE_OPTIONS = {}
 
+# Process local cache in front of SENTRY_CACHE for models fetched with
+# `get_from_cache` whose manager sets an `l1_cache_ttl`. Writes are picked up by
+# other processes within SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL seconds.
+SENTRY_MODEL_L1_CACHE_ENABLED = False
+SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL = 1
+# Maximum number of instances kept per model
+SENTRY_MODEL_L1_CACHE_SIZE = 10000
+
 # Attachment blob cache backend
 SENTRY_ATTACHMENTS = "sentry.attachments.default.DefaultAttachmentCache"
 SENTRY_ATTACHMENTS_OPTIONS = {}
@@ -1422,6 +1430,10 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
+# Write the top-level keys of node payloads as separately decodable sections,
+# so readers only parse the keys they access. Payloads in either format are
+# always readable, enable this only once all readers support sections.
+SENTRY_NODESTORE_SECTIONED_ENCODING = False
 
 # Tag storage backend
 SENTRY_TAGSTORE = os.environ.get("SENTRY_TAGSTORE", "sentry.tagstore.snuba.SnubaTagStorage")
@@ -2424,6 +2436,19 @@ KAFKA_TOPICS = {
 # If True, consumers will create the topics if they don't exist
 KAFKA_CONSUMER_AUTO_CREATE_TOPICS = True
 
+# If True, `track_outcome` sums up the quantity of outcomes with the same
+# org, project, key, outcome, reason and category within time buckets of
+# `bucket_interval` seconds and produces one message per bucket. Buckets are
+# flushed every `flush_interval` seconds, or once `max_buckets` are pending.
+# Aggregated outcomes have no event id, so only accepted outcomes and outcomes
+# without an event id are aggregated.
+SENTRY_OUTCOMES_AGGREGATION_ENABLED = False
+SENTRY_OUTCOMES_AGGREGATION_OPTIONS = {
+    "bucket_interval": 60,
+    "flush_interval": 10,
+    "max_buckets": 1000,
+}
+
 # For Jira, only approved apps can use the access_email_addresses scope
 # This scope allows Sentry to use the email endpoint (https://developer.atlassian.com/cloud/jira/platform/rest/v3/#api-rest-api-3-user-email-get)
 # We use the email with Jira 2-way sync in order to match the user
@@ -104,7 +104,7 @@ class NodeData(MutableMapping):
             return self._node_data
 
         elif self.id:
-            self.bind_data(nodestore.get(self.id) or {})
+            self.bind_data(nodestore.get(self.id, lazy=True) or {})
             return self._node_data
 
         rv = {}
@@ -138,10 +138,21 @@ class NodeData(MutableMapping):
             See documentation of nodestore.
         """
 
+        subkeys = self.get_subkeys_to_save(subkeys)
+        if subkeys is not None:
+            nodestore.set_subkeys(self.id, subkeys)
+
+    def get_subkeys_to_save(self, subkeys=None):
+        """
+        Returns the subkeys ``save`` would write to nodestore, or ``None`` if
+        there is nothing to save. Used to save many nodes at once with
+        ``nodestore.set_subkeys_many``.
+        """
+
         # We never loaded any data for reading or writing, so there
         # is nothing to save.
         if self._node_data is None:
-            return
+            return None
 
         # We can't put our wrappers into the nodestore, so we need to
         # ensure that the data is converted into a plain old dict
@@ -151,8 +162,7 @@ class NodeData(MutableMapping):
 
         subkeys = subkeys or {}
         subkeys[None] = to_write
-
-        nodestore.set_subkeys(self.id, subkeys)
+        return subkeys
 
 
 class NodeField(GzippedDictField):
@@ -1,5 +1,8 @@
 import logging
+import pickle
 import threading
+import time
+import uuid
 import weakref
 from contextlib import contextmanager
 from typing import Any, Generator, Generic, Mapping, MutableMapping, Optional, Sequence, Tuple
@@ -15,6 +18,7 @@ from sentry.db.models.manager.base_query_set import BaseQuerySet
 from sentry.db.models.query import create_or_update
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
+from sentry.utils.lru import LRUCache
 
 logger = logging.getLogger("sentry")
 
@@ -23,6 +27,63 @@ _local_cache_generation = 0
 _local_cache_enabled = False
 
 
+class ModelL1Cache:
+    """
+    A process local cache of model instances in front of the shared cache, used by
+    managers created with an `l1_cache_ttl`.
+
+    Instances are stored pickled so that callers never share an instance, and expire
+    after the TTL. Saving or deleting an instance publishes a new generation stamp
+    for the model to the shared cache. Every process checks the stamp at most every
+    `SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL` seconds and drops all entries of the model
+    when it changed, which bounds how long another process' write can go unnoticed.
+    """
+
+    def __init__(self, generation_key: str, ttl: int, maxsize: int) -> None:
+        self.generation_key = generation_key
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.__items: "LRUCache[str, bytes]" = LRUCache()
+        self.__generation: Optional[str] = None
+        self.__checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def check_generation(self, version: str) -> None:
+        now = time.monotonic()
+        if now - self.__checked_at < settings.SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL:
+            return
+        self.__checked_at = now
+
+        generation = cache.get(self.generation_key, version=version)
+        if generation != self.__generation:
+            self.clear()
+            self.__generation = generation
+
+    def publish_generation(self, version: str, timeout: int) -> None:
+        """
+        Invalidates the model's entries in all processes.
+        """
+        self.clear()
+        cache.set(self.generation_key, uuid.uuid4().hex, timeout=timeout, version=version)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.__items.get(key)
+        if value is None:
+            return None
+        return pickle.loads(value)
+
+    def set(self, key: str, instance: Any) -> None:
+        if self.ttl <= 0:
+            return
+        value = pickle.dumps(instance, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__items.set(key, value, ttl=self.ttl, max_entries=self.maxsize)
+
+    def clear(self) -> None:
+        self.__items.clear()
+
+
 class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  # type: ignore
     lookup_handlers = {"iexact": lambda x: x.upper()}
     use_for_related_fields = True
@@ -39,7 +100,12 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         self.cache_fields = kwargs.pop("cache_fields", [])
         self.cache_ttl = kwargs.pop("cache_ttl", 60 * 5)
         self._cache_version: Optional[str] = kwargs.pop("cache_version", None)
+        #: Seconds for which instances fetched with `get_from_cache` are kept in a
+        #: process local cache, see `ModelL1Cache`. Only used if
+        #: `SENTRY_MODEL_L1_CACHE_ENABLED` is set.
+        self.l1_cache_ttl: int = kwargs.pop("l1_cache_ttl", 0)
         self.__local_cache = threading.local()
+        self.__l1_cache: Optional[ModelL1Cache] = None
         super().__init__(*args, **kwargs)
 
     @staticmethod
@@ -82,6 +148,19 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
     def _set_cache(self, value: Any) -> None:
         self.__local_cache.value = value
 
+    def _get_l1_cache(self) -> Optional[ModelL1Cache]:
+        if not self.l1_cache_ttl or not settings.SENTRY_MODEL_L1_CACHE_ENABLED:
+            return None
+
+        if self.__l1_cache is None:
+            self.__l1_cache = ModelL1Cache(
+                make_key(self.model, "modelcache-l1-generation", {}),
+                ttl=self.l1_cache_ttl,
+                maxsize=settings.SENTRY_MODEL_L1_CACHE_SIZE,
+            )
+        self.__l1_cache.check_generation(self.cache_version)
+        return self.__l1_cache
+
     @property
     def cache_version(self) -> str:
         if self._cache_version is None:
@@ -97,12 +176,14 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         # we can't serialize weakrefs
         d.pop("_BaseManager__cache", None)
         d.pop("_BaseManager__local_cache", None)
+        d.pop("_BaseManager__l1_cache", None)
         return d
 
     def __setstate__(self, state: Mapping[str, Any]) -> None:
         self.__dict__.update(state)
         # TODO(typing): Basically everywhere else we set this to `threading.local()`.
         self.__local_cache = weakref.WeakKeyDictionary()  # type: ignore
+        self.__l1_cache = None
 
     def __class_prepared(self, sender: Any, **kwargs: Any) -> None:
         """
@@ -118,6 +199,10 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         post_save.connect(self.__post_save, sender=sender, weak=False)
         post_delete.connect(self.__post_delete, sender=sender, weak=False)
 
+        if self.l1_cache_ttl:
+            post_save.connect(self.__invalidate_l1_cache, sender=sender, weak=False)
+            post_delete.connect(self.__invalidate_l1_cache, sender=sender, weak=False)
+
     def __cache_state(self, instance: M) -> None:
         """
         Updates the tracked state of an instance.
@@ -200,6 +285,11 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
             key=self.__get_lookup_cache_key(**{pk_name: instance.pk}), version=self.cache_version
         )
 
+    def __invalidate_l1_cache(self, **kwargs: Any) -> None:
+        l1_cache = self._get_l1_cache()
+        if l1_cache is not None:
+            l1_cache.publish_generation(self.cache_version, timeout=self.cache_ttl)
+
     def __get_lookup_cache_key(self, **kwargs: Any) -> str:
         return make_key(self.model, "modelcache", kwargs)
 
@@ -255,6 +345,16 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
                 if result is not None:
                     return result
 
+            l1_cache = self._get_l1_cache()
+            if l1_cache is not None:
+                result = l1_cache.get(cache_key)
+                if result is not None:
+                    db_kwargs = {**kwargs, "replica": True} if use_replica else {**kwargs}
+                    result._state.db = router.db_for_read(self.model, **db_kwargs)
+                    if local_cache is not None:
+                        local_cache[cache_key] = result
+                    return result
+
             retval = cache.get(cache_key, version=self.cache_version)
             if retval is None:
                 result = self.using_replica().get(**kwargs) if use_replica else self.get(**kwargs)
@@ -262,6 +362,8 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
                 assert result
                 # Ensure we're pushing it into the cache
                 self.__post_save(instance=result)
+                if l1_cache is not None:
+                    self.__set_l1_cache_item(l1_cache, cache_key, result)
                 if local_cache is not None:
                     local_cache[cache_key] = result
                 return result
@@ -270,6 +372,8 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
             # key
             if key != pk_name:
                 result = self.get_from_cache(**{pk_name: retval})
+                if l1_cache is not None:
+                    self.__set_l1_cache_item(l1_cache, cache_key, result)
                 if local_cache is not None:
                     local_cache[cache_key] = result
                 return result
@@ -286,6 +390,9 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
                 logger.error("Cache response returned invalid value %r", retval)
                 result = self.using_replica().get(**kwargs) if use_replica else self.get(**kwargs)
 
+            if l1_cache is not None and isinstance(retval, self.model):
+                self.__set_l1_cache_item(l1_cache, cache_key, retval)
+
             kwargs = {**kwargs, "replica": True} if use_replica else {**kwargs}
             retval._state.db = router.db_for_read(self.model, **kwargs)
 
@@ -295,6 +402,15 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         else:
             raise ValueError("We cannot cache this query. Just hit the database.")
 
+    def __set_l1_cache_item(self, l1_cache: ModelL1Cache, cache_key: str, instance: M) -> None:
+        # Like the shared cache, never store the database the instance was read from.
+        db = instance._state.db
+        instance._state.db = None
+        try:
+            l1_cache.set(cache_key, instance)
+        finally:
+            instance._state.db = db
+
     def get_many_from_cache(self, values: Sequence[str], key: str = "pk") -> Sequence[Any]:
         """
         Wrapper around `QuerySet.filter(pk__in=values)` which supports caching of
@@ -328,9 +444,12 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         cache_lookup_values = []
 
         local_cache = self._get_local_cache()
+        l1_cache = self._get_l1_cache() if key == pk_name else None
         for value in values:
             cache_key = self.__get_lookup_cache_key(**{key: value})
             result = local_cache and local_cache.get(cache_key)
+            if result is None and l1_cache is not None:
+                result = l1_cache.get(cache_key)
             if result is not None:
                 final_results.append(result)
             else:
@@ -377,6 +496,8 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
                 db_lookup_values.append(value)
                 continue
 
+            if l1_cache is not None:
+                self.__set_l1_cache_item(l1_cache, cache_key, cache_result)
             final_results.append(cache_result)
 
         if nested_lookup_values:
@@ -403,6 +524,8 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
             cache_writes.append(db_result)
             if local_cache is not None:
                 local_cache[cache_key] = db_result
+            if l1_cache is not None:
+                self.__set_l1_cache_item(l1_cache, cache_key, db_result)
 
             final_results.append(db_result)
 
@@ -419,6 +542,7 @@ class BaseManager(DjangoBaseManager.from_queryset(BaseQuerySet), Generic[M]):  #
         pk_name = self.model._meta.pk.name
         cache_key = self.__get_lookup_cache_key(**{pk_name: instance_id})
         cache.delete(cache_key, version=self.cache_version)
+        self.__invalidate_l1_cache()
 
     def post_save(self, instance: M, **kwargs: Any) -> None:
         """
@@ -1,7 +1,8 @@
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, TypeVar
 
 from rb.clients import LocalClient
 from redis.exceptions import ResponseError
@@ -18,6 +19,8 @@ logger = logging.getLogger("sentry.digests")
 
 script = load_script("digests/digests.lua")
 
+T = TypeVar("T")
+
 
 class RedisBackend(Backend):
     """
@@ -84,6 +87,12 @@ class RedisBackend(Backend):
         # too early.
         self.ttl = options.pop("ttl", 60 * 60)
 
+        # The maximum number of partitions (hosts) that are scheduled or
+        # maintained concurrently.
+        self.partition_concurrency = options.pop("partition_concurrency", 8)
+        if self.partition_concurrency < 1:
+            raise ValueError("Partition concurrency must be at least 1.")
+
         super().__init__(**options)
 
     def validate(self) -> None:
@@ -150,21 +159,45 @@ class RedisBackend(Backend):
         )
         return partitions
 
+    def __map_partitions(self, func: Callable[[int], T], operation: str) -> Iterator[Tuple[int, T]]:
+        """
+        Calls ``func`` for every host in the cluster, running up to
+        ``partition_concurrency`` partitions at once, and yields the results
+        in order of completion. Failures are logged and skipped so that one
+        unavailable partition does not hold up the others.
+        """
+        hosts = list(self.cluster.hosts)
+        if not hosts:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.partition_concurrency, len(hosts))
+        ) as executor:
+            futures = {executor.submit(func, host): host for host in hosts}
+            for future in as_completed(futures):
+                host = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    logger.error(
+                        f"Failed to perform {operation} for partition {host} due to error: {error}",
+                        exc_info=True,
+                    )
+                else:
+                    yield host, result
+
     def schedule(
         self, deadline: float, timestamp: Optional[float] = None
     ) -> Optional[Iterable[ScheduleEntry]]:
         if timestamp is None:
             timestamp = time.time()
 
-        for host in self.cluster.hosts:
-            try:
-                for key, timestamp in self.__schedule_partition(host, deadline, timestamp):
-                    yield ScheduleEntry(key.decode("utf-8"), float(timestamp))
-            except Exception as error:
-                logger.error(
-                    f"Failed to perform scheduling for partition {host} due to error: {error}",
-                    exc_info=True,
-                )
+        for host, partition in self.__map_partitions(
+            lambda host: list(self.__schedule_partition(host, deadline, timestamp)),
+            "scheduling",
+        ):
+            for key, entry_timestamp in partition:
+                yield ScheduleEntry(key.decode("utf-8"), float(entry_timestamp))
 
     def __maintenance_partition(self, host: int, deadline: float, timestamp: float) -> Any:
         return script(
@@ -177,14 +210,11 @@ class RedisBackend(Backend):
         if timestamp is None:
             timestamp = time.time()
 
-        for host in self.cluster.hosts:
-            try:
-                self.__maintenance_partition(host, deadline, timestamp)
-            except Exception as error:
-                logger.error(
-                    f"Failed to perform maintenance on digest partition {host} due to error: {error}",
-                    exc_info=True,
-                )
+        for _ in self.__map_partitions(
+            lambda host: self.__maintenance_partition(host, deadline, timestamp),
+            "maintenance",
+        ):
+            pass
 
     @contextmanager
     def digest(
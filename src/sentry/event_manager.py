@@ -19,6 +19,7 @@ from sentry import (
     eventstream,
     eventtypes,
     features,
+    nodestore,
     options,
     quotas,
     reprocessing2,
@@ -51,6 +52,7 @@ from sentry.lang.native.utils import STORE_CRASH_REPORTS_ALL, convert_crashrepor
 from sentry.models import (
     CRASH_REPORT_TYPES,
     Activity,
+    Distribution,
     Environment,
     EventAttachment,
     EventDict,
@@ -704,12 +706,16 @@ def _get_or_create_release_many(jobs, projects):
         if old_datetime is None or new_datetime > old_datetime:
             release_date_added[release_key] = new_datetime
 
-    for (project_id, version), jobs_to_update in jobs_with_releases.items():
-        release = Release.get_or_create(
-            project=projects[project_id],
-            version=version,
-            date_added=release_date_added[(project_id, version)],
-        )
+    releases = Release.get_or_create_many(
+        {
+            (projects[project_id], version): date_added
+            for (project_id, version), date_added in release_date_added.items()
+        }
+    )
+
+    dist_date_added = {}
+    for release_key, jobs_to_update in jobs_with_releases.items():
+        release = releases[release_key]
 
         for job in jobs_to_update:
             # Don't allow a conflicting 'release' tag
@@ -720,11 +726,23 @@ def _get_or_create_release_many(jobs, projects):
             job["release"] = release
 
             if job["dist"]:
-                job["dist"] = job["release"].add_dist(job["dist"], job["event"].datetime)
+                dist_key = (release, job["dist"])
+                new_datetime = job["event"].datetime
+                old_datetime = dist_date_added.get(dist_key)
+                if old_datetime is None or new_datetime < old_datetime:
+                    dist_date_added[dist_key] = new_datetime
 
-                # don't allow a conflicting 'dist' tag
-                pop_tag(job["data"], "dist")
-                set_tag(job["data"], "sentry:dist", job["dist"].name)
+    if not dist_date_added:
+        return
+
+    dists = Distribution.objects.get_or_create_many(dist_date_added)
+    for job in jobs:
+        if job["release"] and job["dist"]:
+            job["dist"] = dists[(job["release"].id, job["dist"])]
+
+            # don't allow a conflicting 'dist' tag
+            pop_tag(job["data"], "dist")
+            set_tag(job["data"], "sentry:dist", job["dist"].name)
 
 
 @metrics.wraps("save_event.get_event_user_many")
@@ -888,47 +906,65 @@ def _tsdb_record_all_metrics(jobs):
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     inserted_time = datetime.utcnow().replace(tzinfo=UTC).timestamp()
-    for job in jobs:
-        # Write the event to Nodestore
+
+    # Only events that were grouped keep their unprocessed payload, fetch all
+    # of them from the processing store at once.
+    unprocessed_keys = {
+        i: cache_key_for_event(
+            {"project": job["event"].project_id, "event_id": job["event"].event_id}
+        )
+        for i, job in enumerate(jobs)
+        if job["group"]
+    }
+    unprocessed_events = (
+        event_processing_store.get_many(list(unprocessed_keys.values()), unprocessed=True)
+        if unprocessed_keys
+        else {}
+    )
+
+    # Write the events to Nodestore
+    items = {}
+    for i, job in enumerate(jobs):
         subkeys = {}
 
-        if job["group"]:
-            event = job["event"]
-            unprocessed = event_processing_store.get(
-                cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
-                unprocessed=True,
-            )
-            if unprocessed is not None:
-                subkeys["unprocessed"] = unprocessed
+        unprocessed = unprocessed_events.get(unprocessed_keys.get(i))
+        if unprocessed is not None:
+            subkeys["unprocessed"] = unprocessed
 
         job["event"].data["nodestore_insert"] = inserted_time
-        job["event"].data.save(subkeys=subkeys)
+        to_save = job["event"].data.get_subkeys_to_save(subkeys=subkeys)
+        if to_save is not None:
+            items[job["event"].data.id] = to_save
+
+    if items:
+        nodestore.set_subkeys_many(items)
 
 
 @metrics.wraps("save_event.eventstream_insert_many")
 def _eventstream_insert_many(jobs):
-    for job in jobs:
-        if job["event"].project_id == settings.SENTRY_PROJECT:
-            metrics.incr(
-                "internal.captured.eventstream_insert",
-                tags={"event_type": job["event"].data.get("type") or "null"},
-            )
+    with eventstream.batched_inserts():
+        for job in jobs:
+            if job["event"].project_id == settings.SENTRY_PROJECT:
+                metrics.incr(
+                    "internal.captured.eventstream_insert",
+                    tags={"event_type": job["event"].data.get("type") or "null"},
+                )
 
-        eventstream.insert(
-            group=job["group"],
-            event=job["event"],
-            is_new=job["is_new"],
-            is_regression=job["is_regression"],
-            is_new_group_environment=job["is_new_group_environment"],
-            primary_hash=job["event"].get_primary_hash(),
-            received_timestamp=job["received_timestamp"],
-            # We are choosing to skip consuming the event back
-            # in the eventstream if it's flagged as raw.
-            # This means that we want to publish the event
-            # through the event stream, but we don't care
-            # about post processing and handling the commit.
-            skip_consume=job.get("raw", False),
-        )
+            eventstream.insert(
+                group=job["group"],
+                event=job["event"],
+                is_new=job["is_new"],
+                is_regression=job["is_regression"],
+                is_new_group_environment=job["is_new_group_environment"],
+                primary_hash=job["event"].get_primary_hash(),
+                received_timestamp=job["received_timestamp"],
+                # We are choosing to skip consuming the event back
+                # in the eventstream if it's flagged as raw.
+                # This means that we want to publish the event
+                # through the event stream, but we don't care
+                # about post processing and handling the commit.
+                skip_consume=job.get("raw", False),
+            )
 
 
 @metrics.wraps("save_event.track_outcome_accepted_many")
@@ -1057,12 +1093,18 @@ def get_culprit(data):
     )
 
 
-def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwargs):
+def _save_aggregate(
+    event, hashes, release, metadata, received_timestamp, retry_stale_grouphashes=True, **kwargs
+):
     project = event.project
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    # Resolve flat and hierarchical hashes with a single query. Only flat hashes
+    # are created here, the hierarchical hash to create (if any) is determined by
+    # _find_existing_grouphash.
+    known_grouphashes = GroupHash.objects.get_or_create_many(
+        project, hashes.hashes, prefetch_hashes=hashes.hierarchical_hashes
+    )
+    flat_grouphashes = [known_grouphashes[hash] for hash in hashes.hashes]
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -1071,13 +1113,22 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
     # when groups are created and also relieves contention by locking a more
     # specific hash than `hierarchical_hashes[0]`.
     existing_grouphash, root_hierarchical_hash = _find_existing_grouphash(
-        project, flat_grouphashes, hashes.hierarchical_hashes
+        project,
+        flat_grouphashes,
+        hashes.hierarchical_hashes,
+        hierarchical_grouphashes={
+            hash: known_grouphashes[hash]
+            for hash in hashes.hierarchical_hashes
+            if hash in known_grouphashes
+        },
     )
 
     if root_hierarchical_hash is not None:
-        root_hierarchical_grouphash = GroupHash.objects.get_or_create(
-            project=project, hash=root_hierarchical_hash
-        )[0]
+        root_hierarchical_grouphash = known_grouphashes.get(root_hierarchical_hash)
+        if root_hierarchical_grouphash is None:
+            root_hierarchical_grouphash = GroupHash.objects.get_or_create(
+                project=project, hash=root_hierarchical_hash
+            )[0]
 
         metadata.update(
             hashes.group_metadata_from_hash(
@@ -1191,7 +1242,23 @@ def _save_aggregate(event, hashes, release, metadata, received_timestamp, **kwar
 
                 return group, is_new, is_regression
 
-    group = Group.objects.get(id=existing_grouphash.group_id)
+    try:
+        group = Group.objects.get(id=existing_grouphash.group_id)
+    except Group.DoesNotExist:
+        # Group hashes cached by `get_or_create_many` may still point to a group that
+        # has been deleted since, drop them and resolve the hashes from the database.
+        if not retry_stale_grouphashes:
+            raise
+        GroupHash.objects.invalidate_cache(project.id, list(known_grouphashes))
+        return _save_aggregate(
+            event,
+            hashes,
+            release,
+            metadata,
+            received_timestamp,
+            retry_stale_grouphashes=False,
+            **kwargs,
+        )
 
     is_new = False
 
@@ -1246,17 +1313,23 @@ def _find_existing_grouphash(
     project,
     flat_grouphashes,
     hierarchical_hashes,
+    hierarchical_grouphashes=None,
 ):
+    """
+    `hierarchical_grouphashes` are the existing `GroupHash`es for
+    `hierarchical_hashes`, if they have already been fetched.
+    """
     all_grouphashes = []
     root_hierarchical_hash = None
 
     found_split = False
 
     if hierarchical_hashes:
-        hierarchical_grouphashes = {
-            h.hash: h
-            for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
-        }
+        if hierarchical_grouphashes is None:
+            hierarchical_grouphashes = {
+                h.hash: h
+                for h in GroupHash.objects.filter(project=project, hash__in=hierarchical_hashes)
+            }
 
         # Look for splits:
         # 1. If we find a hash with SPLIT state at `n`, we want to use
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, Mapping, Optional, Sequence
 
 import sentry_sdk
 
@@ -40,16 +40,49 @@ class EventProcessingStore:
             self.inner.set(key, event, self.timeout)
             return key
 
+    def store_many(self, events: Sequence[Event], unprocessed: bool = False) -> Sequence[str]:
+        with sentry_sdk.start_span(op="eventstore.processing.store_many") as span:
+            span.set_data("count", len(events))
+            keys = [cache_key_for_event(event) for event in events]
+            if unprocessed:
+                keys = [self.__get_unprocessed_key(key) for key in keys]
+            self.inner.set_many(list(zip(keys, events)), self.timeout)
+            return keys
+
     def get(self, key: str, unprocessed: bool = False) -> Optional[Event]:
         with sentry_sdk.start_span(op="eventstore.processing.get"):
             if unprocessed:
                 key = self.__get_unprocessed_key(key)
             return self.inner.get(key)
 
+    def get_many(self, keys: Sequence[str], unprocessed: bool = False) -> Mapping[str, Event]:
+        """
+        Returns the events stored at the given keys. Missing events are not
+        part of the result.
+        """
+        with sentry_sdk.start_span(op="eventstore.processing.get_many") as span:
+            span.set_data("count", len(keys))
+            if not unprocessed:
+                return dict(self.inner.get_many(keys))
+
+            results = self.inner.get_many([self.__get_unprocessed_key(key) for key in keys])
+            by_unprocessed_key = dict(results)
+            return {
+                key: by_unprocessed_key[self.__get_unprocessed_key(key)]
+                for key in keys
+                if self.__get_unprocessed_key(key) in by_unprocessed_key
+            }
+
     def delete_by_key(self, key: str) -> None:
         with sentry_sdk.start_span(op="eventstore.processing.delete_by_key"):
-            self.inner.delete(key)
-            self.inner.delete(self.__get_unprocessed_key(key))
+            self.inner.delete_many([key, self.__get_unprocessed_key(key)])
+
+    def delete_many(self, keys: Sequence[str]) -> None:
+        with sentry_sdk.start_span(op="eventstore.processing.delete_many") as span:
+            span.set_data("count", len(keys))
+            self.inner.delete_many(
+                [k for key in keys for k in (key, self.__get_unprocessed_key(key))]
+            )
 
     def delete(self, event: Event) -> None:
         key = cache_key_for_event(event)
@@ -0,0 +1,77 @@
+import base64
+from typing import Any, Mapping, Optional
+
+import msgpack
+import zstandard
+
+from sentry.utils import json, metrics
+from sentry.utils.codecs import Codec
+from sentry.utils.json import better_default_encoder
+
+# Encoded values start with ``HEADER_PREFIX``, the format version and a
+# separator. Values without the prefix are plain JSON, which can never start
+# with a NUL character.
+HEADER_PREFIX = "\x00v"
+HEADER_SEPARATOR = ":"
+
+# msgpack, compressed with zstd and encoded as base64 (the Redis clients
+# return decoded strings.) The compression dictionary, if any, is referenced
+# by the zstd frame.
+VERSION_MSGPACK_ZSTD = "1"
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    return better_default_encoder(value)
+
+
+class EventProcessingStoreCodec(Codec[Any, str]):
+    """
+    Encodes event payloads for the processing store.
+
+    Decoding supports every format version as well as plain JSON written by
+    earlier versions, so that events in flight during a deploy stay readable.
+    Whether new values are written compressed is controlled by ``compress``.
+
+    A zstd dictionary trained on event payloads can be passed as
+    ``zstd_dictionary``. Values compressed with a dictionary can only be
+    decoded by processes that have been configured with the same dictionary.
+    """
+
+    def __init__(self, compress: bool = False, zstd_dictionary: Optional[bytes] = None) -> None:
+        self.compress = compress
+        self.zstd_dictionary = (
+            zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+        )
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        # zstandard compressors are not thread safe, create one per operation.
+        return zstandard.ZstdCompressor(dict_data=self.zstd_dictionary)
+
+    def _decompressor(self) -> zstandard.ZstdDecompressor:
+        return zstandard.ZstdDecompressor(dict_data=self.zstd_dictionary)
+
+    def encode(self, value: Any) -> str:
+        if self.compress:
+            try:
+                packed = msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError):
+                # Not representable in msgpack (e.g. integers above 64 bits)
+                metrics.incr("eventstore.processing.codec.fallback")
+            else:
+                payload = base64.b64encode(self._compressor().compress(packed)).decode("ascii")
+                return f"{HEADER_PREFIX}{VERSION_MSGPACK_ZSTD}{HEADER_SEPARATOR}{payload}"
+
+        return str(json.dumps(value))
+
+    def decode(self, value: str) -> Any:
+        if not value.startswith(HEADER_PREFIX):
+            return json.loads(value)
+
+        version, _, payload = value[len(HEADER_PREFIX) :].partition(HEADER_SEPARATOR)
+        if version == VERSION_MSGPACK_ZSTD:
+            packed = self._decompressor().decompress(base64.b64decode(payload))
+            return msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+        raise ValueError(f"Unknown processing store format version: {version!r}")
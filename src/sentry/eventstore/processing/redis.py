@@ -1,14 +1,46 @@
+from typing import Optional
+
 from sentry.cache.redis import RedisClusterCache
-from sentry.utils.kvstore.cache import CacheKVStorage
+from sentry.utils.kvstore.cache import CacheBackendWrapper, CacheKeyWrapper
+from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
+from sentry.utils.kvstore.redis import RedisKVStorage
 
 from .base import EventProcessingStore
+from .codec import EventProcessingStoreCodec
 
 
-def RedisClusterEventProcessingStore(**options) -> EventProcessingStore:
+def RedisClusterEventProcessingStore(
+    compress: bool = False, zstd_dictionary_path: Optional[str] = None, **options
+) -> EventProcessingStore:
     """
     Creates an instance of the processing store which uses the Redis Cluster
     cache as its backend.
 
-    Keyword argument are forwarded to the ``RedisClusterCache`` constructor.
+    With ``compress`` enabled, events are written in the compressed binary
+    format of ``EventProcessingStoreCodec``, optionally using the zstd
+    dictionary at ``zstd_dictionary_path``. Events are always readable in
+    either format, so ``compress`` can be enabled once all processes run a
+    version that understands it.
+
+    Other keyword arguments are forwarded to the ``RedisClusterCache``
+    constructor. Keys are the same as the ones of the cache, and the cache's
+    value size limit and instrumentation still apply.
     """
-    return EventProcessingStore(CacheKVStorage(RedisClusterCache(**options)))
+    cache = RedisClusterCache(**options)
+
+    zstd_dictionary = None
+    if zstd_dictionary_path is not None:
+        with open(zstd_dictionary_path, "rb") as f:
+            zstd_dictionary = f.read()
+
+    return EventProcessingStore(
+        KVStorageCodecWrapper(
+            CacheBackendWrapper(
+                CacheKeyWrapper(
+                    RedisKVStorage(cache.client), prefix=cache.prefix, version=cache.version
+                ),
+                cache,
+            ),
+            EventProcessingStoreCodec(compress=compress, zstd_dictionary=zstd_dictionary),
+        )
+    )
@@ -1,4 +1,5 @@
 import logging
+from contextlib import contextmanager
 from typing import Optional
 
 from sentry.tasks.post_process import post_process_group
@@ -18,6 +19,7 @@ class ForwarderNotRequired(NotImplementedError):
 class EventStream(Service):
     __all__ = (
         "insert",
+        "batched_inserts",
         "start_delete_groups",
         "end_delete_groups",
         "start_merge",
@@ -58,6 +60,14 @@ class EventStream(Service):
                 group_id=group_id,
             )
 
+    @contextmanager
+    def batched_inserts(self):
+        """
+        Groups several calls to ``insert``. Backends that publish messages
+        asynchronously may defer bookkeeping until the block exits.
+        """
+        yield
+
     def insert(
         self,
         group,
@@ -1,5 +1,8 @@
+import functools
 import logging
 import signal
+import threading
+from contextlib import contextmanager
 from typing import Any, Literal, Mapping, Optional, Tuple, Union
 
 from confluent_kafka import OFFSET_INVALID, TopicPartition
@@ -32,6 +35,7 @@ class KafkaEventStream(SnubaProtocolEventStream):
     def __init__(self, **options):
         self.topic = settings.KAFKA_EVENTS
         self.transactions_topic = settings.KAFKA_TRANSACTIONS
+        self._batch_state = threading.local()
 
     @cached_property
     def producer(self):
@@ -106,6 +110,22 @@ class KafkaEventStream(SnubaProtocolEventStream):
                 ),
             }
 
+    @contextmanager
+    def batched_inserts(self):
+        # Delivery callbacks only need to be served once per batch rather than
+        # once per message, see ``_send``. Nested blocks are part of the
+        # outermost batch.
+        if getattr(self._batch_state, "active", False):
+            yield
+            return
+
+        self._batch_state.active = True
+        try:
+            yield
+        finally:
+            self._batch_state.active = False
+            self.producer.poll(0.0)
+
     def insert(
         self,
         group,
@@ -163,21 +183,32 @@ class KafkaEventStream(SnubaProtocolEventStream):
         # interfering with request handling. (This does `poll` does not act as
         # a heartbeat for the purposes of any sort of session expiration.)
         # Note that this call to poll() is *only* dealing with earlier
-        # asynchronous produce() calls from the same process.
-        self.producer.poll(0.0)
+        # asynchronous produce() calls from the same process. Within
+        # ``batched_inserts`` the producer is polled once the batch is done.
+        if not getattr(self._batch_state, "active", False):
+            self.producer.poll(0.0)
 
         assert isinstance(extra_data, tuple)
 
         try:
             topic = self.transactions_topic if is_transaction_event else self.topic
 
-            self.producer.produce(
+            produce = functools.partial(
+                self.producer.produce,
                 topic=topic,
                 key=str(project_id).encode("utf-8") if not skip_semantic_partitioning else None,
                 value=json.dumps((self.EVENT_PROTOCOL_VERSION, _type) + extra_data),
                 on_delivery=self.delivery_callback,
                 headers=[(k, v.encode("utf-8")) for k, v in headers.items()],
             )
+            try:
+                produce()
+            except BufferError:
+                # The local queue is full, which can happen within a batch as
+                # the producer is not polled between messages. Wait for some
+                # deliveries and try again.
+                self.producer.poll(1.0)
+                produce()
         except Exception as error:
             logger.error("Could not publish message: %s", error, exc_info=True)
             return
@@ -1,6 +1,7 @@
 import re
 
 from sentry import options
+from sentry.grouping.cache import grouping_object_cache
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.enhancer import LATEST_VERSION, Enhancements, InvalidEnhancerConfig
 from sentry.grouping.strategies.base import DEFAULT_GROUPING_ENHANCEMENTS_BASE, GroupingContext
@@ -164,7 +165,15 @@ def load_grouping_config(config_dict=None):
     config_id = config_dict.pop("id")
     if config_id not in CONFIGURATIONS:
         raise GroupingConfigNotFound(config_id)
-    return CONFIGURATIONS[config_id](**config_dict)
+    if set(config_dict) - {"enhancements"}:
+        return CONFIGURATIONS[config_id](**config_dict)
+    # Configurations only hold their enhancements, so they can be shared
+    # between events with the same config.
+    return grouping_object_cache.get_or_build(
+        "config",
+        "{}|{}".format(config_id, config_dict.get("enhancements") or ""),
+        lambda: CONFIGURATIONS[config_id](**config_dict),
+    )
 
 
 def load_default_grouping_config():
@@ -172,12 +181,19 @@ def load_default_grouping_config():
 
 
 def get_fingerprinting_config_for_project(project):
-    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
+    from sentry.grouping.fingerprinting import FingerprintingRules
 
     rules = project.get_option("sentry:fingerprinting_rules")
     if not rules:
         return FingerprintingRules([])
 
+    return grouping_object_cache.get_or_build(
+        "fingerprinting", rules, lambda: _load_fingerprinting_rules(rules)
+    )
+
+
+def _load_fingerprinting_rules(rules):
+    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
     from sentry.utils.cache import cache
     from sentry.utils.hashlib import md5_text
 
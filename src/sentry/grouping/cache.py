@@ -0,0 +1,51 @@
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.hashlib import md5_text
+from sentry.utils.lru import LRUCache
+
+
+class GroupingObjectCache:
+    """
+    An in-process LRU of constructed grouping objects (enhancements,
+    fingerprinting rules and strategy configurations), keyed by a hash of the
+    serialized source they were built from.
+
+    These objects are never mutated once built, so cached instances are
+    shared between events. The cache is bounded both by the number of entries
+    and by the total size of their sources.
+    """
+
+    def __init__(self):
+        self._lru = LRUCache()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def get_or_build(self, kind, source, build):
+        """Returns the object built from ``source``, calling ``build`` on a
+        miss.  Exceptions raised by ``build`` propagate and are not cached."""
+        max_entries = options.get("grouping.config-cache.max-entries")
+        max_bytes = options.get("grouping.config-cache.max-bytes")
+        if not max_entries or not max_bytes:
+            return build()
+
+        key = (kind, md5_text(source).hexdigest())
+        value = self._lru.get(key)
+        if value is not None:
+            metrics.incr("grouping.config_cache.hit", tags={"kind": kind})
+            return value
+
+        metrics.incr("grouping.config_cache.miss", tags={"kind": kind})
+        value = build()
+        evicted = self._lru.set(
+            key, value, weight=len(source), max_entries=max_entries, max_weight=max_bytes
+        )
+        if evicted:
+            metrics.incr("grouping.config_cache.evict", amount=evicted)
+        return value
+
+    def clear(self):
+        self._lru.clear()
+
+
+grouping_object_cache = GroupingObjectCache()
@@ -16,6 +16,7 @@ from .matchers import (
     CalleeMatch,
     CallerMatch,
     ExceptionFieldMatch,
+    FamilyMatch,
     FrameMatch,
     Match,
     create_match_frame,
@@ -124,8 +125,11 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        families = {frame["family"] for frame in match_frames}
 
         for rule in self._modifier_rules:
+            if not rule.may_match_families(families):
+                continue
             for idx, action in rule.get_matching_frame_actions(
                 match_frames, platform, exception_data, cache
             ):
@@ -136,10 +140,13 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        families = {frame["family"] for frame in match_frames}
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
         for rule in self._updater_rules:
+            if not rule.may_match_families(families):
+                continue
 
             for idx, action in rule.get_matching_frame_actions(
                 match_frames, platform, exception_data, cache
@@ -289,6 +296,19 @@ class Rule:
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
 
+        # Prefilters that rule out frames without evaluating any globs. Caller
+        # and callee matchers refer to other frames and are not considered.
+        self._families = None
+        self._literal_prefixes = []
+        for matcher in self._other_matchers:
+            if isinstance(matcher, FamilyMatch) and matcher.families is not None:
+                if self._families is None:
+                    self._families = matcher.families
+                else:
+                    self._families = self._families & matcher.families
+            elif isinstance(matcher, FrameMatch) and matcher.literal_prefix:
+                self._literal_prefixes.append((matcher.field, matcher.literal_prefix))
+
     @property
     def matcher_description(self):
         rv = " ".join(x.description for x in self.matchers)
@@ -312,6 +332,21 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
+    def may_match_families(self, families):
+        """Returns `False` if none of the given frame families can match this
+        rule.
+        """
+        return self._families is None or not self._families.isdisjoint(families)
+
+    def _may_match_frame(self, frame):
+        if self._families is not None and frame["family"] not in self._families:
+            return False
+        for field, prefix in self._literal_prefixes:
+            value = frame[field]
+            if value is None or not value.startswith(prefix):
+                return False
+        return True
+
     def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
@@ -328,6 +363,8 @@ class Rule:
 
         # 2 - Check if frame matchers match
         for idx, frame in enumerate(frames):
+            if not self._may_match_frame(frame):
+                continue
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
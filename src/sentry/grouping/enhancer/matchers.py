@@ -28,6 +28,10 @@ assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are no
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
+# Characters that have a special meaning in glob patterns. Everything in front
+# of the first of these has to match literally.
+GLOB_SPECIAL_CHARS = frozenset(b"*?[]{}\\")
+
 
 MATCHERS = {
     # discover field names
@@ -50,6 +54,14 @@ MATCHERS = {
 }
 
 
+def get_literal_prefix(pattern: bytes) -> bytes:
+    """Returns the part of a glob pattern that has to match literally."""
+    for idx, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:idx]
+    return pattern
+
+
 def _get_function_name(frame_data: dict, platform: Optional[str]):
 
     function_name = get_function_name_for_frame(frame_data, platform)
@@ -117,6 +129,10 @@ class FrameMatch(Match):
     # Global registry of matchers
     instances = {}
 
+    # Set by matchers that can cheaply rule out frames, see ``Rule``.
+    _families = None
+    _literal_prefix = None
+
     @classmethod
     def from_key(cls, key, pattern, negated):
 
@@ -156,6 +172,16 @@ class FrameMatch(Match):
         self._encoded_pattern = pattern.encode("utf-8")
         self.negated = negated
 
+    @property
+    def families(self):
+        """The set of frame families this matcher is restricted to, if any."""
+        return self._families
+
+    @property
+    def literal_prefix(self):
+        """A prefix every value matched by this matcher starts with, if any."""
+        return self._literal_prefix
+
     @property
     def description(self):
         return "{}:{}".format(
@@ -222,6 +248,8 @@ class FamilyMatch(FrameMatch):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._flags = set(self._encoded_pattern.split(b","))
+        if not self.negated and b"all" not in self._flags:
+            self._families = frozenset(self._flags)
 
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         if b"all" in self._flags:
@@ -240,13 +268,28 @@ class InAppMatch(FrameMatch):
         return ref_val is not None and ref_val == match_frame["in_app"]
 
 
-class FunctionMatch(FrameMatch):
+class LiteralPrefixMixin:
+    """
+    For glob matchers on fields that are not path-normalized, a frame can
+    only match if its value starts with the literal prefix of the pattern.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.negated:
+            self._literal_prefix = get_literal_prefix(self._encoded_pattern)
+
+
+class FunctionMatch(LiteralPrefixMixin, FrameMatch):
+
+    field = "function"
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
         return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
 
 
-class FrameFieldMatch(FrameMatch):
+class FrameFieldMatch(LiteralPrefixMixin, FrameMatch):
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         field = match_frame[self.field]
         if field is None:
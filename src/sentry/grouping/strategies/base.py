@@ -18,6 +18,7 @@ import sentry_sdk
 
 from sentry import projectoptions
 from sentry.eventstore.models import Event
+from sentry.grouping.cache import grouping_object_cache
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.enhancer import Enhancements
 from sentry.interfaces.base import Interface
@@ -297,7 +298,9 @@ class StrategyConfiguration:
         if enhancements is None:
             enhancements_instance = Enhancements([])
         else:
-            enhancements_instance = Enhancements.loads(enhancements)
+            enhancements_instance = grouping_object_cache.get_or_build(
+                "enhancements", enhancements, lambda: Enhancements.loads(enhancements)
+            )
         self.enhancements = enhancements_instance
 
     def __repr__(self) -> str:
@@ -316,6 +316,44 @@ class AlertRuleManager(BaseManager):
 
         return alert_rule
 
+    def get_for_subscriptions(self, subscriptions):
+        """
+        Fetches the AlertRules associated with many Subscriptions at once. Attempts to
+        fetch from cache then hits the database with a single query.
+        :return: A dict mapping subscription ids to their `AlertRule`. Subscriptions
+        without an alert rule are omitted.
+        """
+        cache_keys = {
+            subscription.id: self.__build_subscription_cache_key(subscription.id)
+            for subscription in subscriptions
+        }
+        cached = cache.get_many(cache_keys.values())
+        alert_rules = {
+            subscription_id: cached[cache_key]
+            for subscription_id, cache_key in cache_keys.items()
+            if cached.get(cache_key) is not None
+        }
+
+        missing = [
+            subscription for subscription in subscriptions if subscription.id not in alert_rules
+        ]
+        if missing:
+            by_snuba_query = {
+                alert_rule.snuba_query_id: alert_rule
+                for alert_rule in AlertRule.objects.filter(
+                    snuba_query_id__in={subscription.snuba_query_id for subscription in missing}
+                )
+            }
+            to_cache = {}
+            for subscription in missing:
+                alert_rule = by_snuba_query.get(subscription.snuba_query_id)
+                if alert_rule is not None:
+                    alert_rules[subscription.id] = alert_rule
+                    to_cache[cache_keys[subscription.id]] = alert_rule
+            cache.set_many(to_cache, 3600)
+
+        return alert_rules
+
     @classmethod
     def clear_subscription_cache(cls, instance, **kwargs):
         cache.delete(cls.__build_subscription_cache_key(instance.id))
@@ -466,6 +504,36 @@ class AlertRuleTriggerManager(BaseManager):
             cache.set(cache_key, triggers, 3600)
         return triggers
 
+    def get_for_alert_rules(self, alert_rules):
+        """
+        Fetches the AlertRuleTriggers associated with many AlertRules at once. Attempts
+        to fetch from cache then hits the database with a single query.
+        :return: A dict mapping alert rule ids to a list of their `AlertRuleTrigger`s
+        """
+        cache_keys = {
+            alert_rule.id: self._build_trigger_cache_key(alert_rule.id)
+            for alert_rule in alert_rules
+        }
+        cached = cache.get_many(cache_keys.values())
+        triggers = {
+            alert_rule_id: cached[cache_key]
+            for alert_rule_id, cache_key in cache_keys.items()
+            if cached.get(cache_key) is not None
+        }
+
+        missing = [alert_rule_id for alert_rule_id in cache_keys if alert_rule_id not in triggers]
+        if missing:
+            for alert_rule_id in missing:
+                triggers[alert_rule_id] = []
+            for trigger in AlertRuleTrigger.objects.filter(alert_rule_id__in=missing):
+                triggers[trigger.alert_rule_id].append(trigger)
+            cache.set_many(
+                {cache_keys[alert_rule_id]: triggers[alert_rule_id] for alert_rule_id in missing},
+                3600,
+            )
+
+        return triggers
+
     @classmethod
     def clear_trigger_cache(cls, instance, **kwargs):
         cache.delete(cls._build_trigger_cache_key(instance.alert_rule_id))
@@ -70,21 +70,38 @@ class SubscriptionProcessor:
         AlertRuleThresholdType.BELOW: (operator.lt, operator.gt),
     }
 
-    def __init__(self, subscription):
+    def __init__(
+        self, subscription, alert_rule=None, triggers=None, alert_rule_stats=None, pipeline=None
+    ):
+        """
+        The alert rule, its triggers and their stats are loaded for the subscription
+        unless they're passed in, which allows them to be loaded in bulk for a batch of
+        updates (see `process_subscription_updates`). If `pipeline` is passed, stats
+        updates are added to it rather than being written immediately, and the caller
+        is responsible for executing it.
+        """
         self.subscription = subscription
-        try:
-            self.alert_rule = AlertRule.objects.get_for_subscription(subscription)
-        except AlertRule.DoesNotExist:
-            return
+        self.pipeline = pipeline
+        if alert_rule is None:
+            try:
+                alert_rule = AlertRule.objects.get_for_subscription(subscription)
+            except AlertRule.DoesNotExist:
+                return
+        self.alert_rule = alert_rule
 
-        self.triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
-        self.triggers.sort(key=lambda trigger: trigger.alert_threshold)
+        if triggers is None:
+            triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
+        self.triggers = sorted(triggers, key=lambda trigger: trigger.alert_threshold)
 
+        if alert_rule_stats is None:
+            alert_rule_stats = get_alert_rule_stats(
+                self.alert_rule, self.subscription, self.triggers
+            )
         (
             self.last_update,
             self.trigger_alert_counts,
             self.trigger_resolve_counts,
-        ) = get_alert_rule_stats(self.alert_rule, self.subscription, self.triggers)
+        ) = alert_rule_stats
         self.orig_trigger_alert_counts = deepcopy(self.trigger_alert_counts)
         self.orig_trigger_resolve_counts = deepcopy(self.trigger_resolve_counts)
 
@@ -665,8 +682,79 @@ class SubscriptionProcessor:
             self.last_update,
             updated_trigger_alert_counts,
             updated_trigger_resolve_counts,
+            pipeline=self.pipeline,
+        )
+
+
+def process_subscription_updates(subscription_updates):
+    """
+    Processes a batch of subscription updates. Alert rules, triggers and their stats
+    are loaded for all subscriptions at once, and stats are written back in a single
+    pipeline once the batch has been processed. Updates for the same subscription are
+    processed in order by the same `SubscriptionProcessor`.
+    :param subscription_updates: A list of `(subscription_update, subscription)` tuples
+    """
+    updates_by_subscription = {}
+    for subscription_update, subscription in subscription_updates:
+        updates_by_subscription.setdefault(subscription.id, (subscription, []))[1].append(
+            subscription_update
+        )
+    subscriptions = [subscription for subscription, _ in updates_by_subscription.values()]
+
+    with metrics.timer("incidents.subscription_processor.batch.load"):
+        alert_rules = AlertRule.objects.get_for_subscriptions(subscriptions)
+        triggers = AlertRuleTrigger.objects.get_for_alert_rules(set(alert_rules.values()))
+        with_alert_rule = [
+            (
+                subscription,
+                alert_rules[subscription.id],
+                sorted(
+                    triggers[alert_rules[subscription.id].id],
+                    key=lambda trigger: trigger.alert_threshold,
+                ),
+            )
+            for subscription in subscriptions
+            if subscription.id in alert_rules
+        ]
+        stats = get_alert_rule_stats_many(
+            [
+                (alert_rule, subscription, rule_triggers)
+                for subscription, alert_rule, rule_triggers in with_alert_rule
+            ]
         )
 
+    processors = {}
+    pipeline = get_redis_client().pipeline()
+    for (subscription, alert_rule, rule_triggers), alert_rule_stats in zip(with_alert_rule, stats):
+        processors[subscription.id] = SubscriptionProcessor(
+            subscription,
+            alert_rule=alert_rule,
+            triggers=rule_triggers,
+            alert_rule_stats=alert_rule_stats,
+            pipeline=pipeline,
+        )
+
+    try:
+        for subscription, updates in updates_by_subscription.values():
+            # Subscriptions without an alert rule are handled (and reported) by
+            # `process_update` itself.
+            processor = processors.get(subscription.id) or SubscriptionProcessor(subscription)
+            for subscription_update in updates:
+                try:
+                    processor.process_update(subscription_update)
+                except Exception:
+                    logger.exception(
+                        "Failed to process subscription update",
+                        extra={
+                            "subscription_id": subscription.id,
+                            "timestamp": subscription_update["timestamp"],
+                        },
+                    )
+    finally:
+        # Stats for updates that were processed must be written even if the batch
+        # was interrupted, see `process_update`.
+        pipeline.execute()
+
 
 def build_alert_rule_stat_keys(alert_rule, subscription):
     """
@@ -722,6 +810,38 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     alert_rule_keys = build_alert_rule_stat_keys(alert_rule, subscription)
     trigger_keys = build_trigger_stat_keys(alert_rule, subscription, triggers)
     results = get_redis_client().mget(alert_rule_keys + trigger_keys)
+    return _parse_alert_rule_stats(triggers, results)
+
+
+def get_alert_rule_stats_many(items):
+    """
+    Fetches stats about many alert rules in a single pipeline. See `get_alert_rule_stats`.
+    :param items: A list of `(alert_rule, subscription, triggers)` tuples
+    :return: A list with a stats tuple for each item, in the same order
+    """
+    if not items:
+        return []
+
+    # `MGET` can't be pipelined on a cluster, so queue one `GET` per key and regroup the
+    # results per item.
+    pipeline = get_redis_client().pipeline()
+    key_counts = []
+    for alert_rule, subscription, triggers in items:
+        keys = build_alert_rule_stat_keys(alert_rule, subscription) + build_trigger_stat_keys(
+            alert_rule, subscription, triggers
+        )
+        for key in keys:
+            pipeline.get(key)
+        key_counts.append(len(keys))
+
+    results = iter(pipeline.execute())
+    return [
+        _parse_alert_rule_stats(triggers, [next(results) for _ in range(key_count)])
+        for (_, _, triggers), key_count in zip(items, key_counts)
+    ]
+
+
+def _parse_alert_rule_stats(triggers, results):
     results = tuple(0 if result is None else int(result) for result in results)
     last_update = to_datetime(results[0])
     trigger_results = results[1:]
@@ -736,11 +856,17 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     return last_update, trigger_alert_counts, trigger_resolve_counts
 
 
-def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts, resolve_counts):
+def update_alert_rule_stats(
+    alert_rule, subscription, last_update, alert_counts, resolve_counts, pipeline=None
+):
     """
     Updates stats about the alert rule, subscription and triggers if they've changed.
+    If a `pipeline` is passed the updates are added to it, and it's up to the caller to
+    execute it.
     """
-    pipeline = get_redis_client().pipeline()
+    execute = pipeline is None
+    if pipeline is None:
+        pipeline = get_redis_client().pipeline()
 
     counts_with_stat_keys = zip(ALERT_RULE_TRIGGER_STAT_KEYS, (alert_counts, resolve_counts))
     for stat_key, trigger_counts in counts_with_stat_keys:
@@ -755,7 +881,8 @@ def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts,
 
     last_update_key = build_alert_rule_stat_keys(alert_rule, subscription)[0]
     pipeline.set(last_update_key, int(to_timestamp(last_update)), ex=REDIS_TTL)
-    pipeline.execute()
+    if execute:
+        pipeline.execute()
 
 
 def get_redis_client():
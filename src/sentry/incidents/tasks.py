@@ -17,7 +17,10 @@ from sentry.incidents.models import (
 )
 from sentry.models import Project
 from sentry.snuba.models import QueryDatasets
-from sentry.snuba.query_subscription_consumer import register_subscriber
+from sentry.snuba.query_subscription_consumer import (
+    register_batch_subscriber,
+    register_subscriber,
+)
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics
 from sentry.utils.email import MessageBuilder
@@ -148,6 +151,19 @@ def handle_snuba_query_update(subscription_update, subscription):
         SubscriptionProcessor(subscription).process_update(subscription_update)
 
 
+@register_batch_subscriber(INCIDENTS_SNUBA_SUBSCRIPTION_TYPE)
+def handle_snuba_query_updates(subscription_updates):
+    """
+    Handles a batch of subscription updates for `QuerySubscription`s.
+    :param subscription_updates: list of `(subscription_update, subscription)` tuples, as
+    passed to `handle_snuba_query_update`
+    """
+    from sentry.incidents.subscription_processor import process_subscription_updates
+
+    with metrics.timer("incidents.subscription_procesor.process_updates"):
+        process_subscription_updates(subscription_updates)
+
+
 @instrumented_task(
     name="sentry.incidents.tasks.handle_trigger_action",
     queue="incidents",
@@ -1,7 +1,9 @@
 import functools
 import logging
 import random
+import threading
 import time
+import zlib
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
     Any,
@@ -56,9 +58,87 @@ class AsyncResult(NamedTuple):  # TODO: Use Generic[T] with 3.7+
 Message = Any
 
 
+class ShardedExecutor:
+    """
+    Runs work on a fixed number of single-threaded shards.
+
+    Work is routed to a shard by a key, and every shard executes its work in
+    submission order. This allows all messages belonging to the same event to
+    be processed in order (attachment chunks before the attachment or event
+    that references them), while messages for unrelated events are processed
+    in parallel.
+
+    Each shard has a limit of in-flight work items. Submitting to a shard that
+    is at its limit blocks the caller until the shard has caught up, which
+    pushes back on the Kafka poll loop instead of buffering an unbounded
+    amount of messages in memory.
+    """
+
+    def __init__(self, num_shards: int, max_in_flight_per_shard: int = 100) -> None:
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        if max_in_flight_per_shard < 1:
+            raise ValueError("max_in_flight_per_shard must be at least 1")
+
+        self.__shards = [
+            ThreadPoolExecutor(1, thread_name_prefix=f"ingest-consumer-shard-{i}")
+            for i in range(num_shards)
+        ]
+        self.__in_flight = [
+            threading.BoundedSemaphore(max_in_flight_per_shard) for _ in range(num_shards)
+        ]
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.__shards)
+
+    def get_shard(self, key: str) -> int:
+        # ``hash`` is salted per process, use a stable hash so that routing
+        # is reproducible.
+        return zlib.crc32(key.encode("utf-8")) % len(self.__shards)
+
+    def submit(self, key: str, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        shard = self.get_shard(key)
+        in_flight = self.__in_flight[shard]
+
+        if not in_flight.acquire(blocking=False):
+            metrics.incr("ingest_consumer.sharded.backpressure", tags={"shard": str(shard)})
+            with metrics.timer("ingest_consumer.sharded.backpressure_wait"):
+                in_flight.acquire()
+
+        try:
+            future = self.__shards[shard].submit(fn, *args)
+        except BaseException:
+            in_flight.release()
+            raise
+
+        future.add_done_callback(lambda _: in_flight.release())
+        return future
+
+    def shutdown(self) -> None:
+        for shard in self.__shards:
+            shard.shutdown()
+
+
+def get_shard_key(message: Message) -> str:
+    """
+    Returns the key used to route a message to a shard. All messages for the
+    same event share a key so that their relative order is kept.
+    """
+    return f"{message['project_id']}:{message.get('event_id')}"
+
+
 class IngestConsumerWorker(AbstractBatchWorker):
-    def __init__(self, process_event_executor: Optional[ThreadPoolExecutor] = None) -> None:
+    def __init__(
+        self,
+        process_event_executor: Optional[ThreadPoolExecutor] = None,
+        sharded_executor: Optional[ShardedExecutor] = None,
+    ) -> None:
+        if process_event_executor is not None and sharded_executor is not None:
+            raise ValueError("process_event_executor and sharded_executor are mutually exclusive")
+
         self.__process_event_executor = process_event_executor
+        self.__sharded_executor = sharded_executor
         if self.__process_event_executor is None:
             self.__process_event = process_event
         else:
@@ -118,6 +198,12 @@ class IngestConsumerWorker(AbstractBatchWorker):
         with metrics.timer("ingest_consumer.fetch_projects"):
             projects = {p.id: p for p in Project.objects.get_many_from_cache(projects_to_fetch)}
 
+        if self.__sharded_executor is not None:
+            self._process_sharded(
+                self.__sharded_executor, attachment_chunks, other_messages, projects
+            )
+            return
+
         if attachment_chunks:
             # attachment_chunk messages need to be processed before attachment/event messages.
             with metrics.timer("ingest_consumer.process_attachment_chunk_batch"):
@@ -148,9 +234,48 @@ class IngestConsumerWorker(AbstractBatchWorker):
                     (time.monotonic() - other_messages_flush_start) / len(other_messages),
                 )
 
+    def _process_sharded(
+        self,
+        executor: ShardedExecutor,
+        attachment_chunks: Sequence[Message],
+        other_messages: Sequence[Tuple[Callable[[Message, Mapping[int, Project]], Any], Message]],
+        projects: Mapping[int, Project],
+    ) -> None:
+        if not attachment_chunks and not other_messages:
+            return
+
+        with metrics.timer("ingest_consumer.process_sharded_batch"):
+            futures: MutableSequence["Future[Any]"] = []
+
+            # Shards execute in submission order, so submitting all chunks
+            # first guarantees that they are stored before the attachment or
+            # event for the same event id is processed.
+            for attachment_chunk in attachment_chunks:
+                futures.append(
+                    executor.submit(
+                        get_shard_key(attachment_chunk),
+                        process_attachment_chunk,
+                        attachment_chunk,
+                        projects,
+                    )
+                )
+
+            for processing_func, message in other_messages:
+                futures.append(
+                    executor.submit(get_shard_key(message), processing_func, message, projects)
+                )
+
+            # Wait for the entire batch before returning so that offsets are
+            # only committed for messages that have been processed. Errors
+            # are re-raised on the main thread.
+            for future in as_completed(futures):
+                future.result()
+
     def shutdown(self):
         if self.__process_event_executor is not None:
             self.__process_event_executor.shutdown()
+        if self.__sharded_executor is not None:
+            self.__sharded_executor.shutdown()
 
 
 def trace_func(**span_kwargs):
@@ -423,7 +548,11 @@ def process_userreport(message, projects) -> None:
 
 
 def get_ingest_consumer(
-    consumer_types, once=False, executor: Optional[ThreadPoolExecutor] = None, **options
+    consumer_types,
+    once=False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    sharded_executor: Optional[ShardedExecutor] = None,
+    **options,
 ):
     """
     Handles events coming via a kafka queue.
@@ -432,5 +561,7 @@ def get_ingest_consumer(
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
+        topic_names=topic_names,
+        worker=IngestConsumerWorker(executor, sharded_executor=sharded_executor),
+        **options,
     )
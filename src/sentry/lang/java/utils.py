@@ -0,0 +1,88 @@
+import os
+import time
+
+from symbolic import ProguardMapper  # type: ignore
+
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
+
+# How often the modification time of a cached mapping file is refreshed.
+# ``DIFCache.clear_old_entries`` removes files that have not been modified for
+# a day and a half, so files of mappers that are still in use must be touched
+# well within that window.
+TOUCH_INTERVAL = 60 * 60
+
+
+class _CachedMapper:
+    __slots__ = ("mapper", "inode", "touched")
+
+    def __init__(self, mapper, inode, touched):
+        self.mapper = mapper
+        self.inode = inode
+        self.touched = touched
+
+
+class ProguardMapperCache:
+    """
+    An in-process LRU of opened proguard mappers, keyed by the path of the
+    mapping file in the DIF cache (which contains the debug id) and bounded
+    by the total size of the mapping files.
+
+    The files are shared with ``DIFCache.clear_old_entries``, which may run in
+    another process. Files backing cached mappers are touched periodically so
+    they are not considered stale, and a mapper is reopened when its file has
+    been removed or replaced in the meantime.
+    """
+
+    def __init__(self):
+        self._lru = LRUCache()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def open(self, path):
+        max_bytes = options.get("processing.proguard-mapper-cache.max-bytes")
+        if not max_bytes:
+            return ProguardMapper.open(path)
+
+        stat = os.stat(path)
+        now = time.time()
+        entry = self._lru.get(path)
+        if entry is not None and entry.inode != stat.st_ino:
+            self._lru.delete(path)
+            entry = None
+
+        if entry is not None:
+            metrics.incr("proguard.mapper_cache.hit")
+            if now - entry.touched > TOUCH_INTERVAL:
+                entry.touched = now
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+            return entry.mapper
+
+        metrics.incr("proguard.mapper_cache.miss")
+        mapper = ProguardMapper.open(path)
+        evicted = self._lru.set(
+            path,
+            _CachedMapper(mapper, stat.st_ino, now),
+            weight=stat.st_size,
+            max_weight=max_bytes,
+        )
+        if evicted:
+            metrics.incr("proguard.mapper_cache.evict", amount=evicted)
+        return mapper
+
+    def clear(self):
+        self._lru.clear()
+
+
+proguard_mapper_cache = ProguardMapperCache()
+
+
+def open_proguard_mapper(path):
+    """Opens the proguard mapping file at ``path`` from the DIF cache,
+    reusing a mapper opened earlier by this process if possible."""
+    return proguard_mapper_cache.open(path)
@@ -1,8 +1,10 @@
 from symbolic import SourceView
 
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedArtifactCache"]
 
 
 def is_utf8(codec):
@@ -90,3 +92,49 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ParsedArtifactCache:
+    """
+    A process-wide LRU cache of parsed sources and source maps.
+
+    ``SourceCache`` and ``SourceMapCache`` only live for a single event. This
+    cache keeps the parsed ``SourceView`` and ``SourceMapView`` objects around
+    for other events of the same release processed by this worker, so that
+    they don't need to be fetched, decompressed and parsed again.
+
+    Entries are accounted for by the size of the payload they were parsed
+    from. The least recently used entries are evicted once the total size
+    exceeds ``max_size``, and entries expire after ``ttl`` seconds so that
+    re-uploaded artifacts are picked up.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lru = LRUCache()
+
+    def __len__(self):
+        return len(self._lru)
+
+    @property
+    def size(self):
+        return self._lru.weight
+
+    def get(self, key):
+        value = self._lru.get(key)
+        metrics.incr(
+            "sourcemaps.parsed_cache",
+            tags={"cache": self.name, "result": "miss" if value is None else "hit"},
+            sample_rate=0.1,
+        )
+        return value
+
+    def set(self, key, value, size, max_size, ttl):
+        evicted = self._lru.set(key, value, weight=size, ttl=ttl, max_weight=max_size)
+        if evicted:
+            metrics.incr(
+                "sourcemaps.parsed_cache.evicted", amount=evicted, tags={"cache": self.name}
+            )
+
+    def clear(self):
+        self._lru.clear()
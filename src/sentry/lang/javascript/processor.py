@@ -21,7 +21,13 @@ from symbolic import SourceMapView
 from sentry import http, options
 from sentry.interfaces.stacktrace import Stacktrace
 from sentry.models import EventError, Organization, ReleaseFile
-from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, ReleaseArchive, read_artifact_index
+from sentry.models.releasefile import (
+    ARTIFACT_INDEX_FILENAME,
+    ReleaseArchive,
+    ZipTailFile,
+    read_artifact_index,
+    read_zip_tail,
+)
 from sentry.stacktraces.processing import StacktraceProcessor
 from sentry.utils import json, metrics
 
@@ -36,7 +42,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import ParsedArtifactCache, SourceCache, SourceMapCache
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -220,6 +226,10 @@ def get_release_file_cache_key_meta(release_id, releasefile_ident):
     return "meta:%s" % get_release_file_cache_key(release_id, releasefile_ident)
 
 
+def get_release_archive_tail_cache_key(release_id, releasefile_ident):
+    return f"releasefile-tail:v1:{release_id}:{releasefile_ident}"
+
+
 MAX_FETCH_ATTEMPTS = 3
 
 
@@ -458,6 +468,9 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
     # TODO(jjbayer): Could already extract filename from info and return
     # it later
 
+    if options.get("releasefile.ranged-archive-reads"):
+        return fetch_ranged_release_archive(release, dist, archive_ident)
+
     cache_key = get_release_file_cache_key(release_id=release.id, releasefile_ident=archive_ident)
 
     result = cache.get(cache_key)
@@ -467,52 +480,108 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
     elif result:
         return BytesIO(result)
     else:
-        try:
-            with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_releasefile_db_entry"):
-                qs = ReleaseFile.objects.filter(
-                    release_id=release.id, dist_id=dist.id if dist else dist, ident=archive_ident
-                ).select_related("file")
-                releasefile = qs[0]
-        except IndexError:
-            # This should not happen when there is an archive_ident in the manifest
-            logger.error("sourcemaps.missing_archive", exc_info=sys.exc_info())
+        releasefile = get_release_archive_file(release, dist, archive_ident)
+        if releasefile is None:
             # Cache as nonexistent:
             cache.set(cache_key, -1, 60)
             return None
-        else:
-            try:
-                with sentry_sdk.start_span(op="fetch_release_archive_for_url.fetch_releasefile"):
-                    if releasefile.file.size <= options.get("releasefile.cache-max-archive-size"):
-                        getfile = lambda: ReleaseFile.cache.getfile(releasefile)
-                    else:
-                        # For very large ZIP archives, pulling the entire file into cache takes too long.
-                        # Only the blobs required to extract the current artifact (central directory and the file entry itself)
-                        # should be loaded in this case.
-                        getfile = releasefile.file.getfile
 
-                    file_ = fetch_retry_policy(getfile)
-            except Exception:
-                logger.error("sourcemaps.read_archive_failed", exc_info=sys.exc_info())
+        try:
+            with sentry_sdk.start_span(op="fetch_release_archive_for_url.fetch_releasefile"):
+                if releasefile.file.size <= options.get("releasefile.cache-max-archive-size"):
+                    getfile = lambda: ReleaseFile.cache.getfile(releasefile)
+                else:
+                    # For very large ZIP archives, pulling the entire file into cache takes too long.
+                    # Only the blobs required to extract the current artifact (central directory and the file entry itself)
+                    # should be loaded in this case.
+                    getfile = releasefile.file.getfile
 
-                return None
+                file_ = fetch_retry_policy(getfile)
+        except Exception:
+            logger.error("sourcemaps.read_archive_failed", exc_info=sys.exc_info())
 
-            # `cache.set` will only keep values up to a certain size,
-            # so we should not read the entire file if it's too large for caching
-            if CACHE_MAX_VALUE_SIZE is not None and file_.size > CACHE_MAX_VALUE_SIZE:
+            return None
 
-                return file_
+        # `cache.set` will only keep values up to a certain size,
+        # so we should not read the entire file if it's too large for caching
+        if CACHE_MAX_VALUE_SIZE is not None and file_.size > CACHE_MAX_VALUE_SIZE:
 
-            with sentry_sdk.start_span(op="fetch_release_archive_for_url.read_for_caching") as span:
-                span.set_data("file_size", file_.size)
-                contents = file_.read()
-            with sentry_sdk.start_span(op="fetch_release_archive_for_url.write_to_cache") as span:
-                span.set_data("file_size", len(contents))
-                cache.set(cache_key, contents, 3600)
+            return file_
 
-            file_.seek(0)
+        with sentry_sdk.start_span(op="fetch_release_archive_for_url.read_for_caching") as span:
+            span.set_data("file_size", file_.size)
+            contents = file_.read()
+        with sentry_sdk.start_span(op="fetch_release_archive_for_url.write_to_cache") as span:
+            span.set_data("file_size", len(contents))
+            cache.set(cache_key, contents, 3600)
+
+        file_.seek(0)
+
+        return file_
+
+
+def get_release_archive_file(release, dist, archive_ident) -> Optional[ReleaseFile]:
+    try:
+        with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_releasefile_db_entry"):
+            qs = ReleaseFile.objects.filter(
+                release_id=release.id, dist_id=dist.id if dist else dist, ident=archive_ident
+            ).select_related("file")
+            return qs[0]
+    except IndexError:
+        # This should not happen when there is an archive_ident in the manifest
+        logger.error("sourcemaps.missing_archive", exc_info=sys.exc_info())
+        return None
+
+
+def fetch_ranged_release_archive(release, dist, archive_ident) -> Optional[IO]:
+    """Open a release archive without downloading it.
+
+    The central directory of the archive is cached, so that only the blobs
+    containing the requested member are fetched from file storage. This keeps
+    the cost of a lookup independent of the size of the archive.
+
+    If return value is not empty, the caller is responsible for closing the stream.
+    """
+    cache_key = get_release_archive_tail_cache_key(release.id, archive_ident)
+    tail = cache.get(cache_key)
+    if tail == -1:
+        return None
+
+    releasefile = get_release_archive_file(release, dist, archive_ident)
+    if releasefile is None:
+        cache.set(cache_key, -1, 60)
+        return None
 
+    try:
+        with sentry_sdk.start_span(op="fetch_release_archive_for_url.fetch_releasefile"):
+            file_ = fetch_retry_policy(releasefile.file.getfile)
+    except Exception:
+        logger.error("sourcemaps.read_archive_failed", exc_info=sys.exc_info())
+        return None
+
+    size = releasefile.file.size
+    metrics.incr(
+        "sourcemaps.release_archive_tail",
+        tags={"result": "hit" if tail else "miss"},
+        sample_rate=0.1,
+    )
+    if not tail:
+        try:
+            with sentry_sdk.start_span(op="fetch_release_archive_for_url.read_zip_tail") as span:
+                span.set_data("file_size", size)
+                tail = read_zip_tail(file_, size)
+        except Exception:
+            # Not a valid archive. Hand out the plain file so the caller
+            # reports the error.
+            logger.warning("sourcemaps.read_archive_tail_failed", exc_info=sys.exc_info())
+            file_.seek(0)
             return file_
 
+        if CACHE_MAX_VALUE_SIZE is None or len(tail) <= CACHE_MAX_VALUE_SIZE:
+            cache.set(cache_key, tail, 3600)
+
+    return ZipTailFile(file_, size, tail)
+
 
 def compress(fp: IO) -> Tuple[bytes, bytes]:
     """Alternative for compress_file when fp does not support chunks"""
@@ -740,28 +809,38 @@ def get_max_age(headers):
 
 
 def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=True):
+    body = fetch_sourcemap_body(
+        url, project=project, release=release, dist=dist, allow_scraping=allow_scraping
+    )
+    return parse_sourcemap(url, body)
+
+
+def fetch_sourcemap_body(url, project=None, release=None, dist=None, allow_scraping=True):
     if is_data_uri(url):
         try:
-            body = base64.b64decode(
+            return base64.b64decode(
                 force_bytes(url[BASE64_PREAMBLE_LENGTH:])
                 + (b"=" * (-(len(url) - BASE64_PREAMBLE_LENGTH) % 4))
             )
         except TypeError as e:
             raise UnparseableSourcemap({"url": "<base64>", "reason": str(e)})
-    else:
-        # look in the database and, if not found, optionally try to scrape the web
-        with sentry_sdk.start_span(
-            op="JavaScriptStacktraceProcessor.fetch_sourcemap.fetch_file"
-        ) as span:
-            span.set_data("url", url)
-            result = fetch_file(
-                url,
-                project=project,
-                release=release,
-                dist=dist,
-                allow_scraping=allow_scraping,
-            )
-        body = result.body
+
+    # look in the database and, if not found, optionally try to scrape the web
+    with sentry_sdk.start_span(
+        op="JavaScriptStacktraceProcessor.fetch_sourcemap.fetch_file"
+    ) as span:
+        span.set_data("url", url)
+        result = fetch_file(
+            url,
+            project=project,
+            release=release,
+            dist=dist,
+            allow_scraping=allow_scraping,
+        )
+    return result.body
+
+
+def parse_sourcemap(url, body):
     try:
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
@@ -773,6 +852,12 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
 
+# Parsed sources and source maps shared between events in this process, see
+# ``JavaScriptStacktraceProcessor.cache_source``.
+parsed_source_cache = ParsedArtifactCache("source")
+parsed_sourcemap_cache = ParsedArtifactCache("sourcemap")
+
+
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
 
@@ -1154,68 +1239,119 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
             return
 
-        # TODO: respect cache-control/max-age headers to some extent
-        logger.debug("Attempting to cache source %r", filename)
-        try:
-            # this both looks in the database and tries to scrape the internet
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
-            ) as span:
-                span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
-        except http.BadSource as exc:
-            # most people don't upload release artifacts for their third-party libraries,
-            # so ignore missing node_modules files
-            if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
-                pass
-            else:
-                cache.add_error(filename, exc.data)
+        parsed_cache_size = options.get("sourcemaps.parsed-cache-size")
+        parsed_cache_ttl = options.get("sourcemaps.parsed-cache-ttl")
+        parsed_cache_key = None
+        if parsed_cache_size and self.release:
+            # Scraping depends on project settings, so entries are not shared
+            # between projects of the same release.
+            parsed_cache_key = (
+                self.project.id,
+                self.release.id,
+                self.dist and self.dist.name or None,
+            )
 
-            # either way, there's no more for us to do here, since we don't have
-            # a valid file to cache
-            return
-        cache.add(filename, result.body, result.encoding)
-        cache.alias(result.url, filename)
+        cached_source = None
+        if parsed_cache_key is not None:
+            cached_source = parsed_source_cache.get(parsed_cache_key + (filename,))
+
+        if cached_source is not None:
+            source_view, result_url, sourcemap_url = cached_source
+            cache.add(filename, source_view)
+            cache.alias(result_url, filename)
+        else:
+            # TODO: respect cache-control/max-age headers to some extent
+            logger.debug("Attempting to cache source %r", filename)
+            try:
+                # this both looks in the database and tries to scrape the internet
+                with sentry_sdk.start_span(
+                    op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+                ) as span:
+                    span.set_data("filename", filename)
+                    result = fetch_file(
+                        filename,
+                        project=self.project,
+                        release=self.release,
+                        dist=self.dist,
+                        allow_scraping=self.allow_scraping,
+                    )
+            except http.BadSource as exc:
+                # most people don't upload release artifacts for their third-party libraries,
+                # so ignore missing node_modules files
+                if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
+                    pass
+                else:
+                    cache.add_error(filename, exc.data)
+
+                # either way, there's no more for us to do here, since we don't have
+                # a valid file to cache
+                return
+            cache.add(filename, result.body, result.encoding)
+            cache.alias(result.url, filename)
+
+            sourcemap_url = discover_sourcemap(result)
+
+            if parsed_cache_key is not None:
+                parsed_source_cache.set(
+                    parsed_cache_key + (filename,),
+                    (cache.get(filename), result.url, sourcemap_url),
+                    size=len(result.body),
+                    max_size=parsed_cache_size,
+                    ttl=parsed_cache_ttl,
+                )
 
-        sourcemap_url = discover_sourcemap(result)
         if not sourcemap_url:
             return
 
-        logger.debug(
-            "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
-        )
+        logger.debug("Found sourcemap URL %r for minified script %r", sourcemap_url[:256], filename)
         sourcemaps.link(filename, sourcemap_url)
         if sourcemap_url in sourcemaps:
             return
 
-        # pull down sourcemap
-        try:
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
-            ) as span:
-                span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
+        # Inline source maps are parsed from the (cached) source itself and
+        # their URLs would make for very large keys.
+        if parsed_cache_key is not None and not is_data_uri(sourcemap_url):
+            sourcemap_cache_key = parsed_cache_key + (sourcemap_url,)
+        else:
+            sourcemap_cache_key = None
+
+        sourcemap_view = None
+        if sourcemap_cache_key is not None:
+            sourcemap_view = parsed_sourcemap_cache.get(sourcemap_cache_key)
+
+        if sourcemap_view is None:
+            # pull down sourcemap
+            try:
+                with sentry_sdk.start_span(
+                    op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
+                ) as span:
+                    span.set_data("sourcemap_url", sourcemap_url)
+                    sourcemap_body = fetch_sourcemap_body(
+                        sourcemap_url,
+                        project=self.project,
+                        release=self.release,
+                        dist=self.dist,
+                        allow_scraping=self.allow_scraping,
+                    )
+                    sourcemap_view = parse_sourcemap(sourcemap_url, sourcemap_body)
+            except http.BadSource as exc:
+                # we don't perform the same check here as above, because if someone has
+                # uploaded a node_modules file, which has a sourceMappingURL, they
+                # presumably would like it mapped (and would like to know why it's not
+                # working, if that's the case). If they're not looking for it to be
+                # mapped, then they shouldn't be uploading the source file in the
+                # first place.
+                cache.add_error(filename, exc.data)
+                return
+
+            if sourcemap_cache_key is not None:
+                parsed_sourcemap_cache.set(
+                    sourcemap_cache_key,
+                    sourcemap_view,
+                    size=len(sourcemap_body),
+                    max_size=parsed_cache_size,
+                    ttl=parsed_cache_ttl,
                 )
-        except http.BadSource as exc:
-            # we don't perform the same check here as above, because if someone has
-            # uploaded a node_modules file, which has a sourceMappingURL, they
-            # presumably would like it mapped (and would like to know why it's not
-            # working, if that's the case). If they're not looking for it to be
-            # mapped, then they shouldn't be uploading the source file in the
-            # first place.
-            cache.add_error(filename, exc.data)
-            return
 
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.cache_source.cache_sourcemap_view"
@@ -1,7 +1,67 @@
 from django.db import models
 from django.utils import timezone
 
-from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model, sane_repr
+from sentry.db.models import (
+    BaseManager,
+    BoundedPositiveIntegerField,
+    FlexibleForeignKey,
+    Model,
+    sane_repr,
+)
+
+
+class DistributionManager(BaseManager):
+    def get_or_create_many(self, dists):
+        """
+        Bulk version of `Release.add_dist`. Takes a dict mapping `(release,
+        name)` to the `date_added` for new dists, and returns a dict mapping
+        `(release.id, name)` to dists.
+
+        Existing dists are fetched with a single query and missing ones are
+        inserted at once, ignoring rows that were inserted concurrently.
+        """
+        if not dists:
+            return {}
+
+        releases = {release.id: release for release, _ in dists}
+        names = {name for _, name in dists}
+
+        def fetch(release_ids, names):
+            return {
+                (dist.release_id, dist.name): dist
+                for dist in self.filter(release_id__in=release_ids, name__in=names)
+            }
+
+        rv = fetch(releases.keys(), names)
+        missing = [
+            (release, name, date_added)
+            for (release, name), date_added in dists.items()
+            if (release.id, name) not in rv
+        ]
+        if missing:
+            self.bulk_create(
+                [
+                    Distribution(
+                        release=release,
+                        name=name,
+                        organization_id=release.organization_id,
+                        date_added=date_added or timezone.now(),
+                    )
+                    for release, name, date_added in missing
+                ],
+                ignore_conflicts=True,
+            )
+            # Rows that were ignored due to conflicts have no id, read them all back.
+            rv.update(
+                fetch({release.id for release, _, _ in missing}, {name for _, name, _ in missing})
+            )
+
+        # Names are fetched for all releases, drop the pairs that weren't asked for.
+        rv = {(release.id, name): rv[(release.id, name)] for release, name in dists}
+        # Keep the release instances that were passed in, like `add_dist` does.
+        for dist in rv.values():
+            dist.release = releases[dist.release_id]
+        return rv
 
 
 class Distribution(Model):
@@ -12,6 +72,8 @@ class Distribution(Model):
     name = models.CharField(max_length=64)
     date_added = models.DateTimeField(default=timezone.now)
 
+    objects = DistributionManager()
+
     class Meta:
         app_label = "sentry"
         db_table = "sentry_distribution"
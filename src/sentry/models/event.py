@@ -1,6 +1,7 @@
 from sentry_relay.processing import StoreNormalizer
 
 from sentry.db.models import NodeData
+from sentry.nodestore.base import SectionedNodeData
 from sentry.utils.canonical import CanonicalKeyDict
 
 
@@ -12,10 +13,14 @@ class EventDict(CanonicalKeyDict):
     This is used as a wrapper type for `Event.data` such that creating an event
     object (or loading it from the DB) will ensure the data fits the type
     schema.
+
+    Payloads stored with sections (see `SENTRY_NODESTORE_SECTIONED_ENCODING`)
+    are only written from normalized events and are not re-normalized, so that
+    their sections are decoded on first access only.
     """
 
     def __init__(self, data, skip_renormalization=False, **kwargs):
-        is_renormalized = isinstance(data, EventDict) or (
+        is_renormalized = isinstance(data, (EventDict, SectionedNodeData)) or (
             isinstance(data, NodeData) and isinstance(data.data, EventDict)
         )
 
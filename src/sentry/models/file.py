@@ -3,6 +3,7 @@ import mmap
 import os
 import tempfile
 import time
+from bisect import bisect_right
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from hashlib import sha1
@@ -493,6 +494,8 @@ class ChunkedFileBlobIndexWrapper:
     def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
+        self._offsets = [idx.offset for idx in self._indexes]
+        self._size = sum(idx.blob.size for idx in self._indexes)
         self._curfile = None
         self._curidx = None
         if prefetch:
@@ -534,7 +537,7 @@ class ChunkedFileBlobIndexWrapper:
 
     @property
     def size(self):
-        return sum(i.blob.size for i in self._indexes)
+        return self._size
 
     def open(self):
         self.closed = False
@@ -590,14 +593,14 @@ class ChunkedFileBlobIndexWrapper:
             # Empty file, there's no seeking to be done.
             return
 
-        for n, idx in enumerate(self._indexes[::-1]):
-            if idx.offset <= pos:
-                if idx != self._curidx:
-                    self._idxiter = iter(self._indexes[-(n + 1) :])
-                    self._nextidx()
-                break
-        else:
+        # Only the blob containing ``pos`` is opened, which allows reading
+        # small ranges of large files without fetching all of their blobs.
+        n = bisect_right(self._offsets, pos) - 1
+        if n < 0:
             raise ValueError("Cannot seek to pos")
+        if self._indexes[n] != self._curidx:
+            self._idxiter = iter(self._indexes[n:])
+            self._nextidx()
         self._curfile.seek(pos - self._curidx.offset)
 
     def seek(self, pos, whence=io.SEEK_SET):
@@ -1,7 +1,85 @@
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
-from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model
+from sentry import options
+from sentry.db.models import BaseManager, BoundedPositiveIntegerField, FlexibleForeignKey, Model
+from sentry.utils.cache import cache
+
+
+class GroupHashManager(BaseManager):
+    CACHE_KEY = "grouphash:%s:%s"
+
+    @classmethod
+    def _build_cache_key(cls, project_id, hash):
+        return cls.CACHE_KEY % (project_id, hash)
+
+    def get_or_create_many(self, project, hashes, prefetch_hashes=()):
+        """
+        Bulk version of `get_or_create(project=project, hash=hash)`. Existing hashes are
+        fetched with a single query and missing ones are inserted at once, ignoring rows
+        that were inserted concurrently.
+
+        Existing rows for `prefetch_hashes` are fetched with the same query, but missing
+        ones aren't created.
+
+        If `store.grouphash-cache-ttl` is set, hashes that are assigned to a group are
+        cached for that many seconds. Saving or deleting a `GroupHash` drops its cache
+        entry, code that changes rows through queryset updates must call
+        `invalidate_cache` after the update.
+        :return: A dict mapping hashes to their `GroupHash`
+        """
+        to_create = set(hashes)
+        to_fetch = to_create | set(prefetch_hashes)
+        if not to_fetch:
+            return {}
+
+        cache_ttl = options.get("store.grouphash-cache-ttl")
+        grouphashes = {}
+        if cache_ttl:
+            cached = cache.get_many([self._build_cache_key(project.id, h) for h in to_fetch])
+            grouphashes = {grouphash.hash: grouphash for grouphash in cached.values()}
+
+        fetched = {
+            grouphash.hash: grouphash
+            for grouphash in self.filter(project=project, hash__in=to_fetch - grouphashes.keys())
+        }
+
+        missing = to_create - grouphashes.keys() - fetched.keys()
+        if missing:
+            self.bulk_create(
+                [GroupHash(project=project, hash=hash) for hash in missing], ignore_conflicts=True
+            )
+            # Rows that were ignored due to conflicts have no id, read them all back.
+            fetched.update(
+                (grouphash.hash, grouphash)
+                for grouphash in self.filter(project=project, hash__in=missing)
+            )
+
+        if cache_ttl:
+            cache.set_many(
+                {
+                    self._build_cache_key(project.id, hash): grouphash
+                    for hash, grouphash in fetched.items()
+                    if grouphash.group_id is not None
+                },
+                cache_ttl,
+            )
+
+        grouphashes.update(fetched)
+        return grouphashes
+
+    def invalidate_cache(self, project_id, hashes):
+        """
+        Drops the cached rows of the given hashes, see `get_or_create_many`.
+        """
+        if hashes:
+            cache.delete_many([self._build_cache_key(project_id, hash) for hash in hashes])
+
+    def post_save(self, instance, **kwargs):
+        self.invalidate_cache(instance.project_id, [instance.hash])
+
+    def post_delete(self, instance, **kwargs):
+        self.invalidate_cache(instance.project_id, [instance.hash])
 
 
 class GroupHash(Model):
@@ -24,6 +102,8 @@ class GroupHash(Model):
         choices=[(State.LOCKED_IN_MIGRATION, _("Locked (Migration in Progress)"))], null=True
     )
 
+    objects = GroupHashManager()
+
     class Meta:
         app_label = "sentry"
         db_table = "sentry_grouphash"
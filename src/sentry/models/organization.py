@@ -161,7 +161,7 @@ class Organization(Model):
         default=1,
     )
 
-    objects = OrganizationManager(cache_fields=("pk", "slug"))
+    objects = OrganizationManager(cache_fields=("pk", "slug"), l1_cache_ttl=10)
 
     class Meta:
         app_label = "sentry"
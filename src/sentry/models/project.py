@@ -139,7 +139,7 @@ class Project(Model, PendingDeletionMixin):
         null=True,
     )
 
-    objects = ProjectManager(cache_fields=["pk"])
+    objects = ProjectManager(cache_fields=["pk"], l1_cache_ttl=10)
     platform = models.CharField(max_length=64, null=True)
 
     class Meta:
@@ -594,8 +594,6 @@ class Release(Model):
 
     @classmethod
     def _get_or_create_impl(cls, project, version, date_added, metric_tags):
-        from sentry.models import Project
-
         if date_added is None:
             date_added = timezone.now()
 
@@ -622,26 +620,7 @@ class Release(Model):
                     release = releases[0]
                 metric_tags["created"] = "false"
             else:
-                try:
-                    with atomic_transaction(using=router.db_for_write(cls)):
-                        release = cls.objects.create(
-                            organization_id=project.organization_id,
-                            version=version,
-                            date_added=date_added,
-                            total_deploys=0,
-                        )
-
-                    metric_tags["created"] = "true"
-                except IntegrityError:
-                    metric_tags["created"] = "false"
-                    release = cls.objects.get(
-                        organization_id=project.organization_id, version=version
-                    )
-
-                release.add_project(project)
-                if not project.flags.has_releases:
-                    project.flags.has_releases = True
-                    project.update(flags=F("flags").bitor(Project.flags.has_releases))
+                release = cls._create_for_project(project, version, date_added, metric_tags)
 
             # TODO(dcramer): upon creating a new release, check if it should be
             # the new "latest release" for this project
@@ -652,6 +631,95 @@ class Release(Model):
 
         return release
 
+    @classmethod
+    def _create_for_project(cls, project, version, date_added, metric_tags):
+        from sentry.models import Project
+
+        try:
+            with atomic_transaction(using=router.db_for_write(cls)):
+                release = cls.objects.create(
+                    organization_id=project.organization_id,
+                    version=version,
+                    date_added=date_added,
+                    total_deploys=0,
+                )
+
+            metric_tags["created"] = "true"
+        except IntegrityError:
+            metric_tags["created"] = "false"
+            release = cls.objects.get(organization_id=project.organization_id, version=version)
+
+        release.add_project(project)
+        if not project.flags.has_releases:
+            project.flags.has_releases = True
+            project.update(flags=F("flags").bitor(Project.flags.has_releases))
+
+        return release
+
+    @classmethod
+    def get_or_create_many(cls, releases):
+        """
+        Bulk version of `get_or_create`. Takes a dict mapping `(project,
+        version)` to the `date_added` for new releases, and returns a dict
+        mapping `(project.id, version)` to releases.
+
+        Cached releases are fetched with one multi-get and the rest with a
+        single query. Missing releases are created one by one through the
+        same path as `get_or_create`, since their model signals have to run.
+        """
+        with metrics.timer("models.release.get_or_create_many") as metric_tags:
+            cache_keys = {
+                (project, version): cls.get_cache_key(project.organization_id, version)
+                for project, version in releases
+            }
+            cached = cache.get_many(set(cache_keys.values()))
+
+            rv = {}
+            missing = []
+            for (project, version), cache_key in cache_keys.items():
+                release = cached.get(cache_key)
+                if release in (None, -1):
+                    missing.append((project, version))
+                else:
+                    rv[(project.id, version)] = release
+
+            metric_tags["cache_hit"] = "false" if missing else "true"
+            if not missing:
+                return rv
+
+            project_versions = {
+                (project, version): (f"{project.slug}-{version}")[:DB_VERSION_LENGTH]
+                for project, version in missing
+            }
+            found = {
+                (release_project.project_id, release_project.release.version): (
+                    release_project.release
+                )
+                for release_project in ReleaseProject.objects.filter(
+                    project__in={project for project, _ in missing},
+                    release__organization_id__in={
+                        project.organization_id for project, _ in missing
+                    },
+                    release__version__in={version for _, version in missing}
+                    | set(project_versions.values()),
+                ).select_related("release")
+            }
+
+            to_cache = {}
+            for project, version in missing:
+                release = found.get((project.id, project_versions[(project, version)]))
+                if release is None:
+                    release = found.get((project.id, version))
+                if release is None:
+                    date_added = releases[(project, version)] or timezone.now()
+                    release = cls._create_for_project(project, version, date_added, {})
+
+                rv[(project.id, version)] = release
+                to_cache[cache_keys[(project, version)]] = release
+
+            cache.set_many(to_cache, 3600)
+            return rv
+
     @cached_property
     def version_info(self):
         try:
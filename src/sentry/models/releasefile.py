@@ -1,4 +1,5 @@
 import errno
+import io
 import logging
 import os
 import zipfile
@@ -225,6 +226,79 @@ class ReleaseArchive:
         return temp_dir
 
 
+class ZipTailFile:
+    """Read-only file object over a ZIP archive whose tail is held in memory.
+
+    The tail starts at the central directory and contains the end of central
+    directory records. Opening a ``zipfile.ZipFile`` only reads the tail, so
+    with the tail cached, extracting a single member reads just that member's
+    range from ``fileobj``.
+    """
+
+    def __init__(self, fileobj: IO, size: int, tail: bytes = b""):
+        self._fileobj = fileobj
+        self._size = size
+        self._tail = tail
+        self._tail_start = size - len(tail)
+        self._pos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid value for whence: {whence}")
+        if pos < 0:
+            raise OSError("Invalid argument")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read(self, n: int = -1) -> bytes:
+        remaining = max(0, self._size - self._pos)
+        n = remaining if n is None or n < 0 else min(n, remaining)
+        if self._pos >= self._tail_start:
+            start = self._pos - self._tail_start
+            rv = self._tail[start : start + n]
+        else:
+            self._fileobj.seek(self._pos)
+            rv = self._fileobj.read(min(n, self._tail_start - self._pos))
+            if len(rv) < n and self._pos + len(rv) == self._tail_start:
+                rv += self._tail[: n - len(rv)]
+        self._pos += len(rv)
+        return rv
+
+    def close(self):
+        self._fileobj.close()
+
+
+def read_zip_tail(fileobj: IO, size: int) -> bytes:
+    """Return the central directory and end records of a ZIP archive.
+
+    May raise ``zipfile.BadZipFile``.
+    """
+    with zipfile.ZipFile(ZipTailFile(fileobj, size)) as zip_file:
+        start_dir = zip_file.start_dir
+    fileobj.seek(start_dir)
+    return fileobj.read(size - start_dir)
+
+
 class _ArtifactIndexData:
     """Holds data of artifact index and keeps track of changes"""
 
@@ -1,10 +1,13 @@
+from collections.abc import Mapping
 from threading import local
 
 import sentry_sdk
+from django.conf import settings
 from django.core.cache import InvalidCacheBackendError, caches
 
 from sentry.utils import json
 from sentry.utils.cache import memoize
+from sentry.utils.canonical import LazyMapping
 from sentry.utils.services import Service
 
 # Cache an instance of the encoder we want to use
@@ -22,6 +25,104 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Payloads encoded with sections start with this prefix, followed by the
+# length of the header, a separator and the header itself. The header is a
+# JSON list of ``[key, length]`` pairs describing the JSON encoded sections
+# that follow it. Neither can contain a newline, so sectioned payloads can be
+# combined with subkeys just like plain JSON payloads.
+SECTIONS_PREFIX = b"\x00sections:"
+SECTIONS_SEPARATOR = b":"
+
+
+class _RawSection:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce__(self):
+        return (_RawSection, (self.value,))
+
+
+class SectionedNodeData(LazyMapping):
+    """
+    A node payload whose top-level keys are only decoded on first access.
+
+    Sections that have not been accessed stay encoded, also when the mapping
+    is pickled into the node cache.
+    """
+
+    def __init__(self, sections):
+        self._sections = sections
+
+    def __getitem__(self, key):
+        value = self._sections[key]
+        if isinstance(value, _RawSection):
+            value = self._sections[key] = json_loads(value.value.decode("utf8"))
+        return value
+
+    def __setitem__(self, key, value):
+        self._sections[key] = value
+
+    def __delitem__(self, key):
+        del self._sections[key]
+
+    def __contains__(self, key):
+        return key in self._sections
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: keys={list(self._sections)!r}>"
+
+    def __reduce__(self):
+        return (SectionedNodeData, (self._sections,))
+
+    def copy(self):
+        return SectionedNodeData(dict(self._sections))
+
+    __copy__ = copy
+
+
+def _materialize(data):
+    # Only ``NodeData`` knows how to handle lazily decoded payloads, all other
+    # readers get plain (JSON serializable) dicts.
+    if isinstance(data, SectionedNodeData):
+        return dict(data.items())
+    return data
+
+
+def encode_sections(data):
+    if isinstance(data, SectionedNodeData):
+        # Sections that were never accessed are written back as they are.
+        items = data._sections.items()
+    else:
+        items = data.items()
+    sections = [
+        (key, value.value if isinstance(value, _RawSection) else json_dumps(value).encode("utf8"))
+        for key, value in items
+    ]
+    header = json_dumps([[key, len(value)] for key, value in sections]).encode("utf8")
+    return b"".join(
+        [SECTIONS_PREFIX, str(len(header)).encode("ascii"), SECTIONS_SEPARATOR, header]
+        + [value for _, value in sections]
+    )
+
+
+def decode_sections(value):
+    length, _, rest = value[len(SECTIONS_PREFIX) :].partition(SECTIONS_SEPARATOR)
+    length = int(length)
+    offset = length
+    sections = {}
+    for key, section_length in json_loads(rest[:length].decode("utf8")):
+        sections[key] = _RawSection(rest[offset : offset + section_length])
+        offset += section_length
+    return SectionedNodeData(sections)
+
 
 class NodeStorage(local, Service):
     """
@@ -64,7 +165,9 @@ class NodeStorage(local, Service):
         "get",
         "get_multi",
         "set",
+        "set_many",
         "set_subkeys",
+        "set_subkeys_many",
         "cleanup",
         "validate",
         "bootstrap",
@@ -108,10 +211,14 @@ class NodeStorage(local, Service):
 
                     next(lines_iter)
 
-            return json_loads(next(lines_iter))
+            line = next(lines_iter)
         except StopIteration:
             return None
 
+        if line.startswith(SECTIONS_PREFIX):
+            return decode_sections(line)
+        return json_loads(line)
+
     def _get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -119,10 +226,13 @@ class NodeStorage(local, Service):
         """
         raise NotImplementedError
 
-    def get(self, id, subkey=None):
+    def get(self, id, subkey=None, lazy=False):
         """
         >>> nodestore.get('key1')
         {"message": "hello world"}
+
+        With ``lazy``, a payload written with sections is returned as a
+        ``SectionedNodeData`` that decodes its keys on first access.
         """
         with sentry_sdk.start_span(op="nodestore.get") as span:
             span.set_tag("node_id", id)
@@ -131,7 +241,7 @@ class NodeStorage(local, Service):
                 if item_from_cache:
                     span.set_tag("origin", "from_cache")
                     span.set_tag("found", bool(item_from_cache))
-                    return item_from_cache
+                    return item_from_cache if lazy else _materialize(item_from_cache)
 
             span.set_tag("subkey", str(subkey))
             bytes_data = self._get_bytes(id)
@@ -145,7 +255,7 @@ class NodeStorage(local, Service):
                 span.set_tag("bytes.size", len(bytes_data))
             span.set_tag("found", bool(rv))
 
-            return rv
+            return rv if lazy else _materialize(rv)
 
     def _get_bytes_multi(self, id_list):
         """
@@ -157,13 +267,15 @@ class NodeStorage(local, Service):
         """
         return {id: self._get_bytes(id) for id in id_list}
 
-    def get_multi(self, id_list, subkey=None):
+    def get_multi(self, id_list, subkey=None, lazy=False):
         """
         >>> nodestore.get_multi(['key1', 'key2')
         {
             "key1": {"message": "hello world"},
             "key2": {"message": "hello world"}
         }
+
+        See ``get`` for ``lazy``.
         """
         with sentry_sdk.start_span(op="nodestore.get_multi") as span:
             span.set_tag("subkey", str(subkey))
@@ -173,6 +285,8 @@ class NodeStorage(local, Service):
                 cache_items = self._get_cache_items(id_list)
                 if len(cache_items) == len(id_list):
                     span.set_tag("result", "from_cache")
+                    if not lazy:
+                        cache_items = {id: _materialize(value) for id, value in cache_items.items()}
                     return cache_items
 
                 uncached_ids = [id for id in id_list if id not in cache_items]
@@ -190,6 +304,8 @@ class NodeStorage(local, Service):
             span.set_tag("result", "from_service")
             span.set_tag("found", len(items))
 
+            if not lazy:
+                items = {id: _materialize(value) for id, value in items.items()}
             return items
 
     def _encode(self, data):
@@ -201,7 +317,13 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
-        lines = [json_dumps(data.pop(None)).encode("utf8")]
+        value = data.pop(None)
+        if settings.SENTRY_NODESTORE_SECTIONED_ENCODING and isinstance(value, Mapping):
+            lines = [encode_sections(value)]
+        else:
+            if isinstance(value, SectionedNodeData):
+                value = dict(value.items())
+            lines = [json_dumps(value).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
             lines.append(json_dumps(value).encode("utf8"))
@@ -214,6 +336,13 @@ class NodeStorage(local, Service):
         """
         raise NotImplementedError
 
+    def _set_bytes_multi(self, items, ttl=None):
+        """
+        >>> nodestore._set_bytes_multi({'key1': b"{'foo': 'bar'}"})
+        """
+        for id, data in items.items():
+            self._set_bytes(id, data, ttl=ttl)
+
     def set(self, id, data, ttl=None):
         """
         Set value for `id`. Note that this deletes existing subkeys for `id` as
@@ -246,6 +375,33 @@ class NodeStorage(local, Service):
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
+    def set_many(self, items, ttl=None):
+        """
+        Set values for multiple ids at once. Like `set`, this deletes existing
+        subkeys.
+
+        >>> nodestore.set_many({'key1': {'foo': 'bar'}, 'key2': {'foo': 'baz'}})
+        """
+        return self.set_subkeys_many({id: {None: data} for id, data in items.items()}, ttl=ttl)
+
+    def set_subkeys_many(self, items, ttl=None):
+        """
+        Set values and subkeys for multiple ids at once, with a single write
+        to the backend where it supports that.
+
+        >>> nodestore.set_subkeys_many({
+        ...    'key1': {None: {'foo': 'bar'}, "unprocessed": {'foo': 'bam'}},
+        ...    'key2': {None: {'foo': 'baz'}},
+        ... })
+        """
+        with sentry_sdk.start_span(op="nodestore.set_subkeys_many") as span:
+            span.set_data("ids_count", len(items))
+            cache_items = {id: data.get(None) for id, data in items.items()}
+            bytes_data = {id: self._encode(data) for id, data in items.items()}
+            self._set_bytes_multi(bytes_data, ttl=ttl)
+            # set cache only after encoding and write to nodestore has succeeded
+            self._set_cache_items({id: data for id, data in cache_items.items() if data})
+
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
 
@@ -266,7 +422,7 @@ class NodeStorage(local, Service):
             self.cache.set(id, data)
 
     def _set_cache_items(self, items):
-        if self.cache:
+        if self.cache and items:
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
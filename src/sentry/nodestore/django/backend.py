@@ -5,7 +5,7 @@ import pickle
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.base import SECTIONS_PREFIX, NodeStorage
 from sentry.utils.strings import compress, decompress
 
 from .models import Node
@@ -23,7 +23,7 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith(b"{") or value.startswith(SECTIONS_PREFIX):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
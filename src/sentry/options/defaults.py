@@ -66,6 +66,13 @@ register(
     default=1024 * 1024 * 1024,
     flags=FLAG_PRIORITIZE_DISK,
 )
+# Read release archives member by member through their cached central
+# directory instead of downloading them as a whole.
+register("releasefile.ranged-archive-reads", type=Bool, default=False, flags=FLAG_PRIORITIZE_DISK)
+# Size in bytes of the in-process caches of parsed release sources and source
+# maps, per cache. 0 disables them.
+register("sourcemaps.parsed-cache-size", type=Int, default=0, flags=FLAG_PRIORITIZE_DISK)
+register("sourcemaps.parsed-cache-ttl", type=Int, default=60, flags=FLAG_PRIORITIZE_DISK)
 
 
 # Mail
@@ -257,6 +264,16 @@ register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
 register("snuba.track-outcomes-sample-rate", default=0.0)
+# Maximum number of concurrent Snuba requests per referrer and process, 0 for no limit
+register("snuba.client.referrer-concurrency-limit", type=Int, default=0)
+# Share the response of identical Snuba queries running at the same time
+register("snuba.client.coalesce-inflight-queries", type=Bool, default=False)
+register("snuba.client.rapidjson-decode", type=Bool, default=False)
+# Serve cached Snuba results older than the soft TTL (in seconds) while a
+# single caller refreshes them, for up to the hard TTL. 0 disables soft expiry
+# and caches results for SENTRY_SNUBA_CACHE_TTL_SECONDS.
+register("snuba.query-cache.soft-ttl", type=Int, default=0)
+register("snuba.query-cache.hard-ttl", type=Int, default=300)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register("snuba.tagstore.cache-tagkeys-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
@@ -339,6 +356,19 @@ register("discover2.tags_facet_enable_sampling", default=True, flags=FLAG_PRIORI
 # disable datascrubbers.
 register("processing.can-use-scrubbers", default=True)
 
+# Number of stacktrace processor frame cache entries kept in memory per
+# process, in front of the shared cache. 0 disables the in-process cache.
+register("processing.frame-cache.local-size", type=Int, default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Total size of the proguard mapping files whose opened mappers are kept in
+# memory per process. 0 disables the cache.
+register(
+    "processing.proguard-mapper-cache.max-bytes",
+    type=Int,
+    default=256 * 1024 * 1024,
+    flags=FLAG_PRIORITIZE_DISK,
+)
+
 # Killswitch for sending internal errors to the internal project or
 # `SENTRY_SDK_CONFIG.relay_dsn`. Set to `0` to only send to
 # `SENTRY_SDK_CONFIG.dsn` (the "upstream transport") and nothing else.
@@ -360,6 +390,10 @@ register("store.reprocessing-force-disable", default=False)
 
 register("store.race-free-group-creation-force-disable", default=False)
 
+# Seconds for which group hashes that are assigned to a group are cached when
+# saving events. 0 disables the cache.
+register("store.grouphash-cache-ttl", default=0)
+
 
 # ## sentry.killswitches
 #
@@ -386,6 +420,17 @@ register("store.background-grouping-sample-rate", default=0.0)
 # True if background grouping should run before secondary and primary grouping
 register("store.background-grouping-before", default=False)
 
+# Bounds for the in-process cache of constructed grouping configs, enhancements
+# and fingerprinting rules. The byte budget is measured on the serialized
+# source of each entry. Setting either to 0 disables the cache.
+register("grouping.config-cache.max-entries", type=Int, default=1000, flags=FLAG_PRIORITIZE_DISK)
+register(
+    "grouping.config-cache.max-bytes",
+    type=Int,
+    default=10 * 1024 * 1024,
+    flags=FLAG_PRIORITIZE_DISK,
+)
+
 # Store release files bundled as zip files
 register("processing.save-release-archives", default=False)  # unused
 
@@ -454,3 +499,10 @@ register("sentry-metrics.last-seen-updater.accept-rate", default=0.0)
 register("api.deprecation.brownout-cron", default="0 12 * * *", type=String)
 # Brownout duration to be stored in ISO8601 format for durations (See https://en.wikipedia.org/wiki/ISO_8601#Durations)
 register("api.deprecation.brownout-duration", default="PT1M")
+
+# Time in seconds that issue alert frequency condition results are cached in
+# process memory and shared between rules and events. 0 disables the cache.
+register("rules.event-frequency.local-cache-ttl", default=0)
+# Query all frequency conditions of the rules that may fire for an event
+# concurrently before evaluating them. Requires the local cache.
+register("rules.event-frequency.prefetch", default=False)
@@ -2,16 +2,16 @@ from __future__ import annotations
 
 from datetime import datetime
 from time import sleep, time
-from typing import Any, List, Mapping, MutableMapping, Optional, cast
+from typing import Any, List, Mapping, MutableMapping, Optional, Sequence, Tuple, cast
 
 import sentry_sdk
 from django.conf import settings
 from django.utils import timezone
 from pytz import UTC
-from symbolic import ProguardMapper  # type: ignore
 
 from sentry import quotas
 from sentry.constants import DataCategory
+from sentry.lang.java.utils import open_proguard_mapper
 from sentry.lang.native.symbolicator import Symbolicator
 from sentry.models import Organization, Project, ProjectDebugFile
 from sentry.profiles.device import classify_device
@@ -122,17 +122,65 @@ def _normalize(profile: Profile, organization: Organization) -> None:
     )
 
 
+FrameRef = Tuple[int, int]
+
+
+# Frame values may be lists or objects, which cannot be hashed, so frames are
+# keyed by their canonical JSON encoding.
+_frame_key_encoder = json.JSONEncoder(separators=(",", ":"), sort_keys=True)
+
+
+def _frame_key(frame: Mapping[str, Any]) -> str:
+    return cast(str, _frame_key_encoder.encode(frame))
+
+
+def _deduplicate_frames(
+    samples: Sequence[Mapping[str, Any]]
+) -> Tuple[List[Any], List[List[FrameRef]]]:
+    """
+    Profiles repeat the same frames in thousands of samples. Returns
+    stacktraces that contain every distinct frame once, and for every sample
+    the `(stacktrace index, frame index)` references to rebuild its frames
+    from the symbolicated stacktraces.
+
+    Symbolicator treats the first frame of a stacktrace as the leaf frame and
+    all others as callers, whose return addresses are adjusted. Distinct leaf
+    frames therefore each get a stacktrace of their own, while all caller
+    frames share one stacktrace behind a placeholder leaf frame.
+    """
+    leaf_frames: MutableMapping[str, Tuple[int, Any]] = {}
+    caller_frames: MutableMapping[str, Tuple[int, Any]] = {}
+    sample_frames = []
+
+    for sample in samples:
+        frames = []
+        for i, frame in enumerate(sample["frames"]):
+            table = caller_frames if i else leaf_frames
+            key = _frame_key(frame)
+            if key not in table:
+                table[key] = (len(table), frame)
+            frames.append((bool(i), table[key][0]))
+        sample_frames.append(frames)
+
+    stacktraces = [{"registers": {}, "frames": [frame]} for _, frame in leaf_frames.values()]
+    callers_index = len(stacktraces)
+    if caller_frames:
+        callers = [frame for _, frame in caller_frames.values()]
+        stacktraces.append({"registers": {}, "frames": callers[:1] + callers})
+
+    sample_refs = [
+        [(callers_index, index + 1) if is_caller else (index, 0) for is_caller, index in frames]
+        for frames in sample_frames
+    ]
+    return stacktraces, sample_refs
+
+
 @metrics.wraps("process_profile.symbolicate")
 def _symbolicate(profile: Profile, project: Project) -> None:
     symbolicator = Symbolicator(project=project, event_id=profile["profile_id"])
     modules = profile["debug_meta"]["images"]
-    stacktraces = [
-        {
-            "registers": {},
-            "frames": s["frames"],
-        }
-        for s in profile["sampled_profile"]["samples"]
-    ]
+    samples = profile["sampled_profile"]["samples"]
+    stacktraces, sample_refs = _deduplicate_frames(samples)
 
     symbolication_start_time = time()
 
@@ -140,25 +188,31 @@ def _symbolicate(profile: Profile, project: Project) -> None:
         try:
             response = symbolicator.process_payload(stacktraces=stacktraces, modules=modules)
 
-            assert len(profile["sampled_profile"]["samples"]) == len(response["stacktraces"])
+            assert len(stacktraces) == len(response["stacktraces"])
 
-            for original, symbolicated in zip(
-                profile["sampled_profile"]["samples"], response["stacktraces"]
-            ):
+            # A frame can be symbolicated into several frames (inlined functions).
+            symbolicated_frames: MutableMapping[FrameRef, List[Any]] = {}
+            for index, symbolicated in enumerate(response["stacktraces"]):
                 for frame in symbolicated["frames"]:
                     frame.pop("pre_context", None)
                     frame.pop("context_line", None)
                     frame.pop("post_context", None)
+                    symbolicated_frames.setdefault((index, frame["original_index"]), []).append(
+                        frame
+                    )
+
+            for original, refs in zip(samples, sample_refs):
+                frames = [frame for ref in refs for frame in symbolicated_frames.get(ref) or ()]
 
                 # here we exclude the frames related to the profiler itself as we don't care to profile the profiler.
                 if (
                     profile["platform"] == "rust"
-                    and len(symbolicated["frames"]) >= 2
-                    and symbolicated["frames"][0].get("function", "") == "perf_signal_handler"
+                    and len(frames) >= 2
+                    and frames[0].get("function", "") == "perf_signal_handler"
                 ):
-                    original["frames"] = symbolicated["frames"][2:]
+                    original["frames"] = frames[2:]
                 else:
-                    original["frames"] = symbolicated["frames"]
+                    original["frames"] = frames
             break
         except RetrySymbolication as e:
             if (
@@ -195,7 +249,7 @@ def _deobfuscate(profile: Profile, project: Project) -> None:
     if debug_file_path is None:
         return
 
-    mapper = ProguardMapper.open(debug_file_path)
+    mapper = open_proguard_mapper(debug_file_path)
     if not mapper.has_line_info:
         return
 
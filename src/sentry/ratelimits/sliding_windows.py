@@ -76,8 +76,9 @@ When using the quotas, the keys change as follows:
 """
 
 from dataclasses import dataclass
+from itertools import chain
 from time import time
-from typing import Any, Iterator, Optional, Sequence, Tuple
+from typing import Any, Iterator, MutableMapping, Optional, Sequence, Tuple
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.utils import redis
@@ -163,6 +164,9 @@ class GrantedQuota:
 
 Timestamp = int
 
+# A quota window as stored in redis: prefix, window and granularity.
+_Window = Tuple[str, int, int]
+
 
 class SlidingWindowRateLimiter(Service):
     def __init__(self, **options: Any) -> None:
@@ -175,7 +179,10 @@ class SlidingWindowRateLimiter(Service):
         Given a set of quotas requests and limits, compute how much quota could
         be consumed.
 
-        :param requests: The requests to return "grants" for.
+        :param requests: The requests to return "grants" for. All requests of
+            a batch should be passed in one call. Requests that share a quota
+            are granted in order, as if the earlier ones had already been
+            used.
         :param timestamp: The timestamp of the incoming request. Defaults to
             the current timestamp.
 
@@ -300,6 +307,13 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
             granule=granule,
         )
 
+    def _get_window(self, request: RequestedQuota, quota: Quota) -> _Window:
+        return (
+            quota.prefix_override or request.prefix,
+            quota.window_seconds,
+            quota.granularity_seconds,
+        )
+
     def check_within_quotas(
         self, requests: Sequence[RequestedQuota], timestamp: Optional[Timestamp] = None
     ) -> Tuple[Timestamp, Sequence[GrantedQuota]]:
@@ -308,7 +322,10 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
         else:
             timestamp = int(timestamp)
 
-        keys_to_fetch = []
+        # Requests in a batch frequently share windows (e.g. the same
+        # organization, or a global quota via `prefix_override`), so every
+        # window is only fetched and summed up once.
+        keys_by_window: MutableMapping[_Window, Sequence[str]] = {}
         for request in requests:
             # We could potentially run this check inside of __post__init__ of
             # RequestedQuota, but the list is actually mutable after
@@ -316,12 +333,26 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
             assert request.quotas
 
             for quota in request.quotas:
-                for granule in quota.iter_window(timestamp):
-                    keys_to_fetch.append(
+                window = self._get_window(request, quota)
+                if window not in keys_by_window:
+                    keys_by_window[window] = [
                         self._build_redis_key(request=request, quota=quota, granule=granule)
-                    )
+                        for granule in quota.iter_window(timestamp)
+                    ]
+
+        # Cluster clients split MGET into one GET per key, each a separate
+        # round-trip. A pipeline sends them in one round-trip per node
+        # instead.
+        keys_to_fetch = list(chain.from_iterable(keys_by_window.values()))
+        with self.client.pipeline(transaction=False) as pipeline:
+            for key in keys_to_fetch:
+                pipeline.get(key)
+            redis_results = dict(zip(keys_to_fetch, pipeline.execute()))
 
-        redis_results = dict(zip(keys_to_fetch, self.client.mget(keys_to_fetch)))
+        used_by_window = {
+            window: sum(int(redis_results[key] or 0) for key in keys)
+            for window, keys in keys_by_window.items()
+        }
 
         results = []
 
@@ -337,19 +368,16 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
             # We need to explicitly handle the possibility that quotas have
             # been overused, in those cases we want to truncate resulting
             # negative "grants" to zero.
-            for quota in request.quotas:
-                used_quota = sum(
-                    int(
-                        redis_results.get(
-                            self._build_redis_key(request=request, quota=quota, granule=granule)
-                        )
-                        or 0
-                    )
-                    for granule in quota.iter_window(timestamp)
-                )
-
+            windows = [self._get_window(request, quota) for quota in request.quotas]
+            for quota, window in zip(request.quotas, windows):
+                used_quota = used_by_window[window]
                 granted_quota = max(0, min(granted_quota, quota.limit - used_quota))
 
+            # Earlier requests of the same batch count against the windows
+            # they share with later ones, as if they had been used already.
+            for window in set(windows):
+                used_by_window[window] += granted_quota
+
             results.append(GrantedQuota(prefix=request.prefix, granted=granted_quota))
 
         return timestamp, results
@@ -362,20 +390,28 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
     ) -> None:
         assert len(requests) == len(grants)
 
-        keys_to_incr = {}
+        keys_to_incr: MutableMapping[str, Tuple[int, int]] = {}
 
         for request, grant in zip(requests, grants):
             assert request.prefix == grant.prefix
 
+            keys = set()
             for quota in request.quotas:
                 # Only incr most recent granule
                 granule = next(quota.iter_window(timestamp))
                 key = self._build_redis_key(request=request, quota=quota, granule=granule)
-                assert key not in keys_to_incr, "conflicting quotas specified"
-                keys_to_incr[key] = grant.granted, quota.window_seconds
+                assert key not in keys, "conflicting quotas specified"
+                keys.add(key)
+
+                # Requests of the same batch may share keys, their grants are
+                # added up into a single increment.
+                value, _ = keys_to_incr.get(key, (0, 0))
+                keys_to_incr[key] = value + grant.granted, quota.window_seconds
 
         with self.client.pipeline(transaction=False) as pipeline:
             for key, (value, ttl) in keys_to_incr.items():
+                if not value:
+                    continue
                 pipeline.incrby(key, value)
                 # Expire the key in `window_seconds`. Since the key has been
                 # recently incremented we know it represents a current
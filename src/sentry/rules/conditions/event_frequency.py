@@ -3,15 +3,18 @@ from __future__ import annotations
 import abc
 import contextlib
 import logging
+import random
 import re
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Any, Mapping
+from typing import Any, Hashable, Mapping, MutableMapping, Tuple
 
 from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import Event
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
@@ -44,6 +47,51 @@ comparison_types = {
 }
 
 
+class RateCache:
+    """
+    A process-local cache of frequency condition results.
+
+    Results are keyed by condition type, group, interval and environment, so
+    every rule and every event for the same group processed by this worker
+    share a single query result until it expires. Expiry times are jittered
+    so that entries for a hot group that were fetched together are not
+    refreshed together.
+    """
+
+    def __init__(self, max_size: int = 10000, jitter: float = 0.25) -> None:
+        self.max_size = max_size
+        self.jitter = jitter
+        self._data: MutableMapping[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> int | None:
+        with self._lock:
+            item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            return None
+        return value
+
+    def set(self, key: Hashable, value: int, ttl: float) -> None:
+        now = time.monotonic()
+        expires_at = now + ttl * (1 + random.uniform(-self.jitter, self.jitter))
+        with self._lock:
+            if len(self._data) >= self.max_size and key not in self._data:
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                if len(self._data) >= self.max_size:
+                    self._data.clear()
+            self._data[key] = (expires_at, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+rate_cache = RateCache()
+
+
 class EventFrequencyForm(forms.Form):  # type: ignore
     intervals = standard_intervals
     interval = forms.ChoiceField(
@@ -145,16 +193,12 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         if duration >= timedelta(hours=1):
             option_override_cm = options_override({"consistent": False})
         with option_override_cm:
-            result: int = self.query(event, end - duration, end, environment_id=environment_id)
+            result: int = self.get_cached_query(event, end, duration, None, environment_id)
             comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
             if comparison_type == COMPARISON_TYPE_PERCENT:
                 comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
-                comparison_end = end - comparison_interval
-                # TODO: Figure out if there's a way we can do this less frequently. All queries are
-                # automatically cached for 10s. We could consider trying to cache this and the main
-                # query for 20s to reduce the load.
-                comparison_result = self.query(
-                    event, comparison_end - duration, comparison_end, environment_id=environment_id
+                comparison_result = self.get_cached_query(
+                    event, end, duration, comparison_interval, environment_id
                 )
                 result = (
                     int(max(0, ((result / comparison_result) * 100) - 100))
@@ -164,6 +208,44 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 
         return result
 
+    def get_cached_query(
+        self,
+        event: Event,
+        end: datetime,
+        duration: timedelta,
+        comparison_interval: timedelta | None,
+        environment_id: str,
+    ) -> int:
+        """
+        Runs the query for the window of ``duration`` ending at ``end``, or
+        ``comparison_interval`` before ``end``. When
+        ``rules.event-frequency.local-cache-ttl`` is set, results are shared
+        through the process-local ``rate_cache``.
+        """
+        if comparison_interval is not None:
+            end = end - comparison_interval
+
+        ttl = options.get("rules.event-frequency.local-cache-ttl")
+        if not ttl:
+            return self.query(event, end - duration, end, environment_id=environment_id)
+
+        cache_key = (
+            self.id,
+            event.group_id,
+            duration,
+            comparison_interval,
+            environment_id,
+        )
+        result = rate_cache.get(cache_key)
+        if result is not None:
+            metrics.incr("rules.conditions.rate_cache", tags={"result": "hit"}, sample_rate=0.1)
+            return result
+
+        metrics.incr("rules.conditions.rate_cache", tags={"result": "miss"}, sample_rate=0.1)
+        result = self.query(event, end - duration, end, environment_id=environment_id)
+        rate_cache.set(cache_key, result, ttl)
+        return result
+
     @property
     def is_guessed_to_be_created_on_project_creation(self) -> bool:
         """
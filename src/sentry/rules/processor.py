@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import timedelta
 from random import randrange
 from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Sequence, Set, Tuple
@@ -8,16 +9,19 @@ from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Seque
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import analytics
+from sentry import analytics, options
 from sentry.eventstore.models import Event
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, history, rules
+from sentry.rules.conditions.event_frequency import BaseEventFrequencyCondition
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
 SLOW_CONDITION_MATCHES = ["event_frequency"]
 
+_prefetch_thread_pool = ThreadPoolExecutor(max_workers=10)
+
 
 class RuleProcessor:
     logger = logging.getLogger("sentry.rules")
@@ -249,6 +253,75 @@ class RuleProcessor:
                 else:
                     self.grouped_futures[key][1].append(rule_future)
 
+    def prefetch_frequency_conditions(
+        self, rules_: Sequence[Rule], rule_statuses: Mapping[int, GroupRuleStatus]
+    ) -> None:
+        """
+        Queries every distinct frequency condition of the rules that may fire
+        for this event concurrently, so that evaluating the rules afterwards
+        only reads from the shared rate cache.
+
+        Only used when ``rules.event-frequency.prefetch`` and the rate cache
+        are enabled: conditions are fetched even if a cheaper condition of the
+        same rule would have short-circuited the evaluation.
+        """
+        if not options.get("rules.event-frequency.prefetch") or not options.get(
+            "rules.event-frequency.local-cache-ttl"
+        ):
+            return
+
+        now = timezone.now()
+        conditions: MutableMapping[Tuple[Any, ...], BaseEventFrequencyCondition] = {}
+        for rule in rules_:
+            if (
+                rule.environment_id is not None
+                and self.event.get_environment().id != rule.environment_id
+            ):
+                continue
+
+            frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+            status = rule_statuses[rule.id]
+            if status.last_active and status.last_active > now - timedelta(minutes=frequency):
+                continue
+
+            for condition in rule.data.get("conditions", ()):
+                condition_cls = rules.get(condition["id"])
+                if condition_cls is None or not issubclass(
+                    condition_cls, BaseEventFrequencyCondition
+                ):
+                    continue
+
+                condition_inst = condition_cls(self.project, data=condition, rule=rule)
+                interval = condition_inst.get_option("interval")
+                if interval not in condition_inst.intervals:
+                    continue
+
+                key = (
+                    condition["id"],
+                    interval,
+                    condition_inst.get_option("comparisonType"),
+                    condition_inst.get_option("comparisonInterval"),
+                    rule.environment_id,
+                )
+                conditions.setdefault(key, condition_inst)
+
+        # A single condition is just as fast to query when it is evaluated.
+        if len(conditions) < 2:
+            return
+
+        futures = [
+            _prefetch_thread_pool.submit(
+                safe_execute,
+                condition_inst.get_rate,
+                self.event,
+                interval,
+                environment_id,
+                _with_transaction=False,
+            )
+            for (_, interval, _, _, environment_id), condition_inst in conditions.items()
+        ]
+        wait(futures)
+
     def apply(self) -> Iterable[Any]:
         # we should only apply rules on unresolved issues
         if not self.event.group.is_unresolved():
@@ -257,6 +330,7 @@ class RuleProcessor:
         self.grouped_futures.clear()
         rules = self.get_rules()
         rule_statuses = self.bulk_get_rule_status(rules)
+        self.prefetch_frequency_conditions(rules, rule_statuses)
         for rule in rules:
             self.apply_rule(rule, rule_statuses[rule.id])
         return self.grouped_futures.values()
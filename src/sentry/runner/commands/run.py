@@ -398,6 +398,12 @@ def post_process_forwarder(**options):
     type=click.Choice(["earliest", "latest"]),
     help="Force subscriptions to start from a particular offset",
 )
+@click.option(
+    "--max-batch-size",
+    default=1,
+    type=int,
+    help="How many messages to consume and process together. Values above 1 enable batched processing.",
+)
 @log_options()
 @configuration
 def query_subscription_consumer(**options):
@@ -410,6 +416,7 @@ def query_subscription_consumer(**options):
         commit_batch_timeout_ms=options["commit_batch_timeout_ms"],
         initial_offset_reset=options["initial_offset_reset"],
         force_offset_reset=options["force_offset_reset"],
+        max_batch_size=options["max_batch_size"],
     )
 
     def handler(signum, frame):
@@ -505,6 +512,18 @@ def batching_kafka_options(group):
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--shards",
+    type=int,
+    default=None,
+    help="Process messages on this many threads, partitioned by project and event id. Cannot be combined with --concurrency.",
+)
+@click.option(
+    "--shard-max-in-flight",
+    type=int,
+    default=100,
+    help="Maximum number of messages queued per shard before the consumer stops polling.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -513,7 +532,7 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     The "ingest consumer" tasks read events from a kafka topic (coming from Relay) and schedules
     process event celery tasks for them
     """
-    from sentry.ingest.ingest_consumer import get_ingest_consumer
+    from sentry.ingest.ingest_consumer import ShardedExecutor, get_ingest_consumer
     from sentry.utils import metrics
 
     if all_consumer_types:
@@ -528,15 +547,31 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
         raise click.ClickException("Need to specify --all-consumer-types or --consumer-type")
 
     concurrency = options.pop("concurrency", None)
+    shards = options.pop("shards", None)
+    shard_max_in_flight = options.pop("shard_max_in_flight")
+
+    if concurrency is not None and shards is not None:
+        raise click.ClickException("Cannot specify --concurrency and --shards at the same time")
+
     if concurrency is not None:
         executor = ThreadPoolExecutor(concurrency)
     else:
         executor = None
 
+    if shards is not None:
+        sharded_executor = ShardedExecutor(shards, max_in_flight_per_shard=shard_max_in_flight)
+    else:
+        sharded_executor = None
+
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
-        get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options).run()
+        get_ingest_consumer(
+            consumer_types=consumer_types,
+            executor=executor,
+            sharded_executor=sharded_executor,
+            **options,
+        ).run()
 
 
 @run.command("ingest-metrics-consumer-2")
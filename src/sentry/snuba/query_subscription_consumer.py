@@ -1,8 +1,9 @@
 import logging
 import re
 import time
+from collections import defaultdict
 from random import random
-from typing import Any, Callable, Dict, Iterable, List, Optional, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, cast
 
 import jsonschema
 import pytz
@@ -22,8 +23,10 @@ from sentry.utils.batching_kafka_consumer import create_topics
 logger = logging.getLogger(__name__)
 
 TQuerySubscriptionCallable = Callable[[Dict[str, Any], QuerySubscription], None]
+TQuerySubscriptionBatchCallable = Callable[[List[Tuple[Dict[str, Any], QuerySubscription]]], None]
 
 subscriber_registry: Dict[str, TQuerySubscriptionCallable] = {}
+batch_subscriber_registry: Dict[str, TQuerySubscriptionBatchCallable] = {}
 
 
 def register_subscriber(
@@ -38,6 +41,24 @@ def register_subscriber(
     return inner
 
 
+def register_batch_subscriber(
+    subscriber_key: str,
+) -> Callable[[TQuerySubscriptionBatchCallable], TQuerySubscriptionBatchCallable]:
+    """
+    Registers a callback that handles all updates for subscriptions of this type in a
+    batch of messages at once. Only used when the consumer runs with a `max_batch_size`
+    above 1, and requires a regular subscriber to be registered for the same key.
+    """
+
+    def inner(func: TQuerySubscriptionBatchCallable) -> TQuerySubscriptionBatchCallable:
+        if subscriber_key in batch_subscriber_registry:
+            raise Exception("Batch handler already registered for %s" % subscriber_key)
+        batch_subscriber_registry[subscriber_key] = func
+        return func
+
+    return inner
+
+
 class InvalidMessageError(Exception):
     pass
 
@@ -68,6 +89,7 @@ class QuerySubscriptionConsumer:
         commit_batch_timeout_ms: int = 5000,
         initial_offset_reset: str = "earliest",
         force_offset_reset: Optional[str] = None,
+        max_batch_size: int = 1,
     ):
         self.group_id = group_id
         if not topic:
@@ -77,6 +99,9 @@ class QuerySubscriptionConsumer:
         self.topic = topic
         self.cluster_name: str = settings.KAFKA_TOPICS[topic]["cluster"]
         self.commit_batch_size = commit_batch_size
+        # When above 1, messages are consumed and handled in batches of up to this size
+        # with `handle_messages`.
+        self.max_batch_size = max_batch_size
 
         # Adding time based commit behaviour
         self.commit_batch_timeout_ms: int = commit_batch_timeout_ms
@@ -163,6 +188,16 @@ class QuerySubscriptionConsumer:
 
         self.consumer.subscribe([self.topic], on_assign=on_assign, on_revoke=on_revoke)
 
+        if self.max_batch_size > 1:
+            self._run_batched()
+        else:
+            self._run()
+
+        logger.debug("Committing offsets and closing consumer")
+        self.commit_offsets()
+        self.consumer.close()
+
+    def _run(self) -> None:
         i = 0
         while not self.__shutdown_requested:
             message = self.consumer.poll(0.1)
@@ -207,9 +242,49 @@ class QuerySubscriptionConsumer:
                 logger.debug("Committing offsets")
                 self.commit_offsets()
 
-        logger.debug("Committing offsets and closing consumer")
-        self.commit_offsets()
-        self.consumer.close()
+    def _run_batched(self) -> None:
+        uncommitted = 0
+        while not self.__shutdown_requested:
+            messages = self.consumer.consume(num_messages=self.max_batch_size, timeout=0.1)
+            if not messages:
+                continue
+
+            for message in messages:
+                error = message.error()
+                if error is not None:
+                    raise KafkaException(error)
+
+            with sentry_sdk.start_transaction(
+                op="handle_messages",
+                name="query_subscription_consumer_process_messages",
+                sampled=random() <= options.get("subscriptions-query.sample-rate"),
+            ), metrics.timer("snuba_query_subscriber.handle_messages"):
+                try:
+                    self.handle_messages(messages)
+                except Exception:
+                    # Same failsafe as for single messages, see `_run`.
+                    logger.exception(
+                        "Unexpected error while handling messages in QuerySubscriptionConsumer. Skipping batch.",
+                        extra={
+                            "offsets": [
+                                (message.partition(), message.offset()) for message in messages
+                            ],
+                        },
+                    )
+
+            for message in messages:
+                self.offsets[message.partition()] = message.offset() + 1
+
+            uncommitted += len(messages)
+            batch_by_size: bool = uncommitted >= self.commit_batch_size
+            batch_by_time: bool = (
+                self.__batch_deadline is not None and time.time() > self.__batch_deadline
+            )
+
+            if batch_by_time or batch_by_size:
+                logger.debug("Committing offsets")
+                self.commit_offsets()
+                uncommitted = 0
 
     def _reset_batch(self) -> None:
         self.__batch_deadline = None
@@ -251,20 +326,8 @@ class QuerySubscriptionConsumer:
             self.__batch_deadline = self.commit_batch_timeout_ms / 1000.0 + time.time()
 
         with sentry_sdk.push_scope() as scope:
-            try:
-                with metrics.timer("snuba_query_subscriber.parse_message_value"):
-                    contents = self.parse_message_value(message.value())
-            except InvalidMessageError:
-                # If the message is in an invalid format, just log the error
-                # and continue
-                logger.exception(
-                    "Subscription update could not be parsed",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
+            contents = self._parse_message(message)
+            if contents is None:
                 return
             scope.set_tag("query_subscription_id", contents["subscription_id"])
 
@@ -277,50 +340,10 @@ class QuerySubscriptionConsumer:
                         metrics.incr("snuba_query_subscriber.subscription_inactive")
                         return
             except QuerySubscription.DoesNotExist:
-                metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
-                logger.error(
-                    "Received subscription update, but subscription does not exist",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
-                try:
-                    if "entity" in contents:
-                        entity_key = contents["entity"]
-                    else:
-                        # XXX(ahmed): Remove this logic. This was kept here as backwards compat
-                        # for subscription updates with schema version `2`. However schema version 3
-                        # sends the "entity" in the payload
-                        entity_regex = r"^(MATCH|match)[ ]*\(([^)]+)\)"
-                        entity_match = re.match(entity_regex, contents["request"]["query"])
-                        if not entity_match:
-                            raise InvalidMessageError(
-                                "Unable to fetch entity from query in message"
-                            )
-                        entity_key = entity_match.group(2)
-                    _delete_from_snuba(
-                        self.topic_to_dataset[message.topic()],
-                        contents["subscription_id"],
-                        EntityKey(entity_key),
-                    )
-                except InvalidMessageError as e:
-                    logger.exception(e)
-                except Exception:
-                    logger.exception("Failed to delete unused subscription from snuba.")
+                self._handle_missing_subscription(message, contents)
                 return
 
-            if subscription.type not in subscriber_registry:
-                metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
-                logger.error(
-                    "Received subscription update, but no subscription handler registered",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
+            if not self._is_registered(message, subscription):
                 return
 
             sentry_sdk.set_tag("project_id", subscription.project_id)
@@ -342,6 +365,154 @@ class QuerySubscriptionConsumer:
 
                 callback(contents, subscription)
 
+    def handle_messages(self, messages: Sequence[Message]) -> None:
+        """
+        Batched version of `handle_message`. Subscriptions for all messages are fetched at
+        once, and updates are passed to the batch callback registered for their
+        subscription type, in message order. Subscription types without a batch callback
+        receive their updates one at a time.
+        """
+        if not self.__batch_deadline:
+            self.__batch_deadline = self.commit_batch_timeout_ms / 1000.0 + time.time()
+
+        parsed = []
+        for message in messages:
+            contents = self._parse_message(message)
+            if contents is not None:
+                parsed.append((message, contents))
+
+        with metrics.timer("snuba_query_subscriber.fetch_subscriptions"):
+            subscriptions: Dict[str, QuerySubscription] = {
+                subscription.subscription_id: subscription
+                for subscription in QuerySubscription.objects.get_many_from_cache(
+                    list({contents["subscription_id"] for _, contents in parsed}),
+                    key="subscription_id",
+                )
+            }
+
+        updates_by_type: Dict[str, List[Tuple[Message, Dict[str, Any], QuerySubscription]]]
+        updates_by_type = defaultdict(list)
+        for message, contents in parsed:
+            subscription = subscriptions.get(contents["subscription_id"])
+            if subscription is None:
+                self._handle_missing_subscription(message, contents)
+                continue
+            if subscription.status != QuerySubscription.Status.ACTIVE.value:
+                metrics.incr("snuba_query_subscriber.subscription_inactive")
+                continue
+            if not self._is_registered(message, subscription):
+                continue
+            updates_by_type[subscription.type].append((message, contents, subscription))
+
+        for subscription_type, updates in updates_by_type.items():
+            batch_callback = batch_subscriber_registry.get(subscription_type)
+            with sentry_sdk.start_span(op="process_messages") as span, metrics.timer(
+                "snuba_query_subscriber.batch_callback.duration", instance=subscription_type
+            ):
+                span.set_data("subscription_type", subscription_type)
+                span.set_data("update_count", len(updates))
+                metrics.timing(
+                    "snuba_query_subscriber.batch_size",
+                    len(updates),
+                    tags={"subscription_type": subscription_type},
+                )
+                if batch_callback is not None:
+                    # A failing subscription type must not drop the updates of
+                    # the other types in the same batch.
+                    try:
+                        batch_callback(
+                            [(contents, subscription) for _, contents, subscription in updates]
+                        )
+                    except Exception:
+                        logger.exception(
+                            "Unexpected error while handling messages in QuerySubscriptionConsumer. Skipping messages.",
+                            extra={
+                                "subscription_type": subscription_type,
+                                "offsets": [message.offset() for message, _, _ in updates],
+                                "partitions": sorted(
+                                    {message.partition() for message, _, _ in updates}
+                                ),
+                            },
+                        )
+                    continue
+
+                callback = subscriber_registry[subscription_type]
+                for message, contents, subscription in updates:
+                    try:
+                        callback(contents, subscription)
+                    except Exception:
+                        logger.exception(
+                            "Unexpected error while handling message in QuerySubscriptionConsumer. Skipping message.",
+                            extra={
+                                "offset": message.offset(),
+                                "partition": message.partition(),
+                                "value": message.value(),
+                            },
+                        )
+
+    def _parse_message(self, message: Message) -> Optional[Dict[str, Any]]:
+        try:
+            with metrics.timer("snuba_query_subscriber.parse_message_value"):
+                return self.parse_message_value(message.value())
+        except InvalidMessageError:
+            # If the message is in an invalid format, just log the error
+            # and continue
+            logger.exception(
+                "Subscription update could not be parsed",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            return None
+
+    def _handle_missing_subscription(self, message: Message, contents: Dict[str, Any]) -> None:
+        metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
+        logger.error(
+            "Received subscription update, but subscription does not exist",
+            extra={
+                "offset": message.offset(),
+                "partition": message.partition(),
+                "value": message.value(),
+            },
+        )
+        try:
+            if "entity" in contents:
+                entity_key = contents["entity"]
+            else:
+                # XXX(ahmed): Remove this logic. This was kept here as backwards compat
+                # for subscription updates with schema version `2`. However schema version 3
+                # sends the "entity" in the payload
+                entity_regex = r"^(MATCH|match)[ ]*\(([^)]+)\)"
+                entity_match = re.match(entity_regex, contents["request"]["query"])
+                if not entity_match:
+                    raise InvalidMessageError("Unable to fetch entity from query in message")
+                entity_key = entity_match.group(2)
+            _delete_from_snuba(
+                self.topic_to_dataset[message.topic()],
+                contents["subscription_id"],
+                EntityKey(entity_key),
+            )
+        except InvalidMessageError as e:
+            logger.exception(e)
+        except Exception:
+            logger.exception("Failed to delete unused subscription from snuba.")
+
+    def _is_registered(self, message: Message, subscription: QuerySubscription) -> bool:
+        if subscription.type not in subscriber_registry:
+            metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
+            logger.error(
+                "Received subscription update, but no subscription handler registered",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            return False
+        return True
+
     def parse_message_value(self, value: str) -> Dict[str, Any]:
         """
         Parses the value received via the Kafka consumer and verifies that it
@@ -1,18 +1,24 @@
 import logging
+import pickle
 from collections import OrderedDict, namedtuple
 from datetime import datetime
 
 import sentry_sdk
 from django.utils import timezone
 
+from sentry import options
 from sentry.models import Project, Release
 from sentry.stacktraces.functions import set_in_app, trim_function_name
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
+from sentry.utils.lru import LRUCache
 from sentry.utils.safe import get_path, safe_execute
 
 logger = logging.getLogger(__name__)
 
+FRAME_CACHE_TIMEOUT = 3600
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -30,6 +36,7 @@ class ProcessableFrame:
         self.data = None
         self.cache_key = None
         self.cache_value = None
+        self.cache_writes = None
         self.processable_frames = processable_frames
 
     def __repr__(self):
@@ -64,7 +71,12 @@ class ProcessableFrame:
 
     def set_cache_value(self, value):
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            if self.cache_writes is not None:
+                # Written in bulk by `StacktraceProcessingTask.flush_cache_writes`
+                self.cache_writes[self.cache_key] = value
+            else:
+                cache.set(self.cache_key, value, FRAME_CACHE_TIMEOUT)
+                local_frame_cache.set_many({self.cache_key: value})
             return True
         return False
 
@@ -79,9 +91,17 @@ class ProcessableFrame:
 
 
 class StacktraceProcessingTask:
-    def __init__(self, processable_stacktraces, processors):
+    def __init__(self, processable_stacktraces, processors, cache_writes=None):
         self.processable_stacktraces = processable_stacktraces
         self.processors = processors
+        self.cache_writes = cache_writes if cache_writes is not None else {}
+
+    def flush_cache_writes(self):
+        if not self.cache_writes:
+            return
+        cache.set_many(self.cache_writes, FRAME_CACHE_TIMEOUT)
+        local_frame_cache.set_many(self.cache_writes)
+        self.cache_writes.clear()
 
     def close(self):
         for frame in self.iter_processable_frames():
@@ -440,10 +460,63 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
         return default
 
 
+class LocalFrameCache:
+    """
+    An in-process LRU of frame cache values shared between events.
+
+    Values are kept pickled, so processors never share mutable state and the
+    hit path costs the same deserialization as the shared cache, minus the
+    round-trip.
+    """
+
+    def __init__(self):
+        self._lru = LRUCache()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def get_many(self, keys):
+        if not options.get("processing.frame-cache.local-size"):
+            return {}
+
+        rv = {}
+        for key in keys:
+            value = self._lru.get(key)
+            if value is not None:
+                rv[key] = pickle.loads(value)
+        return rv
+
+    def set_many(self, values):
+        max_size = options.get("processing.frame-cache.local-size")
+        if not max_size:
+            return
+
+        for key, value in values.items():
+            if value is not None:
+                self._lru.set(
+                    key,
+                    pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                    ttl=FRAME_CACHE_TIMEOUT,
+                    max_entries=max_size,
+                )
+
+    def clear(self):
+        self._lru.clear()
+
+
+local_frame_cache = LocalFrameCache()
+
+
 def lookup_frame_cache(keys):
-    rv = {}
-    for key in keys:
-        rv[key] = cache.get(key)
+    keys = list(keys)
+    rv = dict.fromkeys(keys)
+    rv.update(local_frame_cache.get_many(keys))
+
+    missing = [key for key in keys if rv[key] is None]
+    if missing:
+        fetched = cache.get_many(missing)
+        rv.update(fetched)
+        local_frame_cache.set_many(fetched)
     return rv
 
 
@@ -453,6 +526,7 @@ def get_stacktrace_processing_task(infos, processors):
     """
     by_processor = {}
     to_lookup = {}
+    cache_writes = {}
 
     # by_stacktrace_info requires stable sorting as it is used in
     # StacktraceProcessingTask.iter_processable_stacktraces. This is important
@@ -467,15 +541,35 @@ def get_stacktrace_processing_task(infos, processors):
             by_stacktrace_info.setdefault(processable_frame.stacktrace_info, []).append(
                 processable_frame
             )
+            processable_frame.cache_writes = cache_writes
             if processable_frame.cache_key is not None:
                 to_lookup[processable_frame.cache_key] = processable_frame
 
-    frame_cache = lookup_frame_cache(to_lookup)
-    for cache_key, processable_frame in to_lookup.items():
-        processable_frame.cache_value = frame_cache.get(cache_key)
+    if to_lookup:
+        hits = {}
+        lookups = {}
+        frame_cache = lookup_frame_cache(to_lookup)
+        for cache_key, processable_frame in to_lookup.items():
+            processable_frame.cache_value = frame_cache.get(cache_key)
+            processor_name = processable_frame.processor.__class__.__name__
+            lookups[processor_name] = lookups.get(processor_name, 0) + 1
+            if processable_frame.cache_value is not None:
+                hits[processor_name] = hits.get(processor_name, 0) + 1
+
+        for processor_name, count in lookups.items():
+            metrics.incr(
+                "stacktraces.frame_cache.lookup", amount=count, tags={"processor": processor_name}
+            )
+            metrics.incr(
+                "stacktraces.frame_cache.hit",
+                amount=hits.get(processor_name, 0),
+                tags={"processor": processor_name},
+            )
 
     return StacktraceProcessingTask(
-        processable_stacktraces=by_stacktrace_info, processors=by_processor
+        processable_stacktraces=by_stacktrace_info,
+        processors=by_processor,
+        cache_writes=cache_writes,
     )
 
 
@@ -563,6 +657,10 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
         data.setdefault("_metrics", {})["flag.processing.error"] = True
         changed = True
     finally:
+        try:
+            processing_task.flush_cache_writes()
+        except Exception:
+            logger.exception("stacktraces.processing.frame_cache_write_failed")
         for processor in processors:
             processor.close()
         processing_task.close()
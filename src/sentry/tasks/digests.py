@@ -1,16 +1,22 @@
 import logging
 import time
+from collections import defaultdict
 
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.notifications import build_digest, split_key
 from sentry.models import Project, ProjectOption
 from sentry.tasks.base import instrumented_task
-from sentry.utils import snuba
+from sentry.utils import metrics, snuba
 
 logger = logging.getLogger(__name__)
 
 
+# The maximum number of timelines of one project that are delivered by a
+# single `deliver_digests` task.
+DELIVERY_BATCH_SIZE = 50
+
+
 @instrumented_task(name="sentry.tasks.digests.schedule_digests", queue="digests.scheduling")
 def schedule_digests():
     from sentry import digests
@@ -18,18 +24,54 @@ def schedule_digests():
     deadline = time.time()
 
     # The maximum (but hopefully not typical) expected delay can be roughly
-    # calculated by adding together the schedule interval, the # of shards *
-    # schedule timeout (at least until these are able to be processed in
-    # parallel), the expected duration of time an item spends waiting in the
-    # queue to be processed for delivery and the expected duration of time an
-    # item takes to be processed for delivery, so this timeout should be
+    # calculated by adding together the schedule interval, the schedule
+    # timeout of the slowest batch of shards (shards are processed
+    # concurrently), the expected duration of time an item spends waiting in
+    # the queue to be processed for delivery and the expected duration of time
+    # an item takes to be processed for delivery, so this timeout should be
     # relatively high to avoid requeueing items before they even had a chance
     # to be processed.
     timeout = 300
     digests.maintenance(deadline - timeout)
 
-    for entry in digests.schedule(deadline):
-        deliver_digest.delay(entry.key, entry.timestamp)
+    entries = list(digests.schedule(deadline) or ())
+    if not entries:
+        return
+
+    # How late the timelines that became ready were picked up for delivery.
+    now = time.time()
+    metrics.timing("digests.schedule.lag", max(now - entry.timestamp for entry in entries))
+    metrics.incr("digests.schedule.timelines", amount=len(entries))
+
+    # Timelines of the same project (one per target) are delivered together.
+    by_project = defaultdict(list)
+    for entry in entries:
+        by_project[_get_project_id(entry.key)].append(entry)
+
+    for project_entries in by_project.values():
+        for i in range(0, len(project_entries), DELIVERY_BATCH_SIZE):
+            batch = project_entries[i : i + DELIVERY_BATCH_SIZE]
+            if len(batch) == 1:
+                deliver_digest.delay(batch[0].key, batch[0].timestamp)
+            else:
+                deliver_digests.delay([(entry.key, entry.timestamp) for entry in batch])
+
+
+def _get_project_id(key):
+    # Keys look like `mail:p:{project_id}[:{target_type}:{target_identifier}]`
+    # (see `sentry.digests.notifications.split_key`)
+    parts = key.split(":", 3)
+    return parts[2] if len(parts) > 2 else key
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(entries):
+    """Delivers several timelines (usually of the same project) in one task."""
+    for key, schedule_timestamp in entries:
+        try:
+            deliver_digest(key, schedule_timestamp)
+        except Exception:
+            logger.exception("Failed to deliver digest", extra={"key": key})
 
 
 @instrumented_task(name="sentry.tasks.digests.deliver_digest", queue="digests.delivery")
@@ -44,6 +86,9 @@ def deliver_digest(key, schedule_timestamp=None):
         digests.delete(key)
         return
 
+    if schedule_timestamp is not None:
+        metrics.timing("digests.delivery.lag", time.time() - schedule_timestamp)
+
     minimum_delay = ProjectOption.objects.get_value(
         project, get_option_key("mail", "minimum_delay")
     )
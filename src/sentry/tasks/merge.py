@@ -216,6 +216,8 @@ def _get_event_environment(event, project, cache):
 
 
 def merge_objects(models, group, new_group, limit=1000, logger=None, transaction_id=None):
+    from sentry.models import GroupHash
+
     has_more = False
     for model in models:
         all_fields = [f.name for f in model._meta.get_fields()]
@@ -249,6 +251,8 @@ def merge_objects(models, group, new_group, limit=1000, logger=None, transaction
                 delete = True
             else:
                 delete = False
+                if model is GroupHash:
+                    GroupHash.objects.invalidate_cache(obj.project_id, [obj.hash])
 
             if delete:
                 # Before deleting, we want to merge in counts
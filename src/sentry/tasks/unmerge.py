@@ -451,7 +451,9 @@ def lock_hashes(project_id, source_id, fingerprints):
             state=GroupHash.State.LOCKED_IN_MIGRATION
         )
 
-    return [h.hash for h in eligible_hashes]
+    locked_hashes = [h.hash for h in eligible_hashes]
+    GroupHash.objects.invalidate_cache(project_id, locked_hashes)
+    return locked_hashes
 
 
 def unlock_hashes(project_id, locked_primary_hashes):
@@ -460,6 +462,7 @@ def unlock_hashes(project_id, locked_primary_hashes):
         hash__in=locked_primary_hashes,
         state=GroupHash.State.LOCKED_IN_MIGRATION,
     ).update(state=GroupHash.State.UNLOCKED)
+    GroupHash.objects.invalidate_cache(project_id, locked_primary_hashes)
 
 
 @instrumented_task(name="sentry.tasks.unmerge", queue="unmerge")
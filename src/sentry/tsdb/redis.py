@@ -1,17 +1,24 @@
+import atexit
 import itertools
 import logging
+import os
 import random
+import threading
+import time
 import uuid
+import weakref
 from collections import defaultdict, namedtuple
 from functools import reduce
 from hashlib import md5
 from typing import Callable, ContextManager, TypeVar
 
+from celery.signals import worker_process_shutdown
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
 from sentry.tsdb.base import BaseTSDB
+from sentry.utils import metrics
 from sentry.utils.compat import crc32
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -25,6 +32,30 @@ SketchParameters = namedtuple("SketchParameters", "depth width capacity")
 
 CountMinScript = SentryScript(None, resource_string("sentry", "scripts/tsdb/cmsketch.lua"))
 
+# Backends that have aggregated counters in memory. They are flushed when the
+# process shuts down, the hooks for that are registered once per process.
+_aggregating_backends = weakref.WeakSet()
+_aggregating_backends_lock = threading.Lock()
+_shutdown_hooks_registered = False
+
+
+def _flush_aggregating_backends(**kwargs):
+    for backend in list(_aggregating_backends):
+        backend.flush_counters()
+
+
+def _register_aggregating_backend(backend):
+    global _shutdown_hooks_registered
+
+    with _aggregating_backends_lock:
+        _aggregating_backends.add(backend)
+        if not _shutdown_hooks_registered:
+            _shutdown_hooks_registered = True
+            atexit.register(_flush_aggregating_backends)
+            # Celery prefork children exit through ``os._exit``, which skips
+            # ``atexit`` handlers.
+            worker_process_shutdown.connect(_flush_aggregating_backends, weak=False)
+
 
 class SuppressionWrapper:
     """\
@@ -105,6 +136,14 @@ class RedisTSDB(BaseTSDB):
     frequency table can be displayed as percentages of the whole data set.
     (Additional documentation and the bulk of the logic for implementing the
     frequency table API can be found in the ``cmsketch.lua`` script.)
+
+    Simple counters can optionally be pre-aggregated in memory by setting
+    ``aggregation_interval`` (in seconds). Increments are then summed per
+    hash key and field and written to Redis at most once per interval, or
+    when more than ``aggregation_max_keys`` fields are pending. The interval
+    and the key limit bound how much data is lost if a process crashes
+    before flushing. Counters that fail to be written are kept for the next
+    flush, and dropped after ``aggregation_max_flush_attempts`` failures.
     """
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
@@ -114,8 +153,22 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+        self.aggregation_interval = options.pop("aggregation_interval", 0)
+        self.aggregation_max_keys = options.pop("aggregation_max_keys", 10000)
+        self.aggregation_max_flush_attempts = options.pop("aggregation_max_flush_attempts", 3)
         super().__init__(**options)
 
+        # (cluster, durable) -> {(hash_key, hash_field): count}
+        self._pending_counters = defaultdict(lambda: defaultdict(int))
+        # (cluster, durable) -> {hash_key: max expiry}
+        self._pending_expiries = defaultdict(lambda: defaultdict(float))
+        # (cluster, durable) -> {(hash_key, hash_field): failed flushes}
+        self._pending_attempts = defaultdict(dict)
+        self._pending_count = 0
+        self._pending_since = None
+        self._pending_lock = threading.Lock()
+        self._flusher_pid = None
+
     def validate(self):
         logger.debug("Validating Redis version...")
         version = Version((2, 8, 18)) if self.enable_frequency_sketches else Version((2, 8, 9))
@@ -224,43 +277,187 @@ class RedisTSDB(BaseTSDB):
             default_timestamp = timezone.now()
 
         for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
-            manager = cluster.map()
-            if not durable:
-                manager = SuppressionWrapper(manager)
+            # (hash_key, hash_field) -> count
+            key_operations = defaultdict(lambda: 0)
+            # (hash_key) -> "max expiration encountered"
+            key_expiries = defaultdict(lambda: 0.0)
+
+            for rollup, max_values in self.rollups.items():
+                for item in items:
+                    if len(item) == 2:
+                        model, key = item
+                        options = {}
+                    else:
+                        model, key, options = item
+
+                    count = options.get("count", default_count)
+                    timestamp = options.get("timestamp", default_timestamp)
+
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
+
+                    for environment_id in environment_ids:
+                        hash_key, hash_field = self.make_counter_key(
+                            model, rollup, timestamp, key, environment_id
+                        )
 
-            with manager as client:
-                # (hash_key, hash_field) -> count
-                key_operations = defaultdict(lambda: 0)
-                # (hash_key) -> "max expiration encountered"
-                key_expiries = defaultdict(lambda: 0.0)
-
-                for rollup, max_values in self.rollups.items():
-                    for item in items:
-                        if len(item) == 2:
-                            model, key = item
-                            options = {}
-                        else:
-                            model, key, options = item
-
-                        count = options.get("count", default_count)
-                        timestamp = options.get("timestamp", default_timestamp)
+                        if key_expiries[hash_key] < expiry:
+                            key_expiries[hash_key] = expiry
 
-                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                        key_operations[(hash_key, hash_field)] += count
 
-                        for environment_id in environment_ids:
-                            hash_key, hash_field = self.make_counter_key(
-                                model, rollup, timestamp, key, environment_id
-                            )
+            if self.aggregation_interval:
+                self._aggregate_counters(cluster, durable, key_operations, key_expiries)
+            else:
+                self._write_counters(cluster, durable, key_operations, key_expiries)
+
+    def _write_counters(self, cluster, durable, key_operations, key_expiries):
+        # ``cluster.map`` batches the commands into one pipeline per host.
+        manager = cluster.map()
+        if not durable:
+            manager = SuppressionWrapper(manager)
+
+        with manager as client:
+            for (hash_key, hash_field), count in key_operations.items():
+                client.hincrby(hash_key, hash_field, count)
+                if key_expiries.get(hash_key):
+                    client.expireat(hash_key, key_expiries.pop(hash_key))
+
+    def _aggregate_counters(self, cluster, durable, key_operations, key_expiries):
+        self._ensure_flusher()
+
+        with self._pending_lock:
+            pending_counters = self._pending_counters[(cluster, durable)]
+            pending_expiries = self._pending_expiries[(cluster, durable)]
+
+            for operation, count in key_operations.items():
+                if operation not in pending_counters:
+                    self._pending_count += 1
+                pending_counters[operation] += count
+
+            for hash_key, expiry in key_expiries.items():
+                if pending_expiries[hash_key] < expiry:
+                    pending_expiries[hash_key] = expiry
+
+            if self._pending_since is None:
+                self._pending_since = time.time()
+
+            should_flush = (
+                self._pending_count >= self.aggregation_max_keys
+                or time.time() - self._pending_since >= self.aggregation_interval
+            )
 
-                            if key_expiries[hash_key] < expiry:
-                                key_expiries[hash_key] = expiry
+        if should_flush:
+            self.flush_counters()
 
-                            key_operations[(hash_key, hash_field)] += count
+    def _ensure_flusher(self):
+        # Worker processes may fork after the backend has been created, so the
+        # flusher thread has to be started in the process that uses it.
+        if self._flusher_pid == os.getpid():
+            return
+
+        with self._pending_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        _register_aggregating_backend(self)
+        thread = threading.Thread(target=self._run_flusher, name="tsdb-flusher", daemon=True)
+        thread.start()
 
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.aggregation_interval)
+            try:
+                self.flush_counters(only_expired=True)
+            except Exception:
+                logger.exception("tsdb.aggregation.flush-failed")
+
+    def flush_counters(self, only_expired=False):
+        """
+        Writes all counters that have been aggregated in memory to Redis.
+        """
+        with self._pending_lock:
+            if not self._pending_count:
+                return
+            if (
+                only_expired
+                and self._pending_since is not None
+                and time.time() - self._pending_since < self.aggregation_interval
+            ):
+                return
+
+            pending_counters, self._pending_counters = self._pending_counters, defaultdict(
+                lambda: defaultdict(int)
+            )
+            pending_expiries, self._pending_expiries = self._pending_expiries, defaultdict(
+                lambda: defaultdict(float)
+            )
+            pending_attempts, self._pending_attempts = self._pending_attempts, defaultdict(dict)
+            pending_count, self._pending_count = self._pending_count, 0
+            self._pending_since = None
+
+        with metrics.timer("tsdb.aggregation.flush"):
+            for (cluster, durable), key_operations in pending_counters.items():
+                key_expiries = pending_expiries[(cluster, durable)]
+                router = cluster.get_router()
+                hosts = defaultdict(dict)
                 for (hash_key, hash_field), count in key_operations.items():
-                    client.hincrby(hash_key, hash_field, count)
-                    if key_expiries.get(hash_key):
-                        client.expireat(hash_key, key_expiries.pop(hash_key))
+                    hosts[router.get_host_for_key(hash_key)][(hash_key, hash_field)] = count
+
+                # Hosts are written one by one, so that a failing host does
+                # not affect the counters of the others.
+                for host, operations in hosts.items():
+                    try:
+                        self._write_host_counters(cluster, host, operations, key_expiries)
+                    except Exception:
+                        logger.exception("tsdb.aggregation.flush-failed")
+                        self._requeue_counters(
+                            cluster,
+                            durable,
+                            operations,
+                            key_expiries,
+                            pending_attempts[(cluster, durable)],
+                        )
+
+        metrics.timing("tsdb.aggregation.flush-keys", pending_count)
+
+    def _write_host_counters(self, cluster, host, key_operations, key_expiries):
+        pipe = cluster.get_local_client(host).pipeline()
+        expired = set()
+        for (hash_key, hash_field), count in key_operations.items():
+            pipe.hincrby(hash_key, hash_field, count)
+            if hash_key not in expired and key_expiries.get(hash_key):
+                pipe.expireat(hash_key, key_expiries[hash_key])
+                expired.add(hash_key)
+        pipe.execute()
+
+    def _requeue_counters(self, cluster, durable, key_operations, key_expiries, attempts):
+        dropped = 0
+        with self._pending_lock:
+            pending_counters = self._pending_counters[(cluster, durable)]
+            pending_expiries = self._pending_expiries[(cluster, durable)]
+            pending_attempts = self._pending_attempts[(cluster, durable)]
+
+            for operation, count in key_operations.items():
+                operation_attempts = attempts.get(operation, 0) + 1
+                if operation_attempts >= self.aggregation_max_flush_attempts:
+                    dropped += 1
+                    continue
+
+                if operation not in pending_counters:
+                    self._pending_count += 1
+                pending_counters[operation] += count
+                pending_attempts[operation] = operation_attempts
+
+                hash_key = operation[0]
+                if pending_expiries[hash_key] < key_expiries.get(hash_key, 0.0):
+                    pending_expiries[hash_key] = key_expiries[hash_key]
+
+            if self._pending_since is None:
+                self._pending_since = time.time()
+
+        if dropped:
+            metrics.incr("tsdb.aggregation.dropped", amount=dropped)
 
     def get_range(
         self,
@@ -3,7 +3,7 @@ from collections.abc import Mapping, MutableMapping
 
 from django.conf import settings
 
-__all__ = ("CanonicalKeyDict", "CanonicalKeyView", "get_canonical_name")
+__all__ = ("CanonicalKeyDict", "CanonicalKeyView", "LazyMapping", "get_canonical_name")
 
 
 LEGACY_KEY_MAPPING = {
@@ -80,6 +80,18 @@ class CanonicalKeyView(Mapping):
         return self.data.__repr__()
 
 
+class LazyMapping(MutableMapping):
+    """
+    Base class of mappings that decode their values on first access, such as
+    sectioned nodestore payloads. ``copy`` must return a shallow copy of the
+    same type without decoding any values, ``CanonicalKeyDict`` then keeps
+    the values undecoded as well.
+    """
+
+    def copy(self):
+        raise NotImplementedError
+
+
 class CanonicalKeyDict(MutableMapping):
     def __init__(self, data, legacy=None):
         self.legacy = legacy
@@ -91,6 +103,18 @@ class CanonicalKeyDict(MutableMapping):
             legacy = settings.PREFER_CANONICAL_LEGACY_KEYS
         norm_func = legacy and get_legacy_name or get_canonical_name
         self._norm_func = norm_func
+        if isinstance(data, LazyMapping):
+            # Copy the payload without decoding its values, only values stored
+            # under another name than their normalized one are read.
+            self.data = data.copy()
+            for key in list(self.data):
+                canonical_key = norm_func(key)
+                if key != canonical_key:
+                    value = self.data.pop(key)
+                    if canonical_key not in self.data:
+                        self.data[canonical_key] = value
+            return
+
         self.data = {}
         for key, value in data.items():
             canonical_key = norm_func(key)
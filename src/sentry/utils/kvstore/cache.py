@@ -4,7 +4,8 @@ from typing import Any, Iterator, Optional, Sequence, Tuple
 from django.conf import settings
 
 from sentry.cache.base import BaseCache, unwrap_key, wrap_key
-from sentry.utils.kvstore.abstract import KVStorage, V
+from sentry.cache.redis import ValueTooLarge
+from sentry.utils.kvstore.abstract import K, KVStorage, V
 
 
 class CacheKVStorage(KVStorage[Any, Any]):
@@ -91,6 +92,12 @@ class CacheKeyWrapper(KVStorage[str, V]):
             ttl,
         )
 
+    def set_many(self, items: Sequence[Tuple[str, V]], ttl: Optional[timedelta] = None) -> None:
+        return self.storage.set_many(
+            [(wrap_key(self.prefix, self.version, key), value) for key, value in items],
+            ttl,
+        )
+
     def delete(self, key: str) -> None:
         self.storage.delete(wrap_key(self.prefix, self.version, key))
 
@@ -105,3 +112,57 @@ class CacheKeyWrapper(KVStorage[str, V]):
         # is a shared keyspace, and suggests that this may cause collateral
         # damage to other storage instances
         raise NotImplementedError
+
+
+class CacheBackendWrapper(KVStorage[K, V]):
+    """
+    This class applies the value size limit and the transaction
+    instrumentation of a cache backend to a storage that reads and writes the
+    backend's keys directly, so that code migrating from ``CacheKVStorage`` to
+    such a storage keeps both. Values are measured after encoding, like the
+    cache backend does.
+    """
+
+    def __init__(self, storage: KVStorage[K, V], backend: BaseCache) -> None:
+        self.storage = storage
+        self.backend = backend
+
+    def __check_size(self, key: K, value: V) -> None:
+        max_size = getattr(self.backend, "max_size", None)
+        if max_size is not None and len(value) > max_size:  # type: ignore
+            raise ValueTooLarge(f"Cache key too large: {key!r} {len(value)!r}")  # type: ignore
+
+    def get(self, key: K) -> Optional[V]:
+        value = self.storage.get(key)
+        self.backend._mark_transaction("get")
+        return value
+
+    def get_many(self, keys: Sequence[K]) -> Iterator[Tuple[K, V]]:
+        results = list(self.storage.get_many(keys))
+        self.backend._mark_transaction("get")
+        return iter(results)
+
+    def set(self, key: K, value: V, ttl: Optional[timedelta] = None) -> None:
+        self.__check_size(key, value)
+        self.storage.set(key, value, ttl)
+        self.backend._mark_transaction("set")
+
+    def set_many(self, items: Sequence[Tuple[K, V]], ttl: Optional[timedelta] = None) -> None:
+        for key, value in items:
+            self.__check_size(key, value)
+        self.storage.set_many(items, ttl)
+        self.backend._mark_transaction("set")
+
+    def delete(self, key: K) -> None:
+        self.storage.delete(key)
+        self.backend._mark_transaction("delete")
+
+    def delete_many(self, keys: Sequence[K]) -> None:
+        self.storage.delete_many(keys)
+        self.backend._mark_transaction("delete")
+
+    def bootstrap(self) -> None:
+        self.storage.bootstrap()
+
+    def destroy(self) -> None:
+        self.storage.destroy()
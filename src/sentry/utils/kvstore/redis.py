@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Optional
+from typing import Iterator, Optional, Sequence, Tuple
 
 from redis import Redis
 
@@ -18,12 +18,34 @@ class RedisKVStorage(KVStorage[str, bytes]):
     def get(self, key: str) -> Optional[bytes]:
         return self.client.get(key.encode("utf8"))
 
+    def get_many(self, keys: Sequence[str]) -> Iterator[Tuple[str, bytes]]:
+        # Pipelines (rather than ``MGET``) work with keys in different slots
+        # of a Redis Cluster.
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.get(key.encode("utf8"))
+        for key, value in zip(keys, pipeline.execute()):
+            if value is not None:
+                yield key, value
+
     def set(self, key: str, value: bytes, ttl: Optional[timedelta] = None) -> None:
         self.client.set(key.encode("utf8"), value, ex=ttl)
 
+    def set_many(self, items: Sequence[Tuple[str, bytes]], ttl: Optional[timedelta] = None) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items:
+            pipeline.set(key.encode("utf8"), value, ex=ttl)
+        pipeline.execute()
+
     def delete(self, key: str) -> None:
         self.client.delete(key.encode("utf8"))
 
+    def delete_many(self, keys: Sequence[str]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.delete(key.encode("utf8"))
+        pipeline.execute()
+
     def bootstrap(self) -> None:
         pass  # nothing to do
 
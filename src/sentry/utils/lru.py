@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# (expires_at, weight, value)
+_Entry = Tuple[Optional[float], int, V]
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A thread safe, in-process LRU cache.
+
+    Every entry has a weight (``1`` unless given, e.g. the size of the payload
+    a value was parsed from) and an optional TTL. Bounds are passed to
+    ``set`` rather than to the constructor, so that callers can read them from
+    options on every write: once there are more than ``max_entries`` entries
+    or their total weight exceeds ``max_weight``, the least recently used
+    entries are evicted. Entries heavier than ``max_weight`` are never stored.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[K, _Entry[V]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        weight: int = 1,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_weight: Optional[int] = None,
+    ) -> int:
+        """
+        Stores ``value`` and returns the number of entries evicted to make
+        room for it.
+        """
+        if max_weight is not None and weight > max_weight:
+            return 0
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, weight, value)
+            self._weight += weight
+            while (max_entries is not None and len(self._entries) > max_entries) or (
+                max_weight is not None and self._weight > max_weight
+            ):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        return evicted
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def _remove(self, key: K) -> None:
+        _, weight, _ = self._entries.pop(key)
+        self._weight -= weight
@@ -1,15 +1,22 @@
+import atexit
+import logging
+import os
+import threading
 import time
 from datetime import datetime
 from enum import IntEnum
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
+from celery.signals import worker_process_shutdown
 from django.conf import settings
 
 from sentry.constants import DataCategory
 from sentry.utils import json, kafka_config, metrics
-from sentry.utils.dates import to_datetime
+from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.pubsub import KafkaPublisher
 
+logger = logging.getLogger(__name__)
+
 # valid values for outcome
 
 
@@ -34,6 +41,7 @@ class Outcome(IntEnum):
 
 outcomes_publisher = None
 billing_publisher = None
+outcome_aggregator = None
 
 
 def track_outcome(
@@ -56,9 +64,12 @@ def track_outcome(
     This sends the "outcome" message to Kafka which is used by Snuba to serve
     data for SnubaTSDB and RedisSnubaTSDB, such as # of rate-limited/filtered
     events.
+
+    With ``SENTRY_OUTCOMES_AGGREGATION_ENABLED``, accepted outcomes and
+    outcomes without an event id are summed up in time buckets and sent
+    later, without their event id. See ``OutcomeAggregator``.
     """
-    global outcomes_publisher
-    global billing_publisher
+    global outcome_aggregator
 
     if quantity is None:
         quantity = 1
@@ -71,42 +82,90 @@ def track_outcome(
     assert isinstance(category, (type(None), DataCategory))
     assert isinstance(quantity, int)
 
+    timestamp = timestamp or to_datetime(time.time())
+
+    if settings.SENTRY_OUTCOMES_AGGREGATION_ENABLED and (
+        event_id is None or outcome == Outcome.ACCEPTED
+    ):
+        if outcome_aggregator is None:
+            outcome_aggregator = OutcomeAggregator(**settings.SENTRY_OUTCOMES_AGGREGATION_OPTIONS)
+        outcome_aggregator.add(
+            org_id, project_id, key_id, outcome, reason, timestamp, category, quantity
+        )
+    else:
+        _publish_outcome(
+            org_id, project_id, key_id, outcome, reason, timestamp, event_id, category, quantity
+        )
+
+    metrics.incr(
+        "events.outcomes",
+        skip_internal=True,
+        tags={
+            "outcome": outcome.name.lower(),
+            "reason": reason,
+            "category": category.api_name() if category is not None else "null",
+            "topic": _get_topic_name(outcome),
+        },
+    )
+
+
+def _use_billing(outcome: Outcome) -> bool:
+    billing_config = settings.KAFKA_TOPICS.get(settings.KAFKA_OUTCOMES_BILLING)
+    return billing_config is not None and outcome.is_billing()
+
+
+def _get_topic_name(outcome: Outcome) -> str:
+    # Send billing outcomes to a dedicated topic if there is a separate
+    # configuration for it. Otherwise, fall back to the regular outcomes topic.
+    # This does NOT switch the producer, if both topics are on the same cluster.
+    #
+    # In Sentry, there is no significant difference between the classes of
+    # outcome. In Sentry SaaS, they have elevated stability requirements as they
+    # are used for spike protection and quota enforcement.
+    return settings.KAFKA_OUTCOMES_BILLING if _use_billing(outcome) else settings.KAFKA_OUTCOMES
+
+
+def _get_publisher(outcome: Outcome) -> KafkaPublisher:
+    global outcomes_publisher
+    global billing_publisher
+
     outcomes_config = settings.KAFKA_TOPICS[settings.KAFKA_OUTCOMES]
     billing_config = settings.KAFKA_TOPICS.get(settings.KAFKA_OUTCOMES_BILLING)
-    use_billing = billing_config is not None and outcome.is_billing()
 
     # Create a second producer instance only if the cluster differs. Otherwise,
     # reuse the same producer and just send to the other topic.
-    if use_billing and billing_config["cluster"] != outcomes_config["cluster"]:
+    if _use_billing(outcome) and billing_config["cluster"] != outcomes_config["cluster"]:
         if billing_publisher is None:
             cluster_name = billing_config["cluster"]
             billing_publisher = KafkaPublisher(
                 kafka_config.get_kafka_producer_cluster_options(cluster_name)
             )
-        publisher = billing_publisher
+        return billing_publisher
 
-    else:
-        if outcomes_publisher is None:
-            cluster_name = outcomes_config["cluster"]
-            outcomes_publisher = KafkaPublisher(
-                kafka_config.get_kafka_producer_cluster_options(cluster_name)
-            )
-        publisher = outcomes_publisher
+    if outcomes_publisher is None:
+        cluster_name = outcomes_config["cluster"]
+        outcomes_publisher = KafkaPublisher(
+            kafka_config.get_kafka_producer_cluster_options(cluster_name)
+        )
+    return outcomes_publisher
 
-    timestamp = timestamp or to_datetime(time.time())
 
-    # Send billing outcomes to a dedicated topic if there is a separate
-    # configuration for it. Otherwise, fall back to the regular outcomes topic.
-    # This does NOT switch the producer, if both topics are on the same cluster.
-    #
-    # In Sentry, there is no significant difference between the classes of
-    # outcome. In Sentry SaaS, they have elevated stability requirements as they
-    # are used for spike protection and quota enforcement.
-    topic_name = settings.KAFKA_OUTCOMES_BILLING if use_billing else settings.KAFKA_OUTCOMES
+def _publish_outcome(
+    org_id: int,
+    project_id: int,
+    key_id: Optional[int],
+    outcome: Outcome,
+    reason: Optional[str],
+    timestamp: datetime,
+    event_id: Optional[str],
+    category: Optional[DataCategory],
+    quantity: int,
+) -> None:
+    publisher = _get_publisher(outcome)
 
     # Send a snuba metrics payload.
     publisher.publish(
-        topic_name,
+        _get_topic_name(outcome),
         json.dumps(
             {
                 "timestamp": timestamp,
@@ -122,13 +181,121 @@ def track_outcome(
         ),
     )
 
-    metrics.incr(
-        "events.outcomes",
-        skip_internal=True,
-        tags={
-            "outcome": outcome.name.lower(),
-            "reason": reason,
-            "category": category.api_name() if category is not None else "null",
-            "topic": topic_name,
-        },
-    )
+
+OutcomeKey = Tuple[int, int, Optional[int], Outcome, Optional[str], Optional[DataCategory], int]
+
+
+class OutcomeAggregator:
+    """
+    Sums up the quantity of outcomes with the same org, project, key, outcome,
+    reason and category within time buckets of ``bucket_interval`` seconds.
+
+    Pending buckets are published by a background thread every
+    ``flush_interval`` seconds, and by ``add`` once there are more than
+    ``max_buckets`` of them. The published timestamp is the start of the
+    bucket. Pending outcomes are lost if the process is killed. On a regular
+    interpreter exit and when a Celery worker process shuts down (which
+    skips ``atexit``), they are published and the producers are flushed.
+    """
+
+    def __init__(self, bucket_interval: int, flush_interval: float, max_buckets: int) -> None:
+        self.bucket_interval = bucket_interval
+        self.flush_interval = flush_interval
+        self.max_buckets = max_buckets
+
+        self._buckets: Dict[OutcomeKey, int] = {}
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+        atexit.register(self._on_shutdown)
+        worker_process_shutdown.connect(self._on_shutdown, weak=False)
+
+    def _ensure_flusher(self) -> None:
+        # Buckets and threads are not carried over into forked children (the
+        # parent flushes its own buckets), so the flusher is started lazily
+        # by the process that records outcomes.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._buckets = {}
+            self._pid = pid
+
+        thread = threading.Thread(target=self._run, name="outcome-aggregator", daemon=True)
+        thread.start()
+
+    def _on_shutdown(self, **kwargs: Any) -> None:
+        # Publishing only queues the messages in the producer, they must be
+        # delivered before the process goes away.
+        self.flush()
+        for publisher in (outcomes_publisher, billing_publisher):
+            if publisher is not None:
+                publisher.flush()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush aggregated outcomes")
+
+    def add(
+        self,
+        org_id: int,
+        project_id: int,
+        key_id: Optional[int],
+        outcome: Outcome,
+        reason: Optional[str],
+        timestamp: datetime,
+        category: Optional[DataCategory],
+        quantity: int,
+    ) -> None:
+        self._ensure_flusher()
+
+        bucket = int(to_timestamp(timestamp)) // self.bucket_interval * self.bucket_interval
+        key = (org_id, project_id, key_id, outcome, reason, category, bucket)
+        with self._lock:
+            self._buckets[key] = self._buckets.get(key, 0) + quantity
+            full = len(self._buckets) >= self.max_buckets
+
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+
+        if not buckets:
+            return
+
+        for (
+            org_id,
+            project_id,
+            key_id,
+            outcome,
+            reason,
+            category,
+            bucket,
+        ), quantity in buckets.items():
+            _publish_outcome(
+                org_id,
+                project_id,
+                key_id,
+                outcome,
+                reason,
+                to_datetime(bucket),
+                None,
+                category,
+                quantity,
+            )
+
+        metrics.incr("outcomes.aggregator.flushed_buckets", amount=len(buckets))
+
+
+def flush_outcomes() -> None:
+    """Publishes aggregated outcomes that are still pending."""
+    if outcome_aggregator is not None:
+        outcome_aggregator.flush()
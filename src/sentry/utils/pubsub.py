@@ -75,3 +75,7 @@ class KafkaPublisher:
             self.producer.poll(0)
         else:
             self.producer.flush()
+
+    def flush(self):
+        """Waits until all published messages have been delivered."""
+        self.producer.flush()
@@ -3,14 +3,27 @@ import logging
 import os
 import random
 import re
+import threading
 import time
+import zlib
 from collections import OrderedDict, namedtuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta
 from hashlib import sha1
-from typing import Any, Callable, List, Mapping, MutableMapping, Optional, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from urllib.parse import urlparse
 
 import pytz
@@ -23,6 +36,7 @@ from sentry_sdk import Hub
 from snuba_sdk import Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
 from sentry.models import (
     Environment,
     Group,
@@ -349,6 +363,59 @@ _snuba_pool = connection_from_url(
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
 
+class InflightQueries:
+    """
+    Coalesces identical queries that are in flight at the same time.
+
+    The first thread to issue a query runs it, threads issuing the same query
+    while it is running wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: MutableMapping[str, Future] = {}
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._futures[key] = Future()
+
+        if not is_owner:
+            metrics.incr("snuba.client.query_coalesced")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+
+_inflight_queries = InflightQueries()
+
+# Limits the number of concurrent requests per referrer, keyed by
+# (referrer, limit) so that changing the limit takes effect immediately.
+_referrer_semaphores: MutableMapping[Tuple[str, int], threading.BoundedSemaphore] = {}
+_referrer_semaphores_lock = threading.Lock()
+
+
+def _get_referrer_semaphore(referrer: str, limit: int) -> threading.BoundedSemaphore:
+    key = (referrer, limit)
+    semaphore = _referrer_semaphores.get(key)
+    if semaphore is None:
+        with _referrer_semaphores_lock:
+            semaphore = _referrer_semaphores.setdefault(key, threading.BoundedSemaphore(limit))
+    return semaphore
+
+
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
 
@@ -720,6 +787,28 @@ def get_cache_key(query: SnubaQuery) -> str:
     return f"sqc:{sha1(hashable.encode('utf-8')).hexdigest()}"
 
 
+def _get_refresh_lock_key(cache_key: str) -> str:
+    return f"{cache_key}:refresh"
+
+
+def _encode_cached_result(result: Mapping[str, Any], soft_ttl: int) -> Mapping[str, Any]:
+    return {
+        "expires_at": time.time() + soft_ttl,
+        "data": zlib.compress(json.dumps(result).encode("utf-8")),
+    }
+
+
+def _decode_cached_result(value: Union[str, Mapping[str, Any]]) -> Tuple[Any, bool]:
+    """
+    Returns the cached result and whether it is stale. Results cached with a
+    soft TTL are stored compressed, results cached without are plain JSON and
+    never considered stale.
+    """
+    if isinstance(value, str):
+        return json.loads(value), False
+    return json.loads(zlib.decompress(value["data"])), value["expires_at"] <= time.time()
+
+
 def bulk_raw_query(
     snuba_param_list: Sequence[SnubaQueryParams],
     referrer: Optional[str] = None,
@@ -742,6 +831,11 @@ def _apply_cache_and_build_results(
     query_param_list = list(enumerate(snuba_param_list))
 
     results = []
+    # Cache keys of stale results this call holds the refresh lock for
+    refresh_locks = []
+    # Stale results being refreshed by this call, by query position
+    stale_results: Dict[int, Any] = {}
+    soft_ttl = options.get("snuba.query-cache.soft-ttl") if use_cache else 0
 
     if use_cache:
         cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
@@ -753,18 +847,52 @@ def _apply_cache_and_build_results(
             if cached_result is None:
                 metrics.incr("snuba.query_cache.miss", tags=metric_tags)
                 to_query.append((query_pos, query_params, cache_key))
+                continue
+
+            result, is_stale = _decode_cached_result(cached_result)
+            # Only one caller refreshes a stale result, everybody else keeps
+            # serving the stale one until it is replaced.
+            if is_stale and cache.add(
+                _get_refresh_lock_key(cache_key), 1, settings.SENTRY_SNUBA_TIMEOUT
+            ):
+                metrics.incr("snuba.query_cache.refresh", tags=metric_tags)
+                to_query.append((query_pos, query_params, cache_key))
+                refresh_locks.append(cache_key)
+                stale_results[query_pos] = result
             else:
-                metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
+                metrics.incr(
+                    "snuba.query_cache.stale_hit" if is_stale else "snuba.query_cache.hit",
+                    tags=metric_tags,
+                )
+                results.append((query_pos, result))
     else:
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
 
     if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
-        for result, (query_pos, _, cache_key) in zip(query_results, to_query):
-            if cache_key:
-                cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
-            results.append((query_pos, result))
+        try:
+            query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
+        except Exception:
+            # A failed refresh keeps serving the stale results, only cache
+            # misses have nothing to fall back to.
+            if len(stale_results) < len(to_query):
+                raise
+            logger.warning(
+                "snuba.query_cache.refresh-failed", extra={"referrer": referrer}, exc_info=True
+            )
+            results.extend(stale_results.items())
+        else:
+            for result, (query_pos, _, cache_key) in zip(query_results, to_query):
+                if cache_key and soft_ttl:
+                    hard_ttl = max(soft_ttl, options.get("snuba.query-cache.hard-ttl"))
+                    cache.set(cache_key, _encode_cached_result(result, soft_ttl), hard_ttl)
+                elif cache_key:
+                    cache.set(
+                        cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS
+                    )
+                results.append((query_pos, result))
+        finally:
+            if refresh_locks:
+                cache.delete_many([_get_refresh_lock_key(key) for key in refresh_locks])
 
     # Sort so that we get the results back in the original param list order
     results.sort()
@@ -794,6 +922,11 @@ def _bulk_snuba_query(
         if isinstance(snuba_param_list[0][0], Request):
             query_fn = _snql_query
 
+        concurrency_limit = options.get("snuba.client.referrer-concurrency-limit")
+        coalesce = options.get("snuba.client.coalesce-inflight-queries")
+        if concurrency_limit or coalesce:
+            query_fn = functools.partial(_execute_query, query_fn, concurrency_limit, coalesce)
+
         with sentry_sdk.configure_scope() as scope:
             if scope.transaction:
                 # XXX(evanh): There seems to be a bug where the parent API is attributed to
@@ -826,10 +959,11 @@ def _bulk_snuba_query(
             # No need to submit to the thread pool if we're just performing a single query
             query_results = [query_fn((snuba_param_list[0], Hub(Hub.current), headers))]
 
+    use_rapid_json = options.get("snuba.client.rapidjson-decode")
     results = []
     for response, _, reverse in query_results:
         try:
-            body = json.loads(response.data)
+            body = json.loads(response.data, use_rapid_json=use_rapid_json)
             if SNUBA_INFO:
                 if "sql" in body:
                     print(  # NOQA: only prints when an env variable is set
@@ -865,12 +999,47 @@ def _bulk_snuba_query(
                 raise SnubaError(f"HTTP {response.status}")
 
         # Forward and reverse translation maps from model ids to snuba keys, per column
-        body["data"] = [reverse(d) for d in body["data"]]
+        translate_rows = getattr(reverse, "translate_rows", None)
+        if translate_rows is not None:
+            body["data"] = translate_rows(body["data"])
+        else:
+            body["data"] = [reverse(d) for d in body["data"]]
         results.append(body)
 
     return results
 
 
+def _execute_query(
+    query_fn: Callable[[Tuple[SnubaQuery, Hub, Mapping[str, str]]], "RawResult"],
+    concurrency_limit: int,
+    coalesce: bool,
+    params: Tuple[SnubaQuery, Hub, Mapping[str, str]],
+) -> "RawResult":
+    query_data, _, headers = params
+
+    def run_query():
+        if not concurrency_limit:
+            return query_fn(params)
+
+        referrer = headers.get("referer", "<unknown>")
+        semaphore = _get_referrer_semaphore(referrer, concurrency_limit)
+        with timer("referrer_concurrency_wait"):
+            semaphore.acquire()
+        try:
+            return query_fn(params)
+        finally:
+            semaphore.release()
+
+    if not coalesce:
+        return run_query()
+
+    # Only the response is shared, every caller translates it with its own
+    # forward and reverse translators.
+    response, _, _ = _inflight_queries.run(get_cache_key(query_data[0]), run_query)
+    _, forward, reverse = query_data
+    return response, forward, reverse
+
+
 RawResult = Tuple[urllib3.response.HTTPResponse, Callable[[Any], Any], Callable[[Any], Any]]
 
 
@@ -1240,6 +1409,43 @@ def get_json_type(snuba_type):
 # is implemented here for simplicity.
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_snuba_timestamp(value):
+    # Result sets repeat the same time buckets for every group of a query
+    return int(to_timestamp(parse_datetime(value)))
+
+
+class RowTranslator:
+    """
+    Translates result rows with a list of ``(column, translate(row))`` pairs.
+    Each translator is only applied to rows containing its column.
+
+    ``translate_rows`` translates an entire result set. As all rows of a
+    Snuba result have the same columns, the applicable translators are only
+    determined once instead of for every row.
+    """
+
+    def __init__(self, translators):
+        self.translators = translators
+
+    def __call__(self, row):
+        for col, translate in self.translators:
+            if col in row:
+                row = translate(row)
+        return row
+
+    def translate_rows(self, rows):
+        if not rows:
+            return rows
+        translators = [translate for col, translate in self.translators if col in rows[0]]
+        if not translators:
+            return rows
+        for row in rows:
+            for translate in translators:
+                translate(row)
+        return rows
+
+
 def get_snuba_translators(filter_keys, is_grouprelease=False):
     """
     Some models are stored differently in snuba, eg. as the environment
@@ -1266,7 +1472,7 @@ def get_snuba_translators(filter_keys, is_grouprelease=False):
     replace = lambda d, key, val: d.update({key: val}) or d
 
     forward = identity
-    reverse = identity
+    reverse_translators = []
 
     map_columns = {
         "environment": (Environment, "name", lambda name: None if name == "" else name),
@@ -1320,33 +1526,23 @@ def get_snuba_translators(filter_keys, is_grouprelease=False):
                     filters, col, [trans[k] for k in filters[col] if k]
                 )
             )(col, fwd_map)
-            rev = (
-                lambda col, trans: lambda row: replace(row, col, trans[row[col]])
-                if col in row
-                else row
-            )(col, rev_map)
+            rev = (lambda col, trans: lambda row: replace(row, col, trans[row[col]]))(col, rev_map)
 
         if fwd:
             forward = compose(forward, fwd)
         if rev:
-            reverse = compose(reverse, rev)
-
-    # Extra reverse translator for time column.
-    reverse = compose(
-        reverse,
-        lambda row: replace(row, "time", int(to_timestamp(parse_datetime(row["time"]))))
-        if "time" in row
-        else row,
-    )
-    # Extra reverse translator for bucketed_end column.
-    reverse = compose(
-        reverse,
-        lambda row: replace(
-            row, "bucketed_end", int(to_timestamp(parse_datetime(row["bucketed_end"])))
+            reverse_translators.append((col, rev))
+
+    # Extra reverse translators for time columns.
+    for col in ("time", "bucketed_end"):
+        reverse_translators.append(
+            (
+                col,
+                (lambda col: lambda row: replace(row, col, _parse_snuba_timestamp(row[col])))(col),
+            )
         )
-        if "bucketed_end" in row
-        else row,
-    )
+
+    reverse = RowTranslator(reverse_translators)
 
     return (forward, reverse)
 
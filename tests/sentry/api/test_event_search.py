@@ -1,6 +1,8 @@
 import datetime
 import os
+from copy import deepcopy
 from datetime import timedelta
+from unittest import mock
 
 import pytest
 from django.test import SimpleTestCase
@@ -10,11 +12,13 @@ from freezegun import freeze_time
 from sentry.api.event_search import (
     AggregateFilter,
     AggregateKey,
+    ParenExpression,
     SearchConfig,
     SearchFilter,
     SearchKey,
     SearchValue,
     parse_search_query,
+    parsed_query_cache,
 )
 from sentry.constants import MODULE_ROOT
 from sentry.exceptions import InvalidSearchQuery
@@ -477,6 +481,73 @@ class ParseSearchQueryBackendTest(SimpleTestCase):
         assert search_filter.value.value == 'a"b'
 
 
+class ParseSearchQueryCacheTest(SimpleTestCase):
+    def setUp(self):
+        parsed_query_cache.clear()
+        self.addCleanup(parsed_query_cache.clear)
+
+    def test_cached(self):
+        result = parse_search_query("user.email:foo@example.com release:1.2.1 hello")
+        assert len(parsed_query_cache) == 1
+
+        with mock.patch("sentry.api.event_search.SearchVisitor") as visitor:
+            cached = parse_search_query("user.email:foo@example.com release:1.2.1 hello")
+        assert not visitor.called
+        assert cached == result
+        # Callers get their own list
+        assert cached is not result
+
+    def test_cached_results_are_not_shared(self):
+        query = "release:[a, b] (foo:bar OR foo:baz)"
+        result = parse_search_query(query)
+        expected = deepcopy(result)
+
+        in_filter, paren = result
+        assert isinstance(paren, ParenExpression)
+        in_filter.value.raw_value.append("c")
+        paren.children.clear()
+
+        assert parse_search_query(query) == expected
+
+    def test_config(self):
+        query = "someValue:123"
+        assert parse_search_query(query) == [
+            SearchFilter(key=SearchKey(name="someValue"), operator="=", value=SearchValue("123"))
+        ]
+        config = SearchConfig(key_mappings={"target_value": ["someValue"]})
+        assert parse_search_query(query, config=config) == [
+            SearchFilter(key=SearchKey(name="target_value"), operator="=", value=SearchValue("123"))
+        ]
+        assert parse_search_query(query, config_overrides={"blocked_keys": {"someValue"}}) == [
+            SearchFilter(key=SearchKey(name="someValue"), operator="=", value=SearchValue("123"))
+        ]
+        assert len(parsed_query_cache) == 3
+
+    def test_time_dependent_not_cached(self):
+        now = timezone.now()
+        with freeze_time(now):
+            parse_search_query("time:-24h")
+        with freeze_time(now + timedelta(hours=1)):
+            assert parse_search_query("time:-24h") == [
+                SearchFilter(
+                    key=SearchKey(name="time"),
+                    operator=">=",
+                    value=SearchValue(now - timedelta(hours=23)),
+                )
+            ]
+        assert len(parsed_query_cache) == 0
+
+    def test_params_not_cached(self):
+        parse_search_query("hello", params={"project_id": [1]})
+        assert len(parsed_query_cache) == 0
+
+    def test_invalid_query_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(InvalidSearchQuery):
+                parse_search_query("(hello")
+        assert len(parsed_query_cache) == 0
+
+
 @pytest.mark.parametrize(
     "raw,result",
     [
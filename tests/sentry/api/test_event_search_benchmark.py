@@ -0,0 +1,57 @@
+import pytest
+
+from sentry.api.event_search import _parse_tree, parse_search_query, parsed_query_cache
+from sentry.api.issue_search import parse_search_query as parse_issue_search_query
+
+# Representative queries from issue search, discover and metric alerts
+QUERIES = [
+    "",
+    "event.type:error",
+    "event.type:transaction transaction.duration:>300ms",
+    'transaction:"/api/0/organizations/{organization_slug}/issues/" http.method:GET',
+    "user.email:*@example.com !browser.name:Chrome release:[1.2.1, 1.2.2]",
+    "count():>100 p95(transaction.duration):>1s failure_rate():>0.05",
+    "(level:error OR level:fatal) AND project.id:[1, 2, 3] error.handled:0",
+    'message:"Connection reset by peer" has:stack.filename stack.in_app:true',
+    "measurements.lcp:>2.5s measurements.cls:>0.1 sdk.name:sentry.javascript.browser",
+    'some free text search with a tag:value and another.tag:"quoted value"',
+]
+ISSUE_QUERIES = [
+    "is:unresolved",
+    "is:unresolved is:for_review assigned_or_suggested:[me, none]",
+    "is:unresolved assigned:me bookmarks:me",
+    "is:unresolved times_seen:>100 first_seen:2021-01-01T00:00:00",
+]
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def clear_caches():
+    parsed_query_cache.clear()
+    _parse_tree.cache_clear()
+
+
+def parse_all():
+    for query in QUERIES:
+        parse_search_query(query)
+    for query in ISSUE_QUERIES:
+        parse_issue_search_query(query)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_parse_search_query_uncached(benchmark):
+    benchmark.pedantic(parse_all, setup=clear_caches, rounds=20)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_parse_search_query_cached(benchmark):
+    clear_caches()
+    parse_all()
+    benchmark(parse_all)
@@ -1,3 +1,4 @@
+import math
 from datetime import timedelta
 from unittest import mock
 
@@ -69,3 +70,80 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_many_bulk_updates(self):
+        project = self.create_project()
+        releases = [self.create_release(project=project, version=f"1.0.{i}") for i in range(3)]
+        release_projects = [
+            ReleaseProject.objects.get(project=project, release=release) for release in releases
+        ]
+
+        self.buf.process_many(
+            [
+                (
+                    ReleaseProject,
+                    {"new_groups": i + 1},
+                    {"release_id": release.id, "project_id": project.id},
+                    None,
+                    None,
+                )
+                for i, release in enumerate(releases)
+            ]
+        )
+
+        for i, release_project in enumerate(release_projects):
+            release_project.refresh_from_db()
+            assert release_project.new_groups == i + 1
+
+    def test_process_many_creates_missing_rows(self):
+        existing = self.create_release(project=self.project, version="2.0.0")
+        missing = Release.objects.create(organization=self.organization, version="2.0.1")
+        batch = [
+            (
+                ReleaseProject,
+                {"new_groups": 1},
+                {"release_id": release.id, "project_id": self.project.id},
+                None,
+                None,
+            )
+            for release in (existing, missing)
+        ]
+
+        with mock.patch("sentry.buffer.base.buffer_incr_complete") as signal:
+            self.buf.process_many(batch)
+
+        assert ReleaseProject.objects.get(project=self.project, release=existing).new_groups == 1
+        assert ReleaseProject.objects.get(project=self.project, release=missing).new_groups == 1
+        assert signal.send_robust.call_count == 2
+
+    def test_process_many_bulk_updates_groups(self):
+        groups = [self.create_group(times_seen=1) for _ in range(2)]
+        the_date = timezone.now() + timedelta(days=5)
+        batch = [
+            (Group, {"times_seen": 1}, {"id": group.id}, {"last_seen": the_date}, None)
+            for group in groups
+        ]
+
+        with mock.patch("sentry.buffer.base.Buffer.process") as process:
+            self.buf.process_many(batch)
+        assert not process.called
+
+        for group in groups:
+            group_ = Group.objects.get(id=group.id)
+            assert group_.times_seen == 2
+            assert group_.last_seen == the_date
+            # Same as ``ScoreClause``: log10 of the new times_seen plus last_seen
+            expected_score = math.log10(2) * 600 + int(the_date.timestamp())
+            assert abs(group_.score - expected_score) <= 1
+            # The cached instance is updated as well
+            assert Group.objects.get_from_cache(id=group.id).times_seen == 2
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_many_falls_back_for_group_lookups(self, process):
+        columns = {"times_seen": 1}
+        batch = [
+            (Group, columns, {"id": 1, "project_id": 1}, None, None),
+            (Group, columns, {"id": 2, "project_id": 1}, None, None),
+        ]
+        self.buf.process_many(batch)
+        assert process.call_args_list == [mock.call(*item) for item in batch]
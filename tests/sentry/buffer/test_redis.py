@@ -2,11 +2,12 @@ import pickle
 from datetime import datetime
 from unittest import mock
 
+from celery.signals import worker_process_shutdown
 from django.utils import timezone
 from django.utils.encoding import force_text
 from freezegun import freeze_time
 
-from sentry.buffer.redis import RedisBuffer
+from sentry.buffer.redis import RedisBuffer, _coalescing_buffers
 from sentry.models import Group, Project
 from sentry.testutils import TestCase
 
@@ -230,3 +231,123 @@ class RedisBufferTest(TestCase):
 #            "m": "mock.mock.Mock",
 #            "s": "1"
 #        }
+
+
+class CoalescingRedisBufferTest(TestCase):
+    def setUp(self):
+        self.buf = RedisBuffer(coalesce_max_keys=10, coalesce_max_delay=60)
+
+    def test_incr_is_coalesced(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+        key = self.buf._make_key(model, filters=filters)
+
+        self.buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "bar"})
+        self.buf.incr(model, {"times_seen": 2}, filters, extra={"foo": "baz"})
+        assert client.hgetall(key) == {}
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 3}
+
+        self.buf.flush_coalesced()
+        result = {force_text(k): v for k, v in client.hgetall(key).items()}
+        assert result["i+times_seen"] == b"3"
+        assert pickle.loads(result["e+foo"]) == "baz"
+        assert client.zrange("b:p", 0, -1) == [key.encode("utf-8")]
+        assert self.buf.get(model, ["times_seen"], filters=filters) == {"times_seen": 3}
+
+    def test_flush_on_max_keys(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+
+        for i in range(self.buf.coalesce_max_keys):
+            self.buf.incr(model, {"times_seen": 1}, {"pk": i})
+
+        assert len(client.zrange("b:p", 0, -1)) == self.buf.coalesce_max_keys
+        assert self.buf._coalesced == {}
+
+    def test_signal_only_is_kept(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+        key = self.buf._make_key(model, filters=filters)
+
+        self.buf.incr(model, {"times_seen": 1}, filters, signal_only=True)
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        self.buf.flush_coalesced()
+        assert client.hget(key, "s") == b"1"
+
+    def test_flush_failure(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+        key = self.buf._make_key(model, filters=filters)
+        self.buf.coalesce_max_flush_attempts = 2
+
+        self.buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "bar"})
+        with mock.patch.object(
+            self.buf.cluster, "get_local_client", side_effect=Exception("Boom!")
+        ):
+            self.buf.flush_coalesced()
+
+        # Failed increments are kept and written by the next flush
+        self.buf.incr(model, {"times_seen": 2}, filters, extra={"foo": "baz"})
+        self.buf.flush_coalesced()
+        result = {force_text(k): v for k, v in client.hgetall(key).items()}
+        assert result["i+times_seen"] == b"3"
+        assert pickle.loads(result["e+foo"]) == "baz"
+
+        # ...until they have failed too often
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        with mock.patch.object(
+            self.buf.cluster, "get_local_client", side_effect=Exception("Boom!")
+        ):
+            self.buf.flush_coalesced()
+            self.buf.flush_coalesced()
+        assert self.buf._coalesced == {}
+
+    def test_flush_on_worker_shutdown(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+        key = self.buf._make_key(model, filters=filters)
+
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        worker_process_shutdown.send(sender=None)
+        assert client.hget(key, "i+times_seen") == b"1"
+        assert self.buf in _coalescing_buffers
+
+        # Buffers that never coalesced increments are not kept alive
+        assert RedisBuffer(coalesce_max_keys=10) not in _coalescing_buffers
+
+
+class BulkRedisBufferTest(TestCase):
+    def setUp(self):
+        self.buf = RedisBuffer(bulk_process=True)
+
+    @mock.patch("sentry.buffer.base.Buffer.process_many")
+    def test_process_drains_all_keys(self, process_many):
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        for i in range(3):
+            self.buf.incr(model, {"times_seen": i + 1}, {"pk": i})
+
+        client = self.buf.cluster.get_routing_client()
+        keys = [force_text(key) for key in client.zrange("b:p", 0, -1)]
+        with mock.patch("sentry.buffer.redis.import_string", return_value=model):
+            self.buf.process(batch_keys=keys)
+
+        (batch,) = process_many.call_args[0]
+        assert sorted(
+            (columns["times_seen"], filters["pk"]) for _, columns, filters, _, _ in batch
+        ) == [
+            (1, 0),
+            (2, 1),
+            (3, 2),
+        ]
+        assert client.zrange("b:p", 0, -1) == []
+        assert all(not client.exists(key) for key in keys)
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from sentry.db.models.manager.base import ModelL1Cache
+from sentry.models import Project
+from sentry.testutils import TestCase
+from sentry.utils.cache import cache
+
+
+class ModelL1CacheTest(TestCase):
+    def test_expiry(self):
+        l1_cache = ModelL1Cache("generation", ttl=0, maxsize=10)
+        l1_cache.set("a", {"foo": "bar"})
+        assert l1_cache.get("a") is None
+        assert len(l1_cache) == 0
+
+    def test_eviction(self):
+        l1_cache = ModelL1Cache("generation", ttl=60, maxsize=2)
+        l1_cache.set("a", 1)
+        l1_cache.set("b", 2)
+        assert l1_cache.get("a") == 1
+        l1_cache.set("c", 3)
+        assert l1_cache.get("b") is None
+        assert l1_cache.get("a") == 1
+        assert l1_cache.get("c") == 3
+
+    def test_instances_are_not_shared(self):
+        l1_cache = ModelL1Cache("generation", ttl=60, maxsize=2)
+        l1_cache.set("a", {"foo": "bar"})
+        l1_cache.get("a")["foo"] = "baz"
+        assert l1_cache.get("a") == {"foo": "bar"}
+
+
+@override_settings(SENTRY_MODEL_L1_CACHE_ENABLED=True, SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL=60)
+class GetFromCacheL1Test(TestCase):
+    def setUp(self):
+        super().setUp()
+        Project.objects._get_l1_cache().clear()
+        self.addCleanup(Project.objects._get_l1_cache().clear)
+
+    def test_disabled(self):
+        with override_settings(SENTRY_MODEL_L1_CACHE_ENABLED=False):
+            assert Project.objects._get_l1_cache() is None
+
+    def test_cached(self):
+        project = Project.objects.get_from_cache(id=self.project.id)
+
+        with mock.patch("sentry.db.models.manager.base.cache") as shared_cache:
+            with self.assertNumQueries(0):
+                result = Project.objects.get_from_cache(id=self.project.id)
+        assert not shared_cache.get.called
+        assert result == project
+        assert result is not project
+        assert result._state.db == project._state.db
+
+    def test_get_many_from_cache(self):
+        Project.objects.get_from_cache(id=self.project.id)
+
+        with mock.patch("sentry.db.models.manager.base.cache") as shared_cache:
+            with self.assertNumQueries(0):
+                assert Project.objects.get_many_from_cache([self.project.id]) == [self.project]
+        assert not shared_cache.get_many.called
+
+    def test_save_invalidates(self):
+        Project.objects.get_from_cache(id=self.project.id)
+        self.project.update(name="new name")
+        assert Project.objects.get_from_cache(id=self.project.id).name == "new name"
+
+    def test_other_process_invalidates(self):
+        Project.objects.get_from_cache(id=self.project.id)
+        l1_cache = Project.objects._get_l1_cache()
+        assert len(l1_cache) == 1
+
+        # Another process saving a project publishes a new generation
+        cache.set(l1_cache.generation_key, "other", version=Project.objects.cache_version)
+        assert len(Project.objects._get_l1_cache()) == 1
+        with override_settings(SENTRY_MODEL_L1_CACHE_CHECK_INTERVAL=0):
+            assert len(Project.objects._get_l1_cache()) == 0
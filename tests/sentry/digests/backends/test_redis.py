@@ -1,4 +1,5 @@
 import time
+from unittest import mock
 
 import pytest
 
@@ -151,3 +152,21 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_schedule_partition_failure(self):
+        backend = RedisBackend(partition_concurrency=2)
+        backend.add("timeline", Record("record:1", "value", time.time()))
+        with backend.digest("timeline", 0):
+            pass
+        backend.add("timeline", Record("record:2", "value", time.time()))
+
+        with mock.patch.object(
+            backend, "_RedisBackend__schedule_partition", side_effect=Exception("boom")
+        ):
+            assert list(backend.schedule(time.time())) == []
+
+        assert {entry.key for entry in backend.schedule(time.time())} == {"timeline"}
+
+    def test_invalid_partition_concurrency(self):
+        with pytest.raises(ValueError):
+            RedisBackend(partition_concurrency=0)
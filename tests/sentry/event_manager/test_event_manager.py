@@ -48,6 +48,7 @@ from sentry.models import (
 from sentry.projectoptions.defaults import DEFAULT_GROUPING_CONFIG, LEGACY_GROUPING_CONFIG
 from sentry.spans.grouping.utils import hash_values
 from sentry.testutils import TestCase, assert_mock_called_once_with_partial
+from sentry.testutils.helpers.options import override_options
 from sentry.types.activity import ActivityType
 from sentry.utils.cache import cache_key_for_event
 from sentry.utils.outcomes import Outcome
@@ -312,6 +313,29 @@ class EventManagerTest(TestCase):
         assert group.last_seen == event.datetime
         assert group.message == event2.message
 
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_stale_cached_grouphash(self):
+        cache.clear()
+        manager = EventManager(make_event(message="foo", event_id="a" * 32, fingerprint=["a" * 32]))
+        with self.tasks():
+            event = manager.save(self.project.id)
+
+        # Caches the grouphash, which then goes stale as its group is deleted
+        # without going through the model.
+        (grouphash,) = GroupHash.objects.get_or_create_many(
+            self.project, [event.get_primary_hash()]
+        ).values()
+        assert grouphash.group_id == event.group_id
+        GroupHash.objects.filter(id=grouphash.id).update(group=None)
+        Group.objects.filter(id=event.group_id).delete()
+
+        manager = EventManager(make_event(message="foo", event_id="b" * 32, fingerprint=["a" * 32]))
+        with self.tasks():
+            event2 = manager.save(self.project.id)
+
+        assert event2.group_id != event.group_id
+        assert GroupHash.objects.get(id=grouphash.id).group_id == event2.group_id
+
     def test_differentiates_with_fingerprint(self):
         manager = EventManager(
             make_event(message="foo", event_id="a" * 32, fingerprint=["{{ default }}", "a" * 32])
@@ -0,0 +1,62 @@
+import pytest
+
+from sentry.eventstore.processing.base import EventProcessingStore
+from sentry.eventstore.processing.codec import HEADER_PREFIX, EventProcessingStoreCodec
+from sentry.utils import json
+from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
+from sentry.utils.kvstore.memory import MemoryKVStorage
+
+
+def make_event(event_id, **kwargs):
+    return dict({"project": 1, "event_id": event_id}, **kwargs)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_codec_roundtrip(compress):
+    codec = EventProcessingStoreCodec(compress=compress)
+    event = make_event("a" * 32, tags=[["foo", "bar"]], extra={"nested": {"value": 1.5}})
+
+    encoded = codec.encode(event)
+    assert encoded.startswith(HEADER_PREFIX) == compress
+    assert codec.decode(encoded) == event
+
+
+def test_codec_reads_plain_json():
+    event = make_event("a" * 32)
+    assert EventProcessingStoreCodec(compress=True).decode(json.dumps(event)) == event
+
+
+def test_codec_falls_back_to_json():
+    codec = EventProcessingStoreCodec(compress=True)
+    event = make_event("a" * 32, value=2**70)
+
+    encoded = codec.encode(event)
+    assert not encoded.startswith(HEADER_PREFIX)
+    assert codec.decode(encoded) == event
+
+
+def test_codec_rejects_unknown_versions():
+    with pytest.raises(ValueError):
+        EventProcessingStoreCodec().decode(f"{HEADER_PREFIX}999:")
+
+
+def test_batched_operations():
+    store = EventProcessingStore(
+        KVStorageCodecWrapper(MemoryKVStorage(), EventProcessingStoreCodec(compress=True))
+    )
+    events = [make_event(c * 32) for c in "abc"]
+
+    keys = store.store_many(events)
+    unprocessed_keys = store.store_many(events[:1], unprocessed=True)
+    assert unprocessed_keys == [keys[0] + ":u"]
+
+    assert store.get_many(keys + ["missing"]) == dict(zip(keys, events))
+    assert store.get_many(keys, unprocessed=True) == {keys[0]: events[0]}
+    assert store.get(keys[1]) == events[1]
+
+    store.delete_many(keys[:2])
+    assert store.get_many(keys) == {keys[2]: events[2]}
+    assert store.get(keys[0], unprocessed=True) is None
+
+    store.delete_by_key(keys[2])
+    assert store.get_many(keys) == {}
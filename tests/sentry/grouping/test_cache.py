@@ -0,0 +1,84 @@
+from unittest import mock
+
+from sentry.grouping.api import (
+    get_default_grouping_config_dict,
+    get_fingerprinting_config_for_project,
+    load_grouping_config,
+)
+from sentry.grouping.cache import GroupingObjectCache, grouping_object_cache
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+class GroupingObjectCacheTest(TestCase):
+    def setUp(self):
+        self.cache = GroupingObjectCache()
+
+    def test_reuses_built_objects(self):
+        build = mock.Mock(side_effect=lambda: object())
+        first = self.cache.get_or_build("enhancements", "abc", build)
+        assert self.cache.get_or_build("enhancements", "abc", build) is first
+        assert build.call_count == 1
+
+        # Sources are namespaced by kind
+        assert self.cache.get_or_build("fingerprinting", "abc", build) is not first
+        assert build.call_count == 2
+
+    @override_options({"grouping.config-cache.max-entries": 2})
+    def test_max_entries(self):
+        for source in ("a", "b", "c"):
+            self.cache.get_or_build("config", source, object)
+        assert len(self.cache) == 2
+
+        build = mock.Mock(side_effect=object)
+        self.cache.get_or_build("config", "a", build)
+        assert build.called
+
+    @override_options({"grouping.config-cache.max-bytes": 10})
+    def test_max_bytes(self):
+        self.cache.get_or_build("config", "x" * 6, object)
+        self.cache.get_or_build("config", "y" * 6, object)
+        assert len(self.cache) == 1
+
+        # Sources over the budget are never cached
+        self.cache.get_or_build("config", "z" * 11, object)
+        assert len(self.cache) == 1
+
+    @override_options({"grouping.config-cache.max-entries": 0})
+    def test_disabled(self):
+        build = mock.Mock(side_effect=object)
+        self.cache.get_or_build("config", "a", build)
+        self.cache.get_or_build("config", "a", build)
+        assert build.call_count == 2
+        assert len(self.cache) == 0
+
+    def test_errors_are_not_cached(self):
+        build = mock.Mock(side_effect=ValueError)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.cache.get_or_build("enhancements", "abc", build)
+        assert build.call_count == 2
+        assert len(self.cache) == 0
+
+
+class GroupingApiCacheTest(TestCase):
+    def setUp(self):
+        grouping_object_cache.clear()
+        self.addCleanup(grouping_object_cache.clear)
+
+    def test_load_grouping_config(self):
+        config_dict = get_default_grouping_config_dict()
+        config = load_grouping_config(config_dict)
+        assert load_grouping_config(dict(config_dict)) is config
+        assert config.id == config_dict["id"]
+
+    def test_fingerprinting_config(self):
+        self.project.update_option(
+            "sentry:fingerprinting_rules", "type:DatabaseUnavailable -> DatabaseUnavailable"
+        )
+        rules = get_fingerprinting_config_for_project(self.project)
+        assert rules.to_json()["rules"][0]["fingerprint"] == ["DatabaseUnavailable"]
+
+        with mock.patch("sentry.utils.cache.cache.get") as cache_get:
+            assert get_fingerprinting_config_for_project(self.project) is rules
+        assert not cache_get.called
@@ -2,6 +2,7 @@ import pytest
 
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, create_match_frame
+from sentry.grouping.enhancer.matchers import get_literal_prefix
 
 
 def dump_obj(obj):
@@ -412,3 +413,30 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = action == "+"
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+def test_literal_prefix():
+    assert get_literal_prefix(b"std::*") == b"std::"
+    assert get_literal_prefix(b"*foo") == b""
+    assert get_literal_prefix(b"foo?bar") == b"foo"
+    assert get_literal_prefix(b"foo[ab]") == b"foo"
+    assert get_literal_prefix(b"foo") == b"foo"
+
+
+def test_prefilter_skips_other_families():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*              -app
+        family:javascript module:react-dom*        -group
+        """
+    )
+    native_rule, js_rule = enhancement.rules
+
+    assert native_rule.may_match_families({b"native"})
+    assert not native_rule.may_match_families({b"javascript"})
+    assert js_rule.may_match_families({b"javascript", b"other"})
+
+    frame = create_match_frame({"function": "std::vector::push_back"}, "native")
+    assert native_rule.get_matching_frame_actions([frame], "native")
+    frame = create_match_frame({"function": "boost::vector::push_back"}, "native")
+    assert not native_rule.get_matching_frame_actions([frame], "native")
@@ -1,8 +1,11 @@
+from unittest import mock
+
 import pytest
 
 from sentry.eventtypes.base import format_title_from_tree_label
 from sentry.grouping.api import detect_synthetic_exception, get_default_grouping_config_dict
 from sentry.grouping.component import GroupingComponent
+from sentry.grouping.enhancer import Rule
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
 from sentry.utils import json
 from tests.sentry.grouping import with_grouping_input
@@ -76,3 +79,33 @@ def test_event_hash_variant(config_name, grouping_input, insta_snapshot, log):
     assert evt.get_grouping_config() == grouping_config
 
     insta_snapshot(output)
+
+
+def _dump_variants(evt):
+    rv = []
+    for (key, value) in sorted(evt.get_grouping_variants().items()):
+        rv.append("%s:" % key)
+        dump_variant(value, rv, 1)
+    return rv
+
+
+@with_grouping_input("grouping_input")
+@pytest.mark.parametrize("config_name", CONFIGURATIONS.keys(), ids=lambda x: x.replace("-", "_"))
+def test_enhancement_prefilter_is_exact(config_name, grouping_input):
+    """
+    The prefilters of enhancement rules must only skip work, never change
+    the result. Compare against evaluating every rule on every frame.
+    """
+    grouping_config = get_default_grouping_config_dict(config_name)
+    evt = grouping_input.create_event(grouping_config)
+    evt.project = None
+    detect_synthetic_exception(evt.data, grouping_config)
+    expected = _dump_variants(evt)
+
+    with mock.patch.object(Rule, "_may_match_frame", lambda self, frame: True), mock.patch.object(
+        Rule, "may_match_families", lambda self, families: True
+    ):
+        evt = grouping_input.create_event(get_default_grouping_config_dict(config_name))
+        evt.project = None
+        detect_synthetic_exception(evt.data, grouping_config)
+        assert _dump_variants(evt) == expected
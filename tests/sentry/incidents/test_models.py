@@ -79,6 +79,36 @@ class IncidentGetForSubscriptionTest(TestCase):
         assert AlertRule.objects.get_for_subscription(subscription) == alert_rule
 
 
+class IncidentGetForSubscriptionsTest(TestCase):
+    def test(self):
+        alert_rule = self.create_alert_rule()
+        other_alert_rule = self.create_alert_rule()
+        subscription = alert_rule.snuba_query.subscriptions.get()
+        other_subscription = other_alert_rule.snuba_query.subscriptions.get()
+        AlertRule.objects.get_for_subscription(subscription)
+
+        with self.assertNumQueries(1):
+            assert AlertRule.objects.get_for_subscriptions([subscription, other_subscription]) == {
+                subscription.id: alert_rule,
+                other_subscription.id: other_alert_rule,
+            }
+
+        assert (
+            cache.get(AlertRule.objects.CACHE_SUBSCRIPTION_KEY % other_subscription.id)
+            == other_alert_rule
+        )
+        with self.assertNumQueries(0):
+            assert AlertRule.objects.get_for_subscriptions([other_subscription]) == {
+                other_subscription.id: other_alert_rule
+            }
+
+    def test_deleted_alert_rule(self):
+        alert_rule = self.create_alert_rule()
+        subscription = alert_rule.snuba_query.subscriptions.get()
+        delete_alert_rule(alert_rule)
+        assert AlertRule.objects.get_for_subscriptions([subscription]) == {}
+
+
 class IncidentClearSubscriptionCacheTest(TestCase):
     def setUp(self):
         self.alert_rule = self.create_alert_rule()
@@ -162,6 +192,26 @@ class AlertRuleTriggerClearCacheTest(TestCase):
         ) is None
 
 
+class AlertRuleTriggerGetForAlertRulesTest(TestCase):
+    def test(self):
+        alert_rule = self.create_alert_rule()
+        trigger = self.create_alert_rule_trigger(alert_rule)
+        other_alert_rule = self.create_alert_rule()
+
+        with self.assertNumQueries(1):
+            assert AlertRuleTrigger.objects.get_for_alert_rules([alert_rule, other_alert_rule]) == {
+                alert_rule.id: [trigger],
+                other_alert_rule.id: [],
+            }
+
+        with self.assertNumQueries(0):
+            assert AlertRuleTrigger.objects.get_for_alert_rules([alert_rule, other_alert_rule]) == {
+                alert_rule.id: [trigger],
+                other_alert_rule.id: [],
+            }
+        assert AlertRuleTrigger.objects.get_for_alert_rule(alert_rule) == [trigger]
+
+
 class ActiveIncidentClearCacheTest(TestCase):
     def setUp(self):
         self.alert_rule = self.create_alert_rule()
@@ -4,10 +4,13 @@ from random import randint
 from unittest.mock import Mock, call, patch
 from uuid import uuid4
 
+import pytest
 import pytz
 from django.utils import timezone
 from exam import fixture, patcher
 from freezegun import freeze_time
+from rediscluster.exceptions import RedisClusterException
+from rediscluster.pipeline import ClusterPipeline
 
 from sentry.incidents.logic import (
     CRITICAL_TRIGGER_LABEL,
@@ -33,8 +36,10 @@ from sentry.incidents.subscription_processor import (
     build_alert_rule_trigger_stat_key,
     build_trigger_stat_keys,
     get_alert_rule_stats,
+    get_alert_rule_stats_many,
     get_redis_client,
     partition,
+    process_subscription_updates,
     update_alert_rule_stats,
 )
 from sentry.models import Integration
@@ -818,6 +823,45 @@ class ProcessUpdateTest(ProcessUpdateBaseClass):
         self.assert_trigger_exists_with_status(other_incident, self.trigger, TriggerStatus.RESOLVED)
         self.assert_action_handler_called_with_actions(other_incident, [])
 
+    def test_process_subscription_updates(self):
+        # Verify that a batch of updates is processed in order per subscription, with
+        # stats carried over between the updates of a subscription
+        rule = self.rule
+        rule.update(threshold_period=2)
+        trigger = self.trigger
+        updates = [
+            (
+                self.build_subscription_update(
+                    subscription, value=trigger.alert_threshold + 1, time_delta=time_delta
+                ),
+                subscription,
+            )
+            for subscription, time_delta in [
+                (self.sub, timedelta(minutes=-10)),
+                (self.other_sub, timedelta(minutes=-9)),
+                (self.sub, timedelta(minutes=-9)),
+            ]
+        ]
+        with self.feature(
+            ["organizations:incidents", "organizations:performance-view"]
+        ), self.capture_on_commit_callbacks(execute=True):
+            process_subscription_updates(updates)
+
+        incident = self.assert_active_incident(rule, self.sub)
+        self.assert_trigger_exists_with_status(incident, self.trigger, TriggerStatus.ACTIVE)
+        self.assert_actions_fired_for_incident(
+            incident, [self.action], [(trigger.alert_threshold + 1, IncidentStatus.CRITICAL)]
+        )
+        self.assert_no_active_incident(rule, self.other_sub)
+
+        (sub_stats, other_sub_stats) = get_alert_rule_stats_many(
+            [(rule, self.sub, [trigger]), (rule, self.other_sub, [trigger])]
+        )
+        assert sub_stats[0] == updates[2][0]["timestamp"]
+        assert sub_stats[1:] == ({trigger.id: 0}, {trigger.id: 0})
+        assert other_sub_stats[0] == updates[1][0]["timestamp"]
+        assert other_sub_stats[1:] == ({trigger.id: 1}, {trigger.id: 0})
+
     def test_multiple_triggers(self):
         rule = self.rule
         rule.update(threshold_period=1)
@@ -2283,6 +2327,73 @@ class TestGetAlertRuleStats(TestCase):
         assert resolve_counts == {3: 2, 4: 4}
 
 
+class TestGetAlertRuleStatsMany(TestCase):
+    def test(self):
+        alert_rule = AlertRule(id=1)
+        other_alert_rule = AlertRule(id=2)
+        sub = QuerySubscription(project_id=2)
+        triggers = [AlertRuleTrigger(id=3)]
+        date = datetime.now().replace(tzinfo=pytz.utc, microsecond=0)
+        update_alert_rule_stats(alert_rule, sub, date, {3: 1}, {3: 2})
+
+        assert get_alert_rule_stats_many(
+            [(alert_rule, sub, triggers), (other_alert_rule, sub, triggers)]
+        ) == [
+            get_alert_rule_stats(alert_rule, sub, triggers),
+            get_alert_rule_stats(other_alert_rule, sub, triggers),
+        ]
+        assert get_alert_rule_stats_many([(alert_rule, sub, triggers)])[0][1:] == (
+            {3: 1},
+            {3: 2},
+        )
+
+    def test_cluster_pipeline(self):
+        alert_rule = AlertRule(id=1)
+        other_alert_rule = AlertRule(id=2)
+        sub = QuerySubscription(project_id=2)
+        triggers = [AlertRuleTrigger(id=3), AlertRuleTrigger(id=4)]
+        date = datetime.now().replace(tzinfo=pytz.utc, microsecond=0)
+        update_alert_rule_stats(alert_rule, sub, date, {3: 1, 4: 3}, {3: 2, 4: 4})
+        update_alert_rule_stats(other_alert_rule, sub, date, {3: 5, 4: 6}, {3: 7, 4: 8})
+        client = get_redis_client()
+
+        class SingleNodeClusterPipeline(ClusterPipeline):
+            """
+            Queues commands like a Redis Cluster pipeline (which rejects commands
+            such as `MGET`) and runs them against the single node test client.
+            """
+
+            def __init__(self):
+                super().__init__(connection_pool=None)
+
+            def execute(self, raise_on_error=True):
+                try:
+                    return [
+                        client.execute_command(*command.args, **command.options)
+                        for command in self.command_stack
+                    ]
+                finally:
+                    self.reset()
+
+        with pytest.raises(RedisClusterException):
+            SingleNodeClusterPipeline().mget(["a", "b"])
+
+        with patch(
+            "sentry.incidents.subscription_processor.get_redis_client"
+        ) as mock_get_redis_client:
+            mock_get_redis_client.return_value.pipeline.side_effect = (
+                lambda *args, **kwargs: SingleNodeClusterPipeline()
+            )
+            stats = get_alert_rule_stats_many(
+                [(alert_rule, sub, triggers), (other_alert_rule, sub, triggers)]
+            )
+
+        assert stats == [
+            (date, {3: 1, 4: 3}, {3: 2, 4: 4}),
+            (date, {3: 5, 4: 6}, {3: 7, 4: 8}),
+        ]
+
+
 class TestUpdateAlertRuleStats(TestCase):
     def test(self):
         alert_rule = AlertRule(id=1)
@@ -2306,3 +2417,15 @@ class TestUpdateAlertRuleStats(TestCase):
         )
 
         assert results == [int(to_timestamp(date)), 20, 10, 3, 15]
+
+    def test_pipeline(self):
+        alert_rule = AlertRule(id=1)
+        sub = QuerySubscription(project_id=2)
+        date = datetime.utcnow().replace(tzinfo=pytz.utc)
+        client = get_redis_client()
+        pipeline = client.pipeline()
+        update_alert_rule_stats(alert_rule, sub, date, {3: 20}, {}, pipeline=pipeline)
+        assert client.get("{alert_rule:1:project:2}:trigger:3:alert_triggered") is None
+
+        pipeline.execute()
+        assert client.get("{alert_rule:1:project:2}:trigger:3:alert_triggered") == "20"
@@ -7,6 +7,9 @@ import pytest
 
 from sentry.event_manager import EventManager
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
+    ShardedExecutor,
+    get_shard_key,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
@@ -371,3 +374,87 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     attachments = list(EventAttachment.objects.filter(project_id=project_id, event_id=event_id))
 
     assert not attachments
+
+
+def test_sharded_executor_keeps_order_per_key():
+    executor = ShardedExecutor(4, max_in_flight_per_shard=2)
+    seen = []
+
+    try:
+        futures = [
+            executor.submit(f"1:{event_id}", lambda e, i: seen.append((e, i)), event_id, i)
+            for i in range(10)
+            for event_id in ("a", "b", "c")
+        ]
+        for future in futures:
+            future.result()
+    finally:
+        executor.shutdown()
+
+    for event_id in ("a", "b", "c"):
+        assert [i for e, i in seen if e == event_id] == list(range(10))
+
+
+def test_sharded_executor_routing_is_stable():
+    executor = ShardedExecutor(8)
+    try:
+        message = {"project_id": 1, "event_id": "515539018c9b4260a6f999572f1661ee"}
+        shard = executor.get_shard(get_shard_key(message))
+        assert executor.get_shard(get_shard_key(dict(message))) == shard
+        assert 0 <= shard < executor.num_shards
+    finally:
+        executor.shutdown()
+
+
+# Shards run on their own threads and database connections, so the test data
+# must be committed to be visible to them.
+@pytest.mark.django_db(transaction=True)
+def test_sharded_worker_with_attachments(default_project, task_runner, monkeypatch):
+    monkeypatch.setattr("sentry.features.has", lambda *a, **kw: True)
+
+    payload = get_normalized_event({"message": "hello world"}, default_project)
+    event_id = payload["event_id"]
+    attachment_id = "ca90fb45-6dd9-40a0-a18f-8693aa621abb"
+    project_id = default_project.id
+
+    worker = IngestConsumerWorker(sharded_executor=ShardedExecutor(4))
+    batch = [
+        {
+            "type": "attachment_chunk",
+            "payload": chunk,
+            "event_id": event_id,
+            "project_id": project_id,
+            "id": attachment_id,
+            "chunk_index": i,
+        }
+        for i, chunk in enumerate((b"Hello ", b"World!"))
+    ]
+    batch.append(
+        {
+            "type": "event",
+            "payload": json.dumps(payload),
+            "start_time": time.time() - 3600,
+            "event_id": event_id,
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+            "attachments": [
+                {
+                    "id": attachment_id,
+                    "name": "lol.txt",
+                    "content_type": "text/plain",
+                    "attachment_type": "custom.attachment",
+                    "chunks": 2,
+                }
+            ],
+        }
+    )
+
+    try:
+        with task_runner():
+            worker.flush_batch(batch)
+    finally:
+        worker.shutdown()
+
+    (attachment,) = EventAttachment.objects.filter(project_id=project_id, event_id=event_id)
+    file = File.objects.get(id=attachment.file_id)
+    assert file.getfile().read() == b"Hello World!"
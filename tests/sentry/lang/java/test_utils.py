@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from sentry.lang.java.utils import TOUCH_INTERVAL, ProguardMapperCache
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+
+PROGUARD_SOURCE = b"""\
+org.slf4j.helpers.Util$ClassContextSecurityManager -> org.a.b.g$a:
+    65:65:void <init>() -> <init>
+    67:67:java.lang.Class[] getClassContext() -> a
+"""
+
+
+class ProguardMapperCacheTest(TestCase):
+    def setUp(self):
+        self.cache = ProguardMapperCache()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write_mapping(self, name, source=PROGUARD_SOURCE):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "wb") as f:
+            f.write(source)
+        return path
+
+    def test_reuses_opened_mappers(self):
+        path = self.write_mapping("a")
+        mapper = self.cache.open(path)
+        assert mapper.remap_class("org.a.b.g$a") == (
+            "org.slf4j.helpers.Util$ClassContextSecurityManager"
+        )
+        assert self.cache.open(path) is mapper
+        assert len(self.cache) == 1
+
+    @override_options({"processing.proguard-mapper-cache.max-bytes": 0})
+    def test_disabled(self):
+        path = self.write_mapping("a")
+        assert self.cache.open(path) is not self.cache.open(path)
+        assert len(self.cache) == 0
+
+    def test_evicts_by_file_size(self):
+        paths = [self.write_mapping(name) for name in "abc"]
+        with override_options(
+            {"processing.proguard-mapper-cache.max-bytes": 2 * len(PROGUARD_SOURCE)}
+        ):
+            first = self.cache.open(paths[0])
+            self.cache.open(paths[1])
+            # Refresh ``a`` so that ``b`` is the least recently used
+            self.cache.open(paths[0])
+            self.cache.open(paths[2])
+            assert len(self.cache) == 2
+            assert self.cache.open(paths[0]) is first
+
+            # Files over the budget are never cached
+            big = self.write_mapping("big", PROGUARD_SOURCE * 3)
+            self.cache.open(big)
+            assert len(self.cache) == 2
+
+    def test_reopens_replaced_files(self):
+        path = self.write_mapping("a")
+        mapper = self.cache.open(path)
+
+        # Simulates ``clear_old_entries`` removing the file and ``fetch_difs``
+        # writing it again.
+        os.rename(self.write_mapping("a.tmp"), path)
+        assert self.cache.open(path) is not mapper
+        assert len(self.cache) == 1
+
+    def test_touches_files_in_use(self):
+        path = self.write_mapping("a")
+        os.utime(path, (0, 0))
+        with mock.patch("time.time", return_value=TOUCH_INTERVAL):
+            self.cache.open(path)
+            self.cache.open(path)
+        assert os.path.getmtime(path) == 0
+
+        with mock.patch("time.time", return_value=TOUCH_INTERVAL * 2 + 1):
+            self.cache.open(path)
+        assert os.path.getmtime(path) > 0
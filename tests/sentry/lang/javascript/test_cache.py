@@ -1,6 +1,6 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ParsedArtifactCache, SourceCache
 
 
 class BasicCacheTest(TestCase):
@@ -37,3 +37,55 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ParsedArtifactCacheTest(TestCase):
+    def test_get_and_set(self):
+        cache = ParsedArtifactCache("source")
+        assert cache.get("a") is None
+
+        cache.set("a", "foo", size=3, max_size=10, ttl=60)
+        assert cache.get("a") == "foo"
+        assert len(cache) == 1
+        assert cache.size == 3
+
+        cache.set("a", "foobar", size=6, max_size=10, ttl=60)
+        assert cache.get("a") == "foobar"
+        assert cache.size == 6
+
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = ParsedArtifactCache("source")
+        cache.set("a", "a", size=4, max_size=10, ttl=60)
+        cache.set("b", "b", size=4, max_size=10, ttl=60)
+        assert cache.get("a") == "a"
+
+        cache.set("c", "c", size=4, max_size=10, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == "a"
+        assert cache.get("c") == "c"
+        assert cache.size == 8
+
+    def test_skips_oversized_entries(self):
+        cache = ParsedArtifactCache("source")
+        cache.set("a", "a", size=4, max_size=10, ttl=60)
+        cache.set("b", "b", size=11, max_size=10, ttl=60)
+        assert cache.get("a") == "a"
+        assert cache.get("b") is None
+
+    @mock.patch("sentry.utils.lru.time")
+    def test_expiry(self, mock_time):
+        mock_time.monotonic.return_value = 100
+        cache = ParsedArtifactCache("source")
+        cache.set("a", "a", size=1, max_size=10, ttl=60)
+
+        mock_time.monotonic.return_value = 160
+        assert cache.get("a") == "a"
+
+        mock_time.monotonic.return_value = 161
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.size == 0
@@ -28,11 +28,19 @@ from sentry.lang.javascript.processor import (
     get_max_age,
     get_release_file_cache_key,
     get_release_file_cache_key_meta,
+    parse_sourcemap,
+    parsed_source_cache,
+    parsed_sourcemap_cache,
     should_retry_fetch,
     trim_line,
 )
 from sentry.models import EventError, File, Release, ReleaseFile
-from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, update_artifact_index
+from sentry.models.releasefile import (
+    ARTIFACT_INDEX_FILENAME,
+    ReleaseArchive,
+    read_zip_tail,
+    update_artifact_index,
+)
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
@@ -94,6 +102,60 @@ class JavaScriptStacktraceProcessorTest(TestCase):
         assert processor.dist.name == "foo"
         assert processor.dist.date_added.timestamp() == processor.data["timestamp"]
 
+    @override_options({"sourcemaps.parsed-cache-size": 1024 * 1024})
+    def test_parsed_artifacts_are_shared_between_events(self):
+        parsed_source_cache.clear()
+        parsed_sourcemap_cache.clear()
+        self.addCleanup(parsed_source_cache.clear)
+        self.addCleanup(parsed_sourcemap_cache.clear)
+
+        project = self.create_project()
+        release = self.create_release(project=project, version="1.0")
+        source = http.UrlResult(
+            "http://example.com/app.js",
+            {},
+            b"foo();\n//# sourceMappingURL=app.js.map",
+            200,
+            None,
+        )
+        sourcemap = json.dumps(
+            {
+                "version": 3,
+                "file": "app.js",
+                "sources": ["app.src.js"],
+                "names": [],
+                "mappings": "AAAA",
+                "sourcesContent": ["foo();"],
+            }
+        ).encode("utf-8")
+
+        def process_event():
+            processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=[], project=project)
+            processor.release = release
+            processor.cache_source("http://example.com/app.js")
+            return processor
+
+        with patch(
+            "sentry.lang.javascript.processor.fetch_file", return_value=source
+        ) as mock_fetch_file, patch(
+            "sentry.lang.javascript.processor.fetch_sourcemap_body", return_value=sourcemap
+        ) as mock_fetch_sourcemap, patch(
+            "sentry.lang.javascript.processor.parse_sourcemap", wraps=parse_sourcemap
+        ) as mock_parse_sourcemap:
+            first = process_event()
+            second = process_event()
+
+        assert mock_fetch_file.call_count == 1
+        assert mock_fetch_sourcemap.call_count == 1
+        assert mock_parse_sourcemap.call_count == 1
+
+        sourcemap_url = "http://example.com/app.js.map"
+        assert second.cache.get("http://example.com/app.js") is first.cache.get(
+            "http://example.com/app.js"
+        )
+        assert second.sourcemaps.get(sourcemap_url) is first.sourcemaps.get(sourcemap_url)
+        assert second.sourcemaps.get_link("http://example.com/app.js")[0] == sourcemap_url
+
 
 def test_build_fetch_retry_condition() -> None:
     e = OSError()
@@ -725,6 +787,43 @@ class FetchFileTest(TestCase):
         result.close()
         assert len(cache_getfile.mock_calls) == 2
 
+    def test_ranged_archive_reads(self):
+        compressed = BytesIO()
+        with zipfile.ZipFile(compressed, mode="w") as zip_file:
+            zip_file.writestr("example.js", b"foo")
+            zip_file.writestr(
+                "manifest.json",
+                json.dumps({"files": {"example.js": {"url": "/example.js", "headers": {}}}}),
+            )
+
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        compressed.seek(0)
+        file_ = File.objects.create(name="foo", type="release.bundle")
+        file_.putfile(compressed)
+        update_artifact_index(release, None, file_)
+
+        with override_options({"releasefile.ranged-archive-reads": True}), patch(
+            "sentry.lang.javascript.processor.read_zip_tail", side_effect=read_zip_tail
+        ) as mock_read_zip_tail:
+            for _ in range(2):
+                result = fetch_release_archive_for_url(release, dist=None, url="/example.js")
+                with ReleaseArchive(result) as archive:
+                    fp, headers = archive.get_file_by_url("/example.js")
+                    assert fp.read() == b"foo"
+
+            # The central directory is only read once
+            assert mock_read_zip_tail.call_count == 1
+
+    def test_ranged_archive_reads_invalid_archive(self):
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        self._create_archive(release, "foo")
+
+        with override_options({"releasefile.ranged-archive-reads": True}):
+            result = fetch_release_archive_for_url(release, dist=None, url="foo")
+        assert result is not None
+        assert result.read() == b"0123456789"
+        result.close()
+
     @responses.activate
     def test_unicode_body(self):
         responses.add(
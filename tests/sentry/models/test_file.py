@@ -155,6 +155,25 @@ class FileTest(TestCase):
             with pytest.raises(ValueError):
                 fp.seek(0, 666)
 
+    def test_seek_only_opens_needed_blobs(self):
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(BytesIO(b"abcdefghijklmnopqrstuvwxyz"), 5)
+
+        with patch.object(
+            FileBlob, "getfile", autospec=True, side_effect=FileBlob.getfile
+        ) as getfile:
+            with file1.getfile() as fp:
+                # Opening the file opens the first blob
+                assert getfile.call_count == 1
+
+                fp.seek(12)
+                assert fp.read(5) == b"mnopq"
+                assert getfile.call_count == 3
+
+                fp.seek(-2, 2)
+                assert fp.read() == b"yz"
+                assert getfile.call_count == 5
+
     def test_multi_chunk_prefetch(self):
         random_data = os.urandom(1 << 25)
 
@@ -0,0 +1,89 @@
+from sentry.models import GroupHash
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.cache import cache
+
+
+class GetOrCreateManyTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_creates_missing(self):
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        with self.assertNumQueries(3):
+            grouphashes = GroupHash.objects.get_or_create_many(
+                self.project, ["a" * 32, "b" * 32, "b" * 32]
+            )
+
+        assert grouphashes.keys() == {"a" * 32, "b" * 32}
+        assert grouphashes["a" * 32] == existing
+        assert grouphashes["b" * 32].id is not None
+        assert grouphashes["b" * 32] == GroupHash.objects.get(project=self.project, hash="b" * 32)
+
+        with self.assertNumQueries(1):
+            assert GroupHash.objects.get_or_create_many(self.project, ["a" * 32, "b" * 32]) == (
+                grouphashes
+            )
+
+    def test_prefetch(self):
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        grouphashes = GroupHash.objects.get_or_create_many(
+            self.project, ["b" * 32], prefetch_hashes=["a" * 32, "c" * 32]
+        )
+        assert grouphashes.keys() == {"a" * 32, "b" * 32}
+        assert grouphashes["a" * 32] == existing
+        assert not GroupHash.objects.filter(project=self.project, hash="c" * 32).exists()
+
+    def test_empty(self):
+        project = self.project
+        with self.assertNumQueries(0):
+            assert GroupHash.objects.get_or_create_many(project, []) == {}
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_cache(self):
+        group = self.create_group()
+        GroupHash.objects.create(project=self.project, hash="a" * 32, group=group)
+        GroupHash.objects.get_or_create_many(self.project, ["a" * 32, "b" * 32])
+
+        # Only hashes assigned to a group are cached
+        with self.assertNumQueries(1):
+            grouphashes = GroupHash.objects.get_or_create_many(self.project, ["a" * 32, "b" * 32])
+        assert grouphashes["a" * 32].group_id == group.id
+        assert grouphashes["b" * 32].group_id is None
+
+        with self.assertNumQueries(0):
+            grouphashes = GroupHash.objects.get_or_create_many(self.project, ["a" * 32])
+        assert grouphashes["a" * 32].group_id == group.id
+
+    @override_options({"store.grouphash-cache-ttl": 60})
+    def test_cache_invalidation(self):
+        group = self.create_group()
+        other_group = self.create_group()
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32, group=group)
+
+        def get_cached_group_id():
+            GroupHash.objects.get_or_create_many(self.project, ["a" * 32])
+            with self.assertNumQueries(0):
+                return GroupHash.objects.get_or_create_many(self.project, ["a" * 32])[
+                    "a" * 32
+                ].group_id
+
+        assert get_cached_group_id() == group.id
+
+        # Saving the model drops the cached row
+        grouphash.group = other_group
+        grouphash.save()
+        assert get_cached_group_id() == other_group.id
+
+        # Queryset updates must invalidate explicitly
+        GroupHash.objects.filter(id=grouphash.id).update(group=group)
+        GroupHash.objects.invalidate_cache(self.project.id, ["a" * 32])
+        assert get_cached_group_id() == group.id
+
+        grouphash.delete()
+        with self.assertNumQueries(3):
+            grouphashes = GroupHash.objects.get_or_create_many(self.project, ["a" * 32])
+        assert grouphashes["a" * 32].group_id is None
@@ -10,6 +10,7 @@ from sentry.exceptions import InvalidSearchQuery
 from sentry.models import (
     Commit,
     CommitAuthor,
+    Distribution,
     Environment,
     ExternalIssue,
     Group,
@@ -34,6 +35,7 @@ from sentry.models import (
 )
 from sentry.search.events.filter import parse_semver
 from sentry.testutils import SetRefsTestCase, TestCase
+from sentry.utils.cache import cache
 from sentry.utils.strings import truncatechars
 
 
@@ -65,6 +67,58 @@ def test_version_is_semver_invalid(release_version):
     assert Release.is_semver_version(release_version) is False
 
 
+class GetOrCreateManyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_resolves_and_creates(self):
+        project = self.project
+        other_project = self.create_project(organization=project.organization)
+        existing = self.create_release(project=project, version="1.0")
+        now = timezone.now()
+
+        releases = Release.get_or_create_many(
+            {(project, "1.0"): now, (project, "2.0"): now, (other_project, "2.0"): now}
+        )
+        assert releases[(project.id, "1.0")] == existing
+        assert releases[(project.id, "2.0")].version == "2.0"
+        assert releases[(other_project.id, "2.0")] == releases[(project.id, "2.0")]
+        assert (
+            ReleaseProject.objects.filter(
+                release=releases[(project.id, "2.0")], project__in=[project, other_project]
+            ).count()
+            == 2
+        )
+
+        with self.assertNumQueries(0):
+            assert Release.get_or_create_many({(project, "1.0"): now, (project, "2.0"): now}) == {
+                (project.id, "1.0"): existing,
+                (project.id, "2.0"): releases[(project.id, "2.0")],
+            }
+
+    def test_prefers_project_version(self):
+        project = self.project
+        self.create_release(project=project, version="1.0")
+        prefixed = self.create_release(project=project, version=f"{project.slug}-1.0")
+
+        releases = Release.get_or_create_many({(project, "1.0"): None})
+        assert releases[(project.id, "1.0")] == prefixed
+        assert Release.get_or_create(project, "1.0") == prefixed
+
+    def test_dists(self):
+        release = self.create_release(project=self.project, version="1.0")
+        other_release = self.create_release(project=self.project, version="2.0")
+        existing = release.add_dist("a")
+
+        dists = Distribution.objects.get_or_create_many(
+            {(release, "a"): None, (release, "b"): None, (other_release, "a"): None}
+        )
+        assert dists[(release.id, "a")] == existing
+        assert dists[(release.id, "b")].name == "b"
+        assert dists[(other_release.id, "a")].release == other_release
+        assert Distribution.objects.filter(release__in=[release, other_release]).count() == 3
+
+
 class MergeReleasesTest(TestCase):
     def test_simple(self):
         org = self.create_organization()
@@ -6,6 +6,13 @@ from contextlib import nullcontext
 
 import pytest
 
+from sentry.models import EventDict
+from sentry.nodestore.base import (
+    SectionedNodeData,
+    _RawSection,
+    decode_sections,
+    encode_sections,
+)
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
@@ -91,3 +98,78 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_sectioned_encoding(ns, settings):
+    """
+    Payloads written with sections decode their top-level keys lazily, and
+    both formats stay readable regardless of the setting.
+    """
+
+    data = {"tags": [["foo", "bar"]], "message": "multi\nline", "contexts": {"os": {}}}
+
+    settings.SENTRY_NODESTORE_SECTIONED_ENCODING = True
+    ns.set_subkeys("node_1", {None: data, "other": {"foo": "b"}})
+    ns.set("node_2", {"foo": "a"})
+
+    settings.SENTRY_NODESTORE_SECTIONED_ENCODING = False
+    ns.set("node_3", {"foo": "c"})
+    # Decode from the backend rather than the node cache
+    ns._delete_cache_items(["node_1", "node_2", "node_3"])
+
+    node = ns.get("node_1", lazy=True)
+    assert isinstance(node, SectionedNodeData)
+    assert node["tags"] == [["foo", "bar"]]
+    assert node == data
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get_multi(["node_2", "node_3"]) == {"node_2": {"foo": "a"}, "node_3": {"foo": "c"}}
+
+    # Unless asked for lazy payloads, readers get plain dicts, also from the
+    # node cache.
+    for _ in range(2):
+        assert type(ns.get("node_1")) is dict
+        assert type(ns.get_multi(["node_1", "node_2"])["node_1"]) is dict
+    assert isinstance(ns.get_multi(["node_1"], lazy=True)["node_1"], SectionedNodeData)
+
+    # Re-saving a sectioned payload in the legacy format
+    ns.set("node_1", node)
+    assert ns.get("node_1") == data
+
+
+def test_sectioned_node_data_is_lazy():
+    data = {"tags": [["foo", "bar"]], "message": "hello"}
+    node = decode_sections(encode_sections(data))
+
+    assert list(node) == ["tags", "message"]
+    assert node["message"] == "hello"
+    assert not isinstance(node._sections["message"], _RawSection)
+    assert isinstance(node._sections["tags"], _RawSection)
+
+    # Wrapping the payload in an event does not decode its sections either
+    event_data = EventDict(node)
+    assert isinstance(node._sections["tags"], _RawSection)
+    assert isinstance(event_data.copy().data._sections["tags"], _RawSection)
+    assert event_data["tags"] == [["foo", "bar"]]
+
+    node["extra"] = {"foo": "bar"}
+    del node["message"]
+    assert decode_sections(encode_sections(node)) == {
+        "tags": [["foo", "bar"]],
+        "extra": {"foo": "bar"},
+    }
+
+
+def test_set_subkeys_many(ns):
+    ns.set_subkeys_many(
+        {
+            "node_1": {None: {"foo": "a"}, "other": {"foo": "b"}},
+            "node_2": {None: {"foo": "c"}},
+        }
+    )
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": {"foo": "a"}, "node_2": {"foo": "c"}}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_2", subkey="other") is None
+
+    ns.set_many({"node_1": {"foo": "d"}})
+    assert ns.get("node_1") == {"foo": "d"}
+    assert ns.get("node_1", subkey="other") is None
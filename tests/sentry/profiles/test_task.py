@@ -1,5 +1,6 @@
 from io import BytesIO
 from os.path import join
+from unittest import mock
 from zipfile import ZipFile
 
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -7,7 +8,7 @@ from django.urls import reverse
 from exam import fixture
 
 from sentry.models import Project
-from sentry.profiles.task import _deobfuscate, _normalize
+from sentry.profiles.task import _deduplicate_frames, _deobfuscate, _normalize, _symbolicate
 from sentry.testutils import TestCase
 from sentry.testutils.factories import get_fixture_path
 from sentry.utils import json
@@ -263,3 +264,92 @@ class ProfilesProcessTaskTest(TestCase):
         _deobfuscate(profile, project)
 
         assert profile["profile"]["methods"] == obfuscated_frames
+
+
+def fake_process_payload(stacktraces, modules):
+    # Symbolicates every frame into one frame per "+"-separated function name
+    return {
+        "stacktraces": [
+            {
+                "frames": [
+                    {"function": function, "original_index": i, "context_line": "x"}
+                    for i, frame in enumerate(stacktrace["frames"])
+                    for function in frame["instruction_addr"].split("+")
+                ]
+            }
+            for stacktrace in stacktraces
+        ]
+    }
+
+
+class ProfilesSymbolicateTest(TestCase):
+    def make_profile(self, platform, samples):
+        return {
+            "profile_id": "a" * 32,
+            "platform": platform,
+            "debug_meta": {"images": []},
+            "sampled_profile": {
+                "samples": [
+                    {"frames": [{"instruction_addr": addr} for addr in frames]}
+                    for frames in samples
+                ]
+            },
+        }
+
+    def test_deduplicate_frames(self):
+        samples = [
+            {"frames": [{"instruction_addr": "a"}, {"instruction_addr": "b"}]},
+            {"frames": [{"instruction_addr": "b"}, {"instruction_addr": "b"}]},
+            {"frames": [{"instruction_addr": "a"}, {"instruction_addr": "b"}]},
+        ]
+        stacktraces, refs = _deduplicate_frames(samples)
+
+        # Leaf frames are symbolicated separately from caller frames
+        assert [stacktrace["frames"] for stacktrace in stacktraces] == [
+            [{"instruction_addr": "a"}],
+            [{"instruction_addr": "b"}],
+            [{"instruction_addr": "b"}, {"instruction_addr": "b"}],
+        ]
+        assert refs == [[(0, 0), (2, 1)], [(1, 0), (2, 1)], [(0, 0), (2, 1)]]
+
+    def test_deduplicate_frames_with_nested_values(self):
+        samples = [
+            {"frames": [{"instruction_addr": "a", "data": {"symbolicator_status": ["x"]}}]},
+            {"frames": [{"data": {"symbolicator_status": ["x"]}, "instruction_addr": "a"}]},
+            {"frames": [{"instruction_addr": "a", "data": {"symbolicator_status": ["y"]}}]},
+        ]
+        stacktraces, refs = _deduplicate_frames(samples)
+
+        assert len(stacktraces) == 2
+        assert refs == [[(0, 0)], [(0, 0)], [(1, 0)]]
+
+    @mock.patch("sentry.profiles.task.Symbolicator")
+    def test_symbolicate(self, symbolicator):
+        symbolicator.return_value.process_payload.side_effect = fake_process_payload
+        profile = self.make_profile("cocoa", [["a", "b+c", "d"], ["b+c", "d"], ["a", "d"]])
+
+        _symbolicate(profile, self.project)
+
+        (call,) = symbolicator.return_value.process_payload.call_args_list
+        assert len(call.kwargs["stacktraces"]) == 3
+        assert [
+            [frame["function"] for frame in sample["frames"]]
+            for sample in profile["profile"]["samples"]
+        ] == [
+            ["a", "b", "c", "d"],
+            ["b", "c", "d"],
+            ["a", "d"],
+        ]
+        assert "context_line" not in profile["profile"]["samples"][0]["frames"][0]
+        assert "debug_meta" not in profile
+
+    @mock.patch("sentry.profiles.task.Symbolicator")
+    def test_symbolicate_rust_profiler_frames(self, symbolicator):
+        symbolicator.return_value.process_payload.side_effect = fake_process_payload
+        profile = self.make_profile("rust", [["perf_signal_handler", "handler", "main"]])
+
+        _symbolicate(profile, self.project)
+
+        assert [frame["function"] for frame in profile["profile"]["samples"][0]["frames"]] == [
+            "main"
+        ]
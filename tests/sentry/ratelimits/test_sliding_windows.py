@@ -101,3 +101,31 @@ def test_multiple_windows(limiter):
     )
 
     assert resp == [GrantedQuota(prefix="foo", granted=5)]
+
+
+def test_batch_shared_quota(limiter):
+    quotas = [Quota(window_seconds=10, granularity_seconds=1, limit=5)]
+    global_quotas = [Quota(window_seconds=10, granularity_seconds=1, limit=8, prefix_override="g")]
+
+    requests = [
+        RequestedQuota(prefix="foo", requested=3, quotas=quotas + global_quotas),
+        RequestedQuota(prefix="foo", requested=3, quotas=quotas + global_quotas),
+        RequestedQuota(prefix="bar", requested=3, quotas=quotas + global_quotas),
+        RequestedQuota(prefix="baz", requested=3, quotas=quotas + global_quotas),
+    ]
+    resp = limiter.check_and_use_quotas(requests, timestamp=TIMESTAMP_OFFSET)
+    assert resp == [
+        GrantedQuota(prefix="foo", granted=3),
+        GrantedQuota(prefix="foo", granted=2),
+        GrantedQuota(prefix="bar", granted=3),
+        GrantedQuota(prefix="baz", granted=0),
+    ]
+
+    resp = limiter.check_and_use_quotas(
+        [
+            RequestedQuota(prefix="foo", requested=1, quotas=quotas),
+            RequestedQuota(prefix="bar", requested=3, quotas=quotas),
+        ],
+        timestamp=TIMESTAMP_OFFSET + 1,
+    )
+    assert resp == [GrantedQuota(prefix="foo", granted=0), GrantedQuota(prefix="bar", granted=2)]
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from sentry.models import Rule
+from sentry.rules.conditions.event_frequency import (
+    EventFrequencyCondition,
+    RateCache,
+    rate_cache,
+)
+from sentry.testutils.cases import RuleTestCase
+from sentry.testutils.helpers import override_options
+
+
+def test_rate_cache_expires():
+    cache = RateCache(jitter=0)
+    with mock.patch("time.monotonic", return_value=100):
+        cache.set("key", 5, ttl=10)
+        assert cache.get("key") == 5
+    with mock.patch("time.monotonic", return_value=111):
+        assert cache.get("key") is None
+
+
+def test_rate_cache_is_bounded():
+    cache = RateCache(max_size=2)
+    for i in range(3):
+        cache.set(i, i, ttl=10)
+    assert len(cache._data) <= 2
+    assert cache.get(2) == 2
+
+
+class EventFrequencyRateCacheTest(RuleTestCase):
+    rule_cls = EventFrequencyCondition
+
+    def setUp(self):
+        rate_cache.clear()
+        self.event = self.store_event(data={}, project_id=self.project.id)
+
+    def tearDown(self):
+        rate_cache.clear()
+
+    def test_cache_is_shared_between_rules(self):
+        data = {"interval": "1h", "value": 10}
+        rules = [
+            self.get_rule(data=data, rule=Rule(environment_id=None)),
+            self.get_rule(data={**data, "value": 20}, rule=Rule(environment_id=None)),
+        ]
+
+        with override_options({"rules.event-frequency.local-cache-ttl": 10}), mock.patch.object(
+            EventFrequencyCondition, "query_hook", return_value=15
+        ) as query_hook:
+            assert rules[0].passes(self.event, self.get_state())
+            assert not rules[1].passes(self.event, self.get_state())
+
+        assert query_hook.call_count == 1
+
+    def test_cache_disabled(self):
+        data = {"interval": "1h", "value": 10}
+        rule = self.get_rule(data=data, rule=Rule(environment_id=None))
+
+        with mock.patch.object(
+            EventFrequencyCondition, "query_hook", return_value=15
+        ) as query_hook:
+            rule.passes(self.event, self.get_state())
+            rule.passes(self.event, self.get_state())
+
+        assert query_hook.call_count == 2
@@ -11,9 +11,11 @@ from sentry.models import GroupRuleStatus, GroupStatus, Rule, RuleFireHistory
 from sentry.notifications.types import ActionTargetType
 from sentry.rules import init_registry
 from sentry.rules.conditions import EventCondition
+from sentry.rules.conditions.event_frequency import RateCache
 from sentry.rules.filters.base import EventFilter
 from sentry.rules.processor import RuleProcessor
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 
 EMAIL_ACTION_DATA = {
     "id": "sentry.mail.actions.NotifyEmailAction",
@@ -204,6 +206,57 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition",
+        ],
+    )
+    def test_prefetch_frequency_conditions(self):
+        conditions = [
+            {
+                "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                "interval": "1h",
+                "value": 1000,
+            },
+            {
+                "id": "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition",
+                "interval": "1h",
+                "value": 1000,
+            },
+        ]
+        self.rule.update(data={"conditions": conditions, "actions": [EMAIL_ACTION_DATA]})
+        # A second rule with the same frequency condition must reuse the prefetched value
+        Rule.objects.create(
+            project=self.event.project,
+            data={"conditions": conditions[:1], "actions": [EMAIL_ACTION_DATA]},
+        )
+
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.rules.conditions.event_frequency.rate_cache", RateCache()
+        ), patch(
+            "sentry.rules.conditions.event_frequency.BaseEventFrequencyCondition.query",
+            return_value=0,
+        ) as query, override_options(
+            {
+                "rules.event-frequency.local-cache-ttl": 10,
+                "rules.event-frequency.prefetch": True,
+            }
+        ):
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = rp.apply()
+
+        assert len(results) == 0
+        assert query.call_count == 2
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
@@ -15,6 +15,8 @@ from sentry.snuba.query_subscription_consumer import (
     InvalidMessageError,
     InvalidSchemaError,
     QuerySubscriptionConsumer,
+    batch_subscriber_registry,
+    register_batch_subscriber,
     register_subscriber,
     subscriber_registry,
 )
@@ -126,6 +128,103 @@ class HandleMessageTest(BaseQuerySubscriptionTest, TestCase):
         mock_callback.assert_called_once_with(data["payload"], sub)
 
 
+class HandleMessagesTest(BaseQuerySubscriptionTest, TestCase):
+    metrics = patcher("sentry.snuba.query_subscription_consumer.metrics")
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(subscriber_registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(batch_subscriber_registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_subscription(self, registration_key):
+        with self.tasks():
+            snuba_query = create_snuba_query(
+                SnubaQuery.Type.ERROR,
+                QueryDatasets.EVENTS,
+                "hello",
+                "count()",
+                timedelta(minutes=10),
+                timedelta(minutes=1),
+                None,
+            )
+            sub = create_snuba_subscription(self.project, registration_key, snuba_query)
+        sub.refresh_from_db()
+        return sub
+
+    def build_messages(self, subs):
+        messages = []
+        for sub in subs:
+            data = deepcopy(self.valid_wrapper)
+            data["payload"]["subscription_id"] = sub.subscription_id
+            messages.append(self.build_mock_message(data))
+        return messages
+
+    def build_update(self, sub):
+        payload = deepcopy(self.valid_payload)
+        payload["subscription_id"] = sub.subscription_id
+        payload["values"] = payload["result"]
+        payload["timestamp"] = parse_date(payload["timestamp"]).replace(tzinfo=pytz.utc)
+        return payload
+
+    def test_batch_subscriber(self):
+        mock_callback = mock.Mock()
+        mock_batch_callback = mock.Mock()
+        register_subscriber("batched_test")(mock_callback)
+        register_batch_subscriber("batched_test")(mock_batch_callback)
+        sub = self.create_subscription("batched_test")
+        other_sub = self.create_subscription("batched_test")
+
+        self.consumer.handle_messages(self.build_messages([sub, other_sub, sub]))
+        assert not mock_callback.called
+        mock_batch_callback.assert_called_once_with(
+            [
+                (self.build_update(sub), sub),
+                (self.build_update(other_sub), other_sub),
+                (self.build_update(sub), sub),
+            ]
+        )
+
+    def test_failing_batch_subscriber(self):
+        failing_callback = mock.Mock(side_effect=Exception("boom"))
+        mock_callback = mock.Mock()
+        register_subscriber("failing_test")(mock.Mock())
+        register_batch_subscriber("failing_test")(failing_callback)
+        register_subscriber("unbatched_test")(mock_callback)
+        failing_sub = self.create_subscription("failing_test")
+        sub = self.create_subscription("unbatched_test")
+
+        self.consumer.handle_messages(self.build_messages([failing_sub, sub]))
+        # A failing subscription type does not prevent other types from being handled
+        assert failing_callback.call_count == 1
+        mock_callback.assert_called_once_with(self.build_update(sub), sub)
+
+    def test_subscriber(self):
+        mock_callback = mock.Mock(side_effect=[Exception("boom"), None])
+        register_subscriber("unbatched_test")(mock_callback)
+        sub = self.create_subscription("unbatched_test")
+        other_sub = self.create_subscription("unbatched_test")
+
+        self.consumer.handle_messages(self.build_messages([sub, other_sub]))
+        # A failing update does not prevent the rest of the batch from being handled
+        assert mock_callback.call_args_list == [
+            mock.call(self.build_update(sub), sub),
+            mock.call(self.build_update(other_sub), other_sub),
+        ]
+
+    def test_subscription_not_registered(self):
+        sub = QuerySubscription.objects.create(
+            project=self.project, type="unregistered", subscription_id="an_id"
+        )
+        self.consumer.handle_messages(self.build_messages([sub]))
+        self.metrics.incr.assert_called_once_with(
+            "snuba_query_subscriber.subscription_type_not_registered"
+        )
+
+
 class ParseMessageValueTest(BaseQuerySubscriptionTest, unittest.TestCase):
     def run_test(self, message):
         self.consumer.parse_message_value(json.dumps(message))
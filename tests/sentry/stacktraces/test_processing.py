@@ -0,0 +1,86 @@
+from unittest import mock
+
+from sentry.stacktraces.processing import (
+    StacktraceProcessor,
+    local_frame_cache,
+    lookup_frame_cache,
+    process_stacktraces,
+)
+from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.cache import cache
+
+
+class CachingProcessor(StacktraceProcessor):
+    calls = 0
+
+    def handles_frame(self, frame, stacktrace_info):
+        return True
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values([processable_frame["function"]])
+
+    def process_frame(self, processable_frame, processing_task):
+        function = processable_frame.cache_value
+        if function is None:
+            CachingProcessor.calls += 1
+            function = processable_frame["function"].upper()
+            processable_frame.set_cache_value(function)
+        new_frame = dict(processable_frame.frame, function=function)
+        return [new_frame], None, None
+
+
+class FrameCacheTest(TestCase):
+    def setUp(self):
+        CachingProcessor.calls = 0
+        cache.clear()
+        local_frame_cache.clear()
+        self.addCleanup(local_frame_cache.clear)
+
+    def make_data(self):
+        return {
+            "project": self.project.id,
+            "stacktrace": {"frames": [{"function": "foo"}, {"function": "bar"}]},
+        }
+
+    def process(self):
+        return process_stacktraces(
+            self.make_data(),
+            make_processors=lambda data, infos: [CachingProcessor(data, infos, self.project)],
+        )
+
+    def test_writes_are_batched(self):
+        with mock.patch("sentry.stacktraces.processing.cache.set_many") as set_many:
+            self.process()
+        assert set_many.call_count == 1
+        assert len(set_many.call_args[0][0]) == 2
+
+    def test_cached_frames_are_reused(self):
+        self.process()
+        assert CachingProcessor.calls == 2
+
+        data = self.process()
+        assert CachingProcessor.calls == 2
+        assert [f["function"] for f in data["stacktrace"]["frames"]] == ["FOO", "BAR"]
+
+    @override_options({"processing.frame-cache.local-size": 10})
+    def test_local_cache(self):
+        self.process()
+        assert len(local_frame_cache) == 2
+
+        with mock.patch("sentry.stacktraces.processing.cache.get_many") as get_many:
+            data = self.process()
+        assert not get_many.called
+        assert CachingProcessor.calls == 2
+        assert [f["function"] for f in data["stacktrace"]["frames"]] == ["FOO", "BAR"]
+
+    @override_options({"processing.frame-cache.local-size": 1})
+    def test_local_cache_eviction(self):
+        cache.set_many({"pf:a": "a", "pf:b": "b"})
+        assert lookup_frame_cache(["pf:a", "pf:b", "pf:c"]) == {
+            "pf:a": "a",
+            "pf:b": "b",
+            "pf:c": None,
+        }
+        assert len(local_frame_cache) == 1
+        assert local_frame_cache.get_many(["pf:a", "pf:b"]) == {"pf:b": "b"}
@@ -3,10 +3,11 @@ from unittest.mock import patch
 from django.core import mail
 
 import sentry
+from sentry.digests import ScheduleEntry
 from sentry.digests.backends.redis import RedisBackend
 from sentry.digests.notifications import event_to_record
 from sentry.models.rule import Rule
-from sentry.tasks.digests import deliver_digest
+from sentry.tasks.digests import deliver_digest, deliver_digests, schedule_digests
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 
@@ -45,3 +46,28 @@ class DeliverDigestTest(TestCase):
     def test_no_records(self):
         # This shouldn't error if no records are present
         deliver_digest(f"mail:p:{self.project.id}:IssueOwners:")
+
+
+class ScheduleDigestsTest(TestCase):
+    @patch("sentry.tasks.digests.deliver_digests.delay")
+    @patch("sentry.tasks.digests.deliver_digest.delay")
+    @patch.object(sentry, "digests")
+    def test_batches_by_project(self, digests, deliver_digest_delay, deliver_digests_delay):
+        digests.schedule.return_value = [
+            ScheduleEntry("mail:p:1:IssueOwners:", 1.0),
+            ScheduleEntry("mail:p:2:IssueOwners:", 2.0),
+            ScheduleEntry("mail:p:1:Member:3", 3.0),
+        ]
+        schedule_digests()
+
+        assert digests.maintenance.call_count == 1
+        deliver_digest_delay.assert_called_once_with("mail:p:2:IssueOwners:", 2.0)
+        deliver_digests_delay.assert_called_once_with(
+            [("mail:p:1:IssueOwners:", 1.0), ("mail:p:1:Member:3", 3.0)]
+        )
+
+    @patch("sentry.tasks.digests.deliver_digest")
+    def test_deliver_digests_isolates_failures(self, deliver_digest):
+        deliver_digest.side_effect = [Exception("boom"), None]
+        deliver_digests([("mail:p:1:IssueOwners:", 1.0), ("mail:p:1:Member:3", 3.0)])
+        assert deliver_digest.call_count == 2
@@ -1,8 +1,10 @@
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from unittest import mock
 
 import pytest
 import pytz
+from celery.signals import worker_process_shutdown
 from django.test import override_settings
 
 from sentry.testutils import TestCase
@@ -55,6 +57,73 @@ class RedisTSDBTest(TestCase):
         with self.db.cluster.all() as client:
             client.flushdb()
 
+    def test_aggregated_counters(self):
+        self.db.aggregation_interval = 60
+        self.db.aggregation_max_keys = 1000
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+        timestamp = int(to_timestamp(now))
+        timestamp -= timestamp % 3600
+
+        for _ in range(3):
+            self.db.incr_multi(
+                [(TSDBModel.project, 1), (TSDBModel.group, 2)], now, environment_id=1
+            )
+
+        # Nothing has been written yet, the increments are held in memory.
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 0)]}
+
+        self.db.flush_counters()
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 3)]}
+        assert self.db.get_range(TSDBModel.group, [2], now, now, environment_ids=[1]) == {
+            2: [(timestamp, 3)]
+        }
+
+    def test_aggregated_counters_flush_on_max_keys(self):
+        self.db.aggregation_interval = 60
+        self.db.aggregation_max_keys = 1
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+        timestamp = int(to_timestamp(now))
+        timestamp -= timestamp % 3600
+
+        self.db.incr(TSDBModel.project, 1, now, count=2)
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 2)]}
+
+    def test_aggregated_counters_flush_on_shutdown(self):
+        self.db.aggregation_interval = 60
+        self.db.aggregation_max_keys = 1000
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+        timestamp = int(to_timestamp(now))
+        timestamp -= timestamp % 3600
+
+        self.db.incr(TSDBModel.project, 1, now, count=2)
+        worker_process_shutdown.send(sender=None)
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 2)]}
+
+    def test_aggregated_counters_flush_failure(self):
+        self.db.aggregation_interval = 60
+        self.db.aggregation_max_keys = 1000
+        self.db.aggregation_max_flush_attempts = 2
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+        timestamp = int(to_timestamp(now))
+        timestamp -= timestamp % 3600
+
+        self.db.incr(TSDBModel.project, 1, now, count=2)
+        with mock.patch.object(self.db, "_write_host_counters", side_effect=Exception("Boom!")):
+            self.db.flush_counters()
+
+        # Failed counters are kept and written by the next flush
+        self.db.incr(TSDBModel.project, 1, now, count=3)
+        self.db.flush_counters()
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 5)]}
+
+        # ...until they have failed too often
+        self.db.incr(TSDBModel.project, 1, now)
+        with mock.patch.object(self.db, "_write_host_counters", side_effect=Exception("Boom!")):
+            self.db.flush_counters()
+            self.db.flush_counters()
+        self.db.flush_counters()
+        assert self.db.get_range(TSDBModel.project, [1], now, now) == {1: [(timestamp, 5)]}
+
     def test_make_counter_key(self):
         result = self.db.make_counter_key(TSDBModel.project, 1, to_datetime(1368889980), 1, None)
         assert result == ("ts:1:1368889980:1", 1)
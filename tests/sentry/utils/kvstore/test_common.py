@@ -111,8 +111,9 @@ def test_multiple_key_operations(properties: Properties) -> None:
     store = properties.store
 
     items = dict(itertools.islice(properties.items, 10))
-    for key, value in items.items():
+    for key, value in itertools.islice(items.items(), 5):
         store.set(key, value)
+    store.set_many(list(itertools.islice(items.items(), 5, None)), ttl=timedelta(seconds=30))
 
     missing_keys = set(itertools.islice(properties.keys, 5))
 
@@ -1,8 +1,10 @@
+import pytest
 from redis import Redis
 
-from sentry.cache.redis import CommonRedisCache
+from sentry.cache.redis import CommonRedisCache, ValueTooLarge
+from sentry.eventstore.processing.codec import EventProcessingStoreCodec
 from sentry.utils.codecs import BytesCodec, JSONCodec
-from sentry.utils.kvstore.cache import CacheKeyWrapper, CacheKVStorage
+from sentry.utils.kvstore.cache import CacheBackendWrapper, CacheKeyWrapper, CacheKVStorage
 from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
 from sentry.utils.kvstore.redis import RedisKVStorage
 
@@ -33,3 +35,50 @@ def test_redis_cache_compat() -> None:
     cache_backend.delete("key")
     assert cache_backend.get("key") is None
     assert redis_backend.get("key") is None
+
+
+def test_redis_cache_compat_processing_store_codec() -> None:
+    redis = Redis(db=6, decode_responses=True)
+    version = 5
+    prefix = "test"
+
+    cache_backend = CacheKVStorage(CommonRedisCache(redis, version=version, prefix=prefix))
+    redis_backend = KVStorageCodecWrapper(
+        CacheKeyWrapper(RedisKVStorage(redis), version=version, prefix=prefix),
+        EventProcessingStoreCodec(compress=True),
+    )
+
+    # Values written by the cache are still readable
+    value = {"event_id": "a" * 32, "tags": [["foo", "bar"]]}
+    cache_backend.set("key", value)
+    assert redis_backend.get("key") == value
+
+    value = {"event_id": "b" * 32, "tags": [["foo", "baz"]]}
+    redis_backend.set("key", value)
+    assert redis_backend.get("key") == value
+
+    redis_backend.delete_many(["key"])
+    assert cache_backend.get("key") is None
+
+
+def test_redis_cache_backend_wrapper() -> None:
+    redis = Redis(db=6, decode_responses=True)
+    cache = CommonRedisCache(redis, version=5, prefix="test")
+    cache.max_size = 16
+    backend = KVStorageCodecWrapper(
+        CacheBackendWrapper(
+            CacheKeyWrapper(RedisKVStorage(redis), version=5, prefix="test"), cache
+        ),
+        JSONCodec(),
+    )
+
+    backend.set("key", [1, 2, 3])
+    assert cache.get("key") == [1, 2, 3]
+
+    # The cache's size limit applies to the encoded value
+    with pytest.raises(ValueTooLarge):
+        backend.set("key", list(range(10)))
+    with pytest.raises(ValueTooLarge):
+        backend.set_many([("other", [1]), ("key", list(range(10)))])
+    assert cache.get("key") == [1, 2, 3]
+    assert cache.get("other") is None
@@ -0,0 +1,68 @@
+from unittest import TestCase, mock
+
+from sentry.utils.lru import LRUCache
+
+
+class LRUCacheTest(TestCase):
+    def test_get_and_set(self):
+        cache = LRUCache()
+        assert cache.get("a") is None
+
+        cache.set("a", "foo", weight=3)
+        assert cache.get("a") == "foo"
+        assert cache.weight == 3
+
+        cache.set("a", "foobar", weight=6)
+        assert cache.get("a") == "foobar"
+        assert len(cache) == 1
+        assert cache.weight == 6
+
+        cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.weight == 0
+
+    def test_max_entries(self):
+        cache = LRUCache()
+        assert cache.set("a", 1, max_entries=2) == 0
+        assert cache.set("b", 2, max_entries=2) == 0
+        assert cache.get("a") == 1
+
+        assert cache.set("c", 3, max_entries=2) == 1
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_max_weight(self):
+        cache = LRUCache()
+        cache.set("a", 1, weight=4, max_weight=10)
+        cache.set("b", 2, weight=4, max_weight=10)
+        assert cache.set("c", 3, weight=8, max_weight=10) == 2
+        assert len(cache) == 1
+        assert cache.weight == 8
+
+        # Entries heavier than the bound are never stored
+        assert cache.set("d", 4, weight=11, max_weight=10) == 0
+        assert cache.get("d") is None
+        assert cache.get("c") == 3
+
+    @mock.patch("sentry.utils.lru.time")
+    def test_expiry(self, mock_time):
+        mock_time.monotonic.return_value = 100
+        cache = LRUCache()
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2)
+
+        mock_time.monotonic.return_value = 160
+        assert cache.get("a") == 1
+
+        mock_time.monotonic.return_value = 161
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1, weight=5)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.weight == 0
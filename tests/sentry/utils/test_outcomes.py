@@ -3,7 +3,9 @@ from unittest.mock import Mock
 
 import pytest
 
+from sentry.constants import DataCategory
 from sentry.utils import json, kafka_config, outcomes
+from sentry.utils.dates import to_datetime
 from sentry.utils.outcomes import Outcome, track_outcome
 
 
@@ -171,3 +173,92 @@ def test_track_outcome_billing_cluster(settings):
     assert topic_name == settings.KAFKA_OUTCOMES_BILLING
 
     assert outcomes.outcomes_publisher is None
+
+
+@pytest.fixture
+def aggregation(monkeypatch, settings):
+    settings.SENTRY_OUTCOMES_AGGREGATION_ENABLED = True
+    settings.SENTRY_OUTCOMES_AGGREGATION_OPTIONS = {
+        "bucket_interval": 60,
+        "flush_interval": 10,
+        "max_buckets": 3,
+    }
+    monkeypatch.setattr(outcomes, "outcome_aggregator", None)
+    monkeypatch.setattr(outcomes.OutcomeAggregator, "_ensure_flusher", lambda self: None)
+
+
+def test_track_outcome_aggregated(aggregation):
+    """
+    Checks that accepted outcomes and outcomes without event id are summed up
+    per bucket and only published on flush.
+    """
+
+    for minute in (0, 0, 1):
+        track_outcome(
+            org_id=1,
+            project_id=2,
+            key_id=3,
+            outcome=Outcome.ACCEPTED,
+            timestamp=to_datetime(120 + minute * 60 + 5),
+            event_id="a" * 32,
+            category=DataCategory.TRANSACTION,
+            quantity=2,
+        )
+
+    assert outcomes.outcomes_publisher is None
+    outcomes.flush_outcomes()
+
+    payloads = [
+        json.loads(args[1]) for args, _ in outcomes.outcomes_publisher.publish.call_args_list
+    ]
+    assert sorted((p["timestamp"], p["quantity"], p["event_id"]) for p in payloads) == [
+        ("1970-01-01T00:02:00.000000Z", 4, None),
+        ("1970-01-01T00:03:00.000000Z", 2, None),
+    ]
+
+    outcomes.flush_outcomes()
+    assert outcomes.outcomes_publisher.publish.call_count == 2
+
+
+def test_track_outcome_aggregated_keeps_event_id(aggregation):
+    """
+    Checks that outcomes other than accepted are not aggregated if they refer
+    to an event.
+    """
+
+    track_outcome(
+        org_id=1,
+        project_id=2,
+        key_id=3,
+        outcome=Outcome.FILTERED,
+        reason="browser-extensions",
+        event_id="a" * 32,
+    )
+
+    (_, payload), _ = outcomes.outcomes_publisher.publish.call_args
+    assert json.loads(payload)["event_id"] == "a" * 32
+
+
+def test_track_outcome_aggregated_max_buckets(aggregation):
+    """
+    Checks that pending buckets are flushed once there are too many of them.
+    """
+
+    for project_id in range(3):
+        track_outcome(org_id=1, project_id=project_id, key_id=None, outcome=Outcome.INVALID)
+
+    assert outcomes.outcomes_publisher.publish.call_count == 3
+
+
+def test_track_outcome_aggregated_worker_shutdown(aggregation):
+    """
+    Checks that pending buckets are published and delivered when a worker
+    process shuts down, which does not run ``atexit`` handlers.
+    """
+
+    track_outcome(org_id=1, project_id=2, key_id=None, outcome=Outcome.ACCEPTED)
+    assert outcomes.outcomes_publisher is None
+
+    outcomes.outcome_aggregator._on_shutdown()
+    assert outcomes.outcomes_publisher.publish.call_count == 1
+    assert outcomes.outcomes_publisher.flush.call_count == 1
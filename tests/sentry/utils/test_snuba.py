@@ -1,18 +1,25 @@
+import threading
 import unittest
 from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
 import pytz
+from django.core.cache import cache
 from django.utils import timezone
 
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.snuba import (
     Dataset,
+    InflightQueries,
+    RateLimitExceeded,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -143,6 +150,24 @@ class SnubaUtilsTest(TestCase):
             },
         ]
 
+    def test_translate_rows(self):
+        filter_keys = {"environment": [self.proj1env1.id]}
+        _, reverse = get_snuba_translators(filter_keys)
+        rows = [
+            {"environment": self.proj1env1.name, "time": "2021-01-01T00:00:00+00:00", "count": 1},
+            {"environment": self.proj1env1.name, "time": "2021-01-01T01:00:00+00:00", "count": 2},
+        ]
+        expected = [reverse(dict(row)) for row in rows]
+        assert (
+            reverse.translate_rows(rows)
+            == expected
+            == [
+                {"environment": self.proj1env1.id, "time": 1609459200, "count": 1},
+                {"environment": self.proj1env1.id, "time": 1609462800, "count": 2},
+            ]
+        )
+        assert reverse.translate_rows([]) == []
+
     def test_get_json_type(self):
         assert get_json_type(None) == "string"
         assert get_json_type("UInt8") == "boolean"
@@ -374,3 +399,111 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+class InflightQueriesTest(unittest.TestCase):
+    def test_coalesces_concurrent_queries(self):
+        inflight = InflightQueries()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_query():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "result"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(inflight.run("key", slow_query)))
+        owner.start()
+        started.wait()
+
+        # The waiter emits a metric right before blocking on the running query
+        coalesced = threading.Event()
+        with mock.patch(
+            "sentry.utils.snuba.metrics.incr", side_effect=lambda *args, **kwargs: coalesced.set()
+        ):
+            waiter = threading.Thread(
+                target=lambda: results.append(inflight.run("key", slow_query))
+            )
+            waiter.start()
+            coalesced.wait()
+        release.set()
+        owner.join()
+        waiter.join()
+
+        assert results == ["result", "result"]
+        assert len(calls) == 1
+
+        # Finished queries are not cached
+        assert inflight.run("key", lambda: "other") == "other"
+
+    def test_propagates_exceptions(self):
+        inflight = InflightQueries()
+
+        def failing_query():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            inflight.run("key", failing_query)
+        assert inflight.run("key", lambda: "ok") == "ok"
+
+
+class QueryCacheTest(TestCase):
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_stale_while_revalidate(self, bulk_snuba_query):
+        params = [({"dataset": "events", "query": "stale-while-revalidate"}, None, None)]
+        cache_key = get_cache_key(params[0][0])
+        bulk_snuba_query.return_value = [{"data": [1]}]
+
+        with override_options(
+            {"snuba.query-cache.soft-ttl": 10, "snuba.query-cache.hard-ttl": 300}
+        ), mock.patch("sentry.utils.snuba.time.time", return_value=1000):
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [1]}]
+            assert bulk_snuba_query.call_count == 1
+
+            # Fresh result is served from the cache
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [1]}]
+            assert bulk_snuba_query.call_count == 1
+
+        bulk_snuba_query.return_value = [{"data": [2]}]
+        with override_options(
+            {"snuba.query-cache.soft-ttl": 10, "snuba.query-cache.hard-ttl": 300}
+        ), mock.patch("sentry.utils.snuba.time.time", return_value=1020):
+            # Somebody else is refreshing the stale result
+            cache.set(f"{cache_key}:refresh", 1)
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [1]}]
+            assert bulk_snuba_query.call_count == 1
+
+            cache.delete(f"{cache_key}:refresh")
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [2]}]
+            assert bulk_snuba_query.call_count == 2
+            assert cache.get(f"{cache_key}:refresh") is None
+
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [2]}]
+            assert bulk_snuba_query.call_count == 2
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_failed_refresh_serves_stale_result(self, bulk_snuba_query):
+        params = [({"dataset": "events", "query": "failed-refresh"}, None, None)]
+        miss = [({"dataset": "events", "query": "failed-refresh-miss"}, None, None)]
+        cache_key = get_cache_key(params[0][0])
+        bulk_snuba_query.return_value = [{"data": [1]}]
+
+        with override_options(
+            {"snuba.query-cache.soft-ttl": 10, "snuba.query-cache.hard-ttl": 300}
+        ), mock.patch("sentry.utils.snuba.time.time", return_value=1000):
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [1]}]
+
+        bulk_snuba_query.side_effect = RateLimitExceeded("boom")
+        with override_options(
+            {"snuba.query-cache.soft-ttl": 10, "snuba.query-cache.hard-ttl": 300}
+        ), mock.patch("sentry.utils.snuba.time.time", return_value=1020):
+            assert _apply_cache_and_build_results(params, use_cache=True) == [{"data": [1]}]
+            assert bulk_snuba_query.call_count == 2
+            assert cache.get(f"{cache_key}:refresh") is None
+
+            # Cache misses have nothing to fall back to
+            with pytest.raises(RateLimitExceeded):
+                _apply_cache_and_build_results(params + miss, use_cache=True)